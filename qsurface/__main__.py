@@ -79,6 +79,7 @@ def cli(args):
     sim_arguments = [
         ["-l", "--size", "store", "size - int", dict(type=int, default=3)],
         ["-n", "--iterations", "store", "number of iterations - int", dict(type=int, default=1)],
+        ["-r", "--rounds", "store", "number of measurement rounds per iteration, decoded in a sliding window of layers (3D) - int", dict(type=int)],
         [
             "-s",
             "--seed",
@@ -3,8 +3,12 @@ from . import _template
 from . import toric
 from . import planar
 from . import rotated
+from . import bitslice
+from . import records
+from . import circuit
 
 CODES = [
     "toric",
     "planar",
+    "rotated",
 ]
@@ -18,7 +18,7 @@ class PerfectMeasurements(TemplateSimPM):
     """
 
     def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+        super().__init__(*args, **{**kwargs, "compact": False})
         self.figure = self.Figure(self, **kwargs)
 
     def initialize(self, *args, **kwargs):
@@ -406,7 +406,7 @@ class FaultyMeasurements(PerfectMeasurements, TemplateSimFM):
 
     def __init__(self, *args, figure3d: bool = True, **kwargs) -> None:
         self.figure3d = figure3d
-        TemplateSimFM.__init__(self, *args, **kwargs)
+        TemplateSimFM.__init__(self, *args, **{**kwargs, "compact": False})
         self.figure = self.Figure3D(self, **kwargs) if figure3d else self.Figure2D(self, **kwargs)
 
     def random_errors(self, **kwargs):
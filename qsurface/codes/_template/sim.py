@@ -1,12 +1,41 @@
 from abc import ABC, abstractmethod
-import time
-from ..elements import DataQubit, AncillaQubit, PseudoQubit, Edge, PseudoEdge
-from ...errors._template import Sim as Error
-from typing import Any, List, Optional, Union, Tuple
+from ..elements import (
+    DataQubit,
+    AncillaQubit,
+    PseudoQubit,
+    Edge,
+    PseudoEdge,
+    ArrayEdge,
+    ArrayAncillaQubit,
+    element_class,
+    dumps_elements,
+    loads_elements,
+)
+from ..arrays import LatticeArrays, lattice_matrices, matrix_cache, matrix_key
+from ..bulk import BulkLattice, as_loc
+from ..snapshot import read_snapshot, write_snapshot
+from scipy import sparse
+import numpy
+from ...errors._template import ErrorPlan, Sim as Error, sample_indices
+from typing import Any, Iterator, List, Optional, Union, Tuple
+from pathlib import Path
 from collections import defaultdict
 import importlib
 
 
+_instance = 0
+
+
+def new_instance(after: int = 0) -> int:
+    """Returns a new simulation instance.
+
+    Instances are integer epochs that increase within the process and are shared by all codes and decoders. Per-element scratch state, such as the cluster of an ancilla-qubit in the Union-Find decoder, is stamped with the current instance and is only valid while its stamp equals the instance of the code. A new simulation thus invalidates all such state in constant time. The counter is moved past ``after``, which is the instance of a lattice that is restored by `~PerfectMeasurements.load_lattice`.
+    """
+    global _instance
+    _instance = max(_instance, after) + 1
+    return _instance
+
+
 class PerfectMeasurements(ABC):
     """Simulation code class for perfect measurements.
 
@@ -18,6 +47,16 @@ class PerfectMeasurements(ABC):
     ----------
     size : int or tuple
         Size of the surface code in single dimension or two dimensions ``(x,y)``.
+    array_backend : bool, optional
+        Stores the states of all edges and ancilla-qubits in contiguous arrays of a `~.codes.arrays.LatticeArrays` object at ``self.arrays``. The elements are replaced by `~.codes.elements.ArrayEdge` and `~.codes.elements.ArrayAncillaQubit` objects, which are views onto these arrays. Measurements and the logical state are then evaluated as whole-array operations.
+    compact : bool, optional
+        Instances compact ``__slots__`` element classes without instance dictionaries, see `~.codes.elements.element_class`. Reduces the memory of large lattices, but elements cannot store attributes other than the fields registered by `~.codes.elements.register_fields`, which is not supported by the plotting codes.
+    lazy : bool, optional
+        Builds the lattice as arrays by `init_bulk` during `initialize`. The elements are only created by `materialize` when one of the attributes in ``self.lazy_names`` is first accessed.
+    bulk_errors : bool, optional
+        Applies the errors of the error modules that support it to all data-qubits of a layer at once, see `~.errors._template.Sim.random_errors_bulk`. The errors are drawn from ``self.rng`` instead of the standard `random` module.
+    sparse_errors : bool, optional
+        Draws the errors of the bulk path by geometric gaps between the errored qubits, such that the cost of a layer is proportional to the number of errors, see `~.errors._template.sample_indices`. Enables ``bulk_errors``.
 
     Attributes
     ----------
@@ -45,14 +84,79 @@ class PerfectMeasurements(ABC):
     trivial_ancillas : bool
         Property for whether all ancillas are trivial. Usefull for checking if decoding has been successfull.
 
-    instance : float
-        Time stamp that is renewed every time `random_errors` is called. Helps with identifying a 'round' of simulation when using class attributes.
+    syndromes : list of `~.codes.elements.AncillaQubit`
+        Property for all ancilla-qubits that are a syndrome, ordered by layer and index.
+
+    flipped_edges : list of `~.codes.elements.Edge`
+        Edges of which the state has changed since the last measurement. See `measure_flipped`.
+
+    decode_layer : int
+        Layer on which the decoders apply the corrections of the data-qubits.
+
+    correct_layers : bool
+        Whether the decoders apply every correction on the layer where it is found instead of on ``self.decode_layer``. Set while a window of `~.codes._template.sim.FaultyMeasurements.random_errors_stream` is decoded.
+
+    instance : int
+        Integer epoch that is renewed by `new_instance` every time `random_errors` is called. Helps with identifying a 'round' of simulation when using class attributes.
+
+    arrays : `~.codes.arrays.LatticeArrays` or None
+        Array storage of the lattice if ``array_backend`` is enabled.
+
+    decoder_tables : dict
+        Static decoder tables loaded from a snapshot by `load_snapshot`, keyed by the short name of the decoder.
+
+    data_list, ancilla_list, pseudo_list : dict of list
+        The qubits of each layer ordered by their dense integer id ``qubit.index``, such that ``self.data_list[z][i]`` is the data-qubit with index ``i`` on layer ``z``. The nested dictionaries ``self.data_qubits`` etc. are keyed by coordinates on top of these lists.
+
+    edge_list : dict of list
+        The edges of the data-qubits of each layer, where the edge of type ``t`` of the data-qubit with index ``i`` is at position ``t * num_data + i``, equal to the columns of `parity_check_matrix`.
+
+    locs : dict of `~numpy.ndarray`
+        Coordinates of the ``"data"``, ``"ancilla"`` and ``"pseudo"`` qubits of a layer, ordered by index. See `init_index`.
+
+    index_grid : dict of `~numpy.ndarray`
+        Index of the ``"data"``, ``"ancilla"`` and ``"pseudo"`` qubits of a layer on a grid of doubled coordinates, or -1 if there is no qubit. See `get_index`.
+
+    bulk : `~.codes.bulk.BulkLattice` or None
+        Array description of the lattice if it is built by `init_bulk`.
+
+    rng : `~numpy.random.Generator`
+        Random number generator of the bulk error path, see ``bulk_errors``. Seeded by `~.main.run`.
     """
 
     _DataQubit = DataQubit
     _AncillaQubit = AncillaQubit
     _PseudoQubit = PseudoQubit
     _Edge = Edge
+    element_names = ["_DataQubit", "_AncillaQubit", "_PseudoQubit", "_Edge", "_PseudoEdge"]
+    lattice_names = [
+        "data_qubits",
+        "ancilla_qubits",
+        "pseudo_qubits",
+        "logical_operators",
+        "flipped_edges",
+        "_syndromes",
+        "_nontrivial",
+        "arrays",
+        "data_list",
+        "ancilla_list",
+        "pseudo_list",
+        "edge_list",
+        "locs",
+        "index_grid",
+        "index_offset",
+        "instance",
+    ]
+    lazy_names = [
+        "data_qubits",
+        "ancilla_qubits",
+        "pseudo_qubits",
+        "data_list",
+        "ancilla_list",
+        "pseudo_list",
+        "edge_list",
+        "logical_operators",
+    ]
     name = "template"
     x_names = ["x", "X", 0, "bitflip"]
     z_names = ["z", "Z", 1, "phaseflip"]
@@ -61,30 +165,69 @@ class PerfectMeasurements(ABC):
     def __init__(
         self,
         size: Union[int, Tuple[int, int]],
+        array_backend: bool = False,
+        compact: bool = False,
+        lazy: bool = False,
+        bulk_errors: bool = False,
+        sparse_errors: bool = False,
         **kwargs,
     ):
         self.layer = 0
         self.layers = 1
         self.decode_layer = 0
+        self.correct_layers = False
         self.size = size if type(size) == tuple else (size, size)
         self.no_error = True
-        self.ancilla_qubits = {}
-        self.data_qubits = {}
-        self.pseudo_qubits = defaultdict(dict)
+        self.init_containers()
+        self.locs = {}
+        self.index_grid = {}
+        self.index_offset = (0, 0)
         self.errors = {}
-        self.logical_operators = {}
-        self.instance = time.time()
+        self.lazy = lazy
+        self.bulk = None
+        self._bulk_kwargs = {}
+        self.bulk_errors = bulk_errors or sparse_errors
+        self.sparse_errors = sparse_errors
+        self.rng = numpy.random.default_rng()
+        self.instance = new_instance()
+        self.flipped_edges = []
+        self._syndromes = {}
+        self._nontrivial = defaultdict(dict)
+        self.array_backend = array_backend
+        self.arrays = None
+        self.decoder_tables = {}
+        if array_backend:
+            self._Edge = ArrayEdge
+            self._AncillaQubit = ArrayAncillaQubit
+        self.compact = compact
+        for name in self.element_names:
+            if hasattr(self, name):
+                setattr(self, name, element_class(getattr(self, name), compact))
+
+    def __getattr__(self, name):
+        if name in type(self).lazy_names and self.__dict__.get("bulk") is not None:
+            self.materialize()
+            return getattr(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @property
+    def materialized(self) -> bool:
+        """Whether the elements of the lattice exist, see `materialize`."""
+        return "data_qubits" in self.__dict__
 
     @property
     def logical_state(self) -> Tuple[List[bool], bool]:
         # Loop over logical operators to find current state
-        logical_state = {}
-        for key, operator in self.logical_operators.items():
-            state = 0
-            for ancilla_qubit in operator:
-                if ancilla_qubit.state:
-                    state = 1 - state
-            logical_state[key] = state
+        if self.arrays is not None:
+            logical_state = self.arrays.logical_state(self.decode_layer)
+        else:
+            logical_state = {}
+            for key, operator in self.logical_operators.items():
+                state = 0
+                for ancilla_qubit in operator:
+                    if ancilla_qubit.state:
+                        state = 1 - state
+                logical_state[key] = state
 
         # Compare with previous logical state to find error
         if hasattr(self, "prev_logical_state"):
@@ -99,14 +242,42 @@ class PerfectMeasurements(ABC):
 
     @property
     def trivial_ancillas(self):
-        for ancilla in self.ancilla_qubits[self.decode_layer].values():
-            if ancilla.state:
-                return False
-        return True
+        if self.arrays is not None:
+            return not self.arrays.measure(self.decode_layer).any()
+        self.measure_flipped()
+        return not self._nontrivial[self.decode_layer]
+
+    @property
+    def syndromes(self) -> List[AncillaQubit]:
+        if self.arrays is not None:
+            return [self.ancilla_list[z][i] for z, i in zip(*self.arrays.syndrome.nonzero())]
+        return sorted(self._syndromes, key=lambda ancilla: (ancilla.z, ancilla.index))
 
     def __repr__(self):
         return f"<{self.name} {self.size} {self.__class__.__name__}>"
 
+    def parity_check_matrix(self, state_type: Optional[str] = None) -> sparse.csr_matrix:
+        """Returns the parity-check matrix of a single layer of the code.
+
+        The matrix is derived from ``AncillaQubit.parity_qubits`` and cached per geometry, see `~.codes.arrays.lattice_matrices`.
+
+        Parameters
+        ----------
+        state_type
+            If ``"x"`` or ``"z"``, only the parity checks of the ancilla-qubits of this type are returned, acting on the edges of the same type. The rows are ordered by ``AncillaQubit.index`` and the columns by ``DataQubit.index``. If ``None``, all parity checks are returned, acting on the flattened edge states of the layer.
+        """
+        parity_check, _ = lattice_matrices(self)
+        if state_type is None:
+            return parity_check
+        t = LatticeArrays.state_types.index(state_type)
+        num_data = parity_check.shape[1] // 2
+        rows = [ancilla.index for ancilla in self.ancilla_qubits[0].values() if ancilla.state_type == state_type]
+        return parity_check[sorted(rows)][:, t * num_data : (t + 1) * num_data]
+
+    def logical_matrix(self) -> sparse.csr_matrix:
+        """Returns the matrix of the logical operators in ``self.logical_operators``, acting on the flattened edge states of a single layer. See `~.codes.arrays.lattice_matrices`."""
+        return lattice_matrices(self)[1]
+
     """
     ----------------------------------------------------------------------------------------
                                         Initialization
@@ -116,10 +287,16 @@ class PerfectMeasurements(ABC):
     def initialize(self, *args, **kwargs):
         """Initializes all data objects of the code.
 
-        Builds the surface with `init_surface`, adds the logical operators with `init_logical_operator`, and loads error modules with `init_errors`. All keyword arguments from these methods can be used for `initialize`.
+        Builds the surface with `init_surface`, adds the logical operators with `init_logical_operator`, builds the coordinate and index tables with `init_index`, and loads error modules with `init_errors`. If ``lazy`` is enabled, the lattice is instead built as arrays by `init_bulk`. If ``array_backend`` is enabled, the lattice is bound to its array storage by `init_arrays`. All keyword arguments from these methods can be used for `initialize`.
         """
-        self.init_surface(**kwargs)
-        self.init_logical_operator(**kwargs)
+        if self.lazy:
+            self.init_bulk(**kwargs)
+        else:
+            self.init_surface(**kwargs)
+            self.init_logical_operator(**kwargs)
+        self.init_index()
+        if self.array_backend:
+            self.init_arrays(**kwargs)
         self.init_errors(*args, **kwargs)
 
     @abstractmethod
@@ -132,6 +309,268 @@ class PerfectMeasurements(ABC):
         """Initiates the logical operators."""
         pass
 
+    def init_containers(self):
+        """Sets the empty containers of the elements of the lattice, which are filled by `init_surface` or `materialize`."""
+        self.ancilla_qubits = {}
+        self.data_qubits = {}
+        self.pseudo_qubits = defaultdict(dict)
+        self.data_list = defaultdict(list)
+        self.ancilla_list = defaultdict(list)
+        self.pseudo_list = defaultdict(list)
+        self.edge_list = {}
+        self.logical_operators = {}
+
+    def bulk_surface(self) -> BulkLattice:
+        """Returns the array description of a layer of the surface, with the qubits in the same order as `init_surface`."""
+        raise NotImplementedError(f"The {self.name} code has no bulk constructor.")
+
+    def init_bulk(self, **kwargs):
+        """Builds the lattice as arrays with `bulk_surface`, stored at ``self.bulk``, without creating any elements.
+
+        The attributes in ``self.lazy_names`` are removed, such that the elements are created by `materialize` when any of these attributes is first accessed. Matrices, index tables and the array storage of the lattice are derived from ``self.bulk`` without materializing. Keyword arguments, such as the ``initial_states`` of the data-qubits, are stored and passed on to the constructors of the elements.
+        """
+        self.bulk = self.bulk_surface()
+        self._bulk_kwargs = kwargs
+        for name in self.lazy_names:
+            self.__dict__.pop(name, None)
+
+    def materialize(self):
+        """Creates the elements of the lattice described by ``self.bulk``.
+
+        The elements are added by the same constructors and in the same order as by `init_surface` and `init_logical_operator`, such that the materialized lattice equals a lattice that is built element by element. Random initial states are drawn when the lattice is materialized.
+        """
+        self.init_containers()
+        for z in range(self.layers):
+            self.materialize_layer(z, **self._bulk_kwargs)
+        layer = self.data_list[self.decode_layer]
+        self.logical_operators = {
+            name: [layer[i].edges[self.bulk.logical_types[name]] for i in data.tolist()]
+            for name, data in self.bulk.logical_data.items()
+        }
+        self.init_edge_list()
+        if self.arrays is not None:
+            self.arrays.bind(self)
+
+    def materialize_layer(self, z: float = 0, **kwargs):
+        """Creates the elements of layer ``z`` of the lattice described by ``self.bulk``."""
+        bulk = self.bulk
+        self.ancilla_qubits[z], self.data_qubits[z] = {}, {}
+        if bulk.num_pseudo:
+            self.pseudo_qubits[z] = {}
+        data = [self.add_data_qubit(as_loc(loc), z=z, **kwargs) for loc in bulk.data_locs.tolist()]
+        state_types = LatticeArrays.state_types
+        indptr, node_data, node_keys = bulk.node_indptr.tolist(), bulk.node_data.tolist(), bulk.node_keys.tolist()
+        for i, (loc, t, pseudo) in enumerate(zip(bulk.node_locs.tolist(), bulk.node_types.tolist(), bulk.node_pseudo.tolist())):
+            add_qubit = self.add_pseudo_qubit if pseudo else self.add_ancilla_qubit
+            qubit = add_qubit(as_loc(loc), z=z, state_type=state_types[t], **kwargs)
+            for j in range(indptr[i], indptr[i + 1]):
+                self.entangle_pair(data[node_data[j]], qubit, bulk.keys[node_keys[j]])
+
+    def get_boundary_pseudo(self, ancilla: AncillaQubit) -> Optional[PseudoQubit]:
+        """Returns the closest `~.codes.elements.PseudoQubit` in the boundary of the code to ``ancilla``, or ``None`` if the code has no boundary."""
+        return None
+
+    def init_index(self):
+        """Builds the tables between the coordinates and the integer ids of the qubits.
+
+        Every qubit has a dense integer id ``qubit.index`` in its layer, with which it is found in ``self.data_list``, ``self.ancilla_list`` and ``self.pseudo_list``. This method stores the flattened edges of each layer at ``self.edge_list`` (see `init_edge_list`), the coordinates of the qubits of a layer by id at ``self.locs``, and the reverse mapping at ``self.index_grid``. The grid is indexed by the doubled coordinates of a qubit, shifted by ``self.index_offset``, see `get_index`.
+        """
+        if self.bulk is not None:
+            for kind in ["data", "ancilla", "pseudo"]:
+                self.locs[kind] = self.bulk.locs(kind)
+        else:
+            self.init_edge_list()
+            qubit_lists = dict(data=self.data_list, ancilla=self.ancilla_list, pseudo=self.pseudo_list)
+            for kind, qubits in qubit_lists.items():
+                layer = qubits.get(0, [])
+                self.locs[kind] = numpy.array([qubit.loc for qubit in layer], dtype=float).reshape(-1, 2)
+        points = numpy.rint(2 * numpy.concatenate(list(self.locs.values()))).astype(int)
+        low, high = points.min(axis=0), points.max(axis=0)
+        self.index_offset = tuple(int(i) for i in -low)
+        for kind, locs in self.locs.items():
+            grid = numpy.full(high - low + 1, -1, dtype=numpy.intp)
+            grid_points = numpy.rint(2 * locs).astype(int) - low
+            grid[grid_points[:, 0], grid_points[:, 1]] = numpy.arange(len(locs))
+            self.index_grid[kind] = grid
+
+    def init_edge_list(self):
+        """Stores the flattened edges of the data-qubits of each layer at ``self.edge_list``."""
+        for z, layer in self.data_list.items():
+            self.edge_list[z] = [data_qubit.edges[t] for t in LatticeArrays.state_types for data_qubit in layer]
+
+    def get_index(self, kind: str, loc) -> Union[int, numpy.ndarray]:
+        """Returns the index of the qubit of ``kind`` at ``loc`` in a layer, or -1 if there is none.
+
+        Parameters
+        ----------
+        kind
+            One of ``"data"``, ``"ancilla"`` or ``"pseudo"``.
+        loc
+            Coordinates ``(x, y)`` or an array of coordinates of shape ``(n, 2)``.
+        """
+        grid = self.index_grid[kind]
+        points = numpy.rint(2 * numpy.asarray(loc, dtype=float)).astype(int) + self.index_offset
+        inside = numpy.all((points >= 0) & (points < grid.shape), axis=-1)
+        points = numpy.where(inside[..., None], points, 0)
+        index = numpy.where(inside, grid[points[..., 0], points[..., 1]], -1)
+        return int(index) if index.ndim == 0 else index
+
+    def init_arrays(self, **kwargs):
+        """Initializes the array storage of the lattice at ``self.arrays``. See `~.codes.arrays.LatticeArrays`."""
+        self.arrays = LatticeArrays(self, **kwargs)
+
+    def dump_lattice(self, tables: Optional[dict] = None) -> bytes:
+        """Serializes the lattice of an initialized code.
+
+        The lattice consists of all elements and the attributes of the code listed in ``self.lattice_names``. Error modules are not included. The lattice can be loaded into an uninitialized code of the same class, size and element classes by `load_lattice`. See `~.codes.elements.dumps_elements`.
+
+        Parameters
+        ----------
+        tables
+            Additional objects that refer to the elements, such as the static tables of a decoder, which are serialized with the lattice and returned by `load_lattice`.
+        """
+        elements = []
+        for layer in [*self.data_qubits.values(), *self.ancilla_qubits.values(), *self.pseudo_qubits.values()]:
+            for qubit in layer.values():
+                elements.append(qubit)
+                elements += getattr(qubit, "edges", {}).values()
+                for edge in getattr(qubit, "z_neighbors", {}).values():
+                    if edge.qubit is qubit:
+                        elements.append(edge)
+        return dumps_elements(elements, ({name: getattr(self, name) for name in self.lattice_names}, tables))
+
+    def load_lattice(self, data: bytes, initial_states: Tuple[float, float] = (None, None), **kwargs) -> Optional[dict]:
+        """Initializes the lattice from data serialized by `dump_lattice`, instead of by `init_surface` and `init_logical_operator`.
+
+        The data-qubits are reinitialized with ``initial_states`` by `reinitialize_lattice`. The instance of the code is renewed past the instance of the serialized lattice, such that any state stamped on its elements is invalid. The error modules must still be loaded by `init_errors`.
+
+        Parameters
+        ----------
+        data
+            Serialized lattice.
+        initial_states
+            Initial states of the data-qubits.
+
+        Returns
+        -------
+        dict or None
+            The ``tables`` serialized with the lattice.
+        """
+        lattice, tables = loads_elements(data)
+        for name, value in lattice.items():
+            setattr(self, name, value)
+        self.instance = new_instance(after=self.instance)
+        self.reinitialize_lattice(initial_states=initial_states)
+        return tables
+
+    def copy_lattice(self, code: "PerfectMeasurements", **kwargs):
+        """Initializes the lattice as a copy of the lattice of the initialized ``code``. See `load_lattice`."""
+        self.load_lattice(code.dump_lattice(), **kwargs)
+
+    def snapshot_header(self) -> dict:
+        """Returns the properties of the code that a lattice snapshot must match to be loaded, see `save_snapshot`."""
+        return dict(
+            code=f"{type(self).__module__}.{type(self).__qualname__}",
+            size=self.size,
+            layers=self.layers,
+            array_backend=self.array_backend,
+            compact=self.compact,
+        )
+
+    def save_snapshot(self, path: Union[str, Path], decoders: list = []):
+        """Saves the lattice of the initialized code to a binary snapshot file.
+
+        The snapshot contains the lattice serialized by `dump_lattice`, the parity-check and logical matrices of `~.codes.arrays.lattice_matrices` as raw index arrays, and the static tables of ``decoders`` (see `~.decoders._template.Sim.save_snapshot`). All arrays are stored such that they are memory-mapped on load by `load_snapshot`. See `~.codes.snapshot.write_snapshot` for the file format.
+
+        The lattice is serialized by `~.codes.elements.dumps_elements`, which requires Python 3.8 or later, such that snapshots can only be written and read from Python 3.8 onwards.
+
+        Parameters
+        ----------
+        path
+            File to write.
+        decoders
+            Decoders of this code of which the static tables are included in the snapshot.
+        """
+        header = self.snapshot_header()
+        header["decoders"] = [decoder.short for decoder in decoders]
+        arrays, tables = {}, {}
+        for name, matrix in zip(["parity_check", "logical"], lattice_matrices(self)):
+            arrays.update({f"{name}/indptr": matrix.indptr, f"{name}/indices": matrix.indices})
+            header[f"{name}_shape"] = matrix.shape
+        for decoder in decoders:
+            tables[decoder.short] = {name: getattr(decoder, name) for name in decoder.snapshot_names}
+            arrays.update({f"{decoder.short}/{name}": getattr(decoder, name) for name in decoder.snapshot_arrays})
+        write_snapshot(path, header, self.dump_lattice(tables), arrays)
+
+    def load_snapshot(self, path: Union[str, Path], mmap: bool = True, **kwargs):
+        """Initializes the lattice from a snapshot file written by `save_snapshot`, instead of by `init_surface` and `init_logical_operator`.
+
+        The snapshot must be saved by a code of the same class, size, number of layers and element classes. The matrices of the snapshot are added to the cache of `~.codes.arrays.lattice_matrices`, and the decoder tables are stored at ``self.decoder_tables``, from which they are loaded by decoders of the same type that are initialized on this code. The error modules must still be loaded by `init_errors`.
+
+        Parameters
+        ----------
+        path
+            Snapshot file to read.
+        mmap
+            Memory-map the arrays of the snapshot instead of reading them into memory.
+        kwargs
+            Keyword arguments are passed on to `load_lattice`.
+        """
+        header, lattice, arrays = read_snapshot(path, mmap=mmap)
+        expected = self.snapshot_header()
+        for key, value in expected.items():
+            if header[key] != value:
+                raise ValueError(f"Snapshot {path} has {key}={header[key]}, expected {key}={value}.")
+
+        matrices = []
+        for name in ["parity_check", "logical"]:
+            indices = arrays[f"{name}/indices"]
+            data = numpy.ones(len(indices), dtype=numpy.uint8)
+            matrices.append(sparse.csr_matrix((data, indices, arrays[f"{name}/indptr"]), shape=header[f"{name}_shape"]))
+        matrix_cache[matrix_key(self)] = tuple(matrices)
+
+        tables = self.load_lattice(lattice, **kwargs) or {}
+        for short in header["decoders"]:
+            prefix = f"{short}/"
+            tables[short].update({name[len(prefix) :]: array for name, array in arrays.items() if name.startswith(prefix)})
+        self.decoder_tables = tables
+
+    def reinitialize_lattice(self, initial_states: Tuple[float, float] = (None, None), **kwargs):
+        """Reinitializes all data-qubits to ``initial_states``.
+
+        Random initial states are drawn in the same order as during `init_surface`, such that a reinitialized lattice is equal to a newly built lattice for the same random seed.
+        """
+        for layer in self.data_qubits.values():
+            for data_qubit in layer.values():
+                data_qubit._reinitialize(initial_states=initial_states)
+
+    def clear_lattice(self):
+        """Resets the lattice to the trivial state, independent of any previous simulation.
+
+        The edges of all layers are set to the trivial state, all measurements and syndromes are cleared, including the syndromes of the pseudo-qubits that are left by the decoders, and the previous logical state is set to the trivial logical state. The instance of the code is renewed, which invalidates the erasure mask and all state stamped on the elements by the decoders. See `~.main.run`, which clears the lattice at the start of every chunk of iterations.
+        """
+        self.instance = new_instance()
+        if self.arrays is not None:
+            for states in [self.arrays.states, self.arrays.measured_state, self.arrays.syndrome, self.arrays.measurement_error]:
+                states[:] = False
+        else:
+            for z in range(self.layers):
+                for edge in self.edge_list[z]:
+                    edge.state = False
+                for ancilla in self.ancilla_list[z]:
+                    ancilla.measured_state = False
+                    ancilla.syndrome = False
+                    ancilla.measurement_error = False
+        if self.materialized:
+            for layer in self.pseudo_qubits.values():
+                for pseudo in layer.values():
+                    pseudo.syndrome = False
+            for ancilla in self.ancilla_list[0]:
+                for edge in ancilla.z_neighbors.values():
+                    edge.state = False
+        self.flipped_edges.clear()
+        self.logical_state
+
     def init_errors(self, *error_modules: Union[str, Error], error_rates: dict = {}, **kwargs):
         """Initializes error modules.
 
@@ -189,10 +628,15 @@ class PerfectMeasurements(ABC):
         initial_states
             Initial state for the data-qubit.
         """
-        data_qubit = self._DataQubit(loc, z, **kwargs)
-        data_qubit.edges["x"] = self._Edge(data_qubit, "x", initial_state=initial_states[0], **kwargs)
-        data_qubit.edges["z"] = self._Edge(data_qubit, "z", initial_state=initial_states[1], **kwargs)
+        data_qubit = self._DataQubit(loc, z, index=len(self.data_list[z]), **kwargs)
+        data_qubit.edges["x"] = self._Edge(
+            data_qubit, "x", initial_state=initial_states[0], flipped=self.flipped_edges, **kwargs
+        )
+        data_qubit.edges["z"] = self._Edge(
+            data_qubit, "z", initial_state=initial_states[1], flipped=self.flipped_edges, **kwargs
+        )
         self.data_qubits[z][loc] = data_qubit
+        self.data_list[z].append(data_qubit)
         return data_qubit
 
     def add_ancilla_qubit(
@@ -203,8 +647,17 @@ class PerfectMeasurements(ABC):
         **kwargs,
     ) -> AncillaQubit:
         """Initializes a `~.codes.elements.AncillaQubit` and saved to ``self.ancilla_qubits[z][loc]``."""
-        ancilla_qubit = self._AncillaQubit(loc, z, state_type=state_type, **kwargs)
+        ancilla_qubit = self._AncillaQubit(
+            loc,
+            z,
+            state_type=state_type,
+            index=len(self.ancilla_list[z]),
+            syndromes=self._syndromes,
+            nontrivial=self._nontrivial[z],
+            **kwargs,
+        )
         self.ancilla_qubits[z][loc] = ancilla_qubit
+        self.ancilla_list[z].append(ancilla_qubit)
         return ancilla_qubit
 
     def add_pseudo_qubit(
@@ -215,8 +668,9 @@ class PerfectMeasurements(ABC):
         **kwargs,
     ) -> PseudoQubit:
         """Initializes a `~.codes.elements.PseudoQubit` and saved to ``self.pseudo_qubits[z][loc]``."""
-        pseudo_qubit = self._PseudoQubit(loc, z, state_type=state_type, **kwargs)
+        pseudo_qubit = self._PseudoQubit(loc, z, state_type=state_type, index=len(self.pseudo_list[z]), **kwargs)
         self.pseudo_qubits[z][loc] = pseudo_qubit
+        self.pseudo_list[z].append(pseudo_qubit)
         return pseudo_qubit
 
     @staticmethod
@@ -254,23 +708,66 @@ class PerfectMeasurements(ABC):
     def random_errors(self, apply_order: Optional[List[str]] = None, measure: bool = True, **kwargs):
         """Applies all errors loaded in ``self.errors`` attribute to layer ``z``.
 
-        The random error is applied for each loaded error module by calling `~.errors._template.Sim.random_error`. If ``apply_order`` is specified, the error modules are applied in order of the error names in the list. If no order is specified, the errors are applied in a random order. Addionally, any error rate can set by supplying the rate as a keyword argument e.g. ``p_bitflip = 0.1``.
+        The loaded error modules are compiled into an `~.errors._template.ErrorPlan`, which resolves the error rates once and applies the random errors of all modules that act per qubit in a single pass over the data-qubits, or by `~.errors._template.Sim.random_errors_bulk` if ``bulk_errors`` is enabled. If ``apply_order`` is specified, the error modules are applied in order of the error names in the list. If no order is specified, the errors are applied in the order in which the modules are loaded. Addionally, any error rate can set by supplying the rate as a keyword argument e.g. ``p_bitflip = 0.1``.
 
         Parameters
         ----------
         apply_order
             The order in which the error modules are applied. Items in the list must equal keys in ``self.errors`` or the names of the loaded error modules.
         measure
-            Measure ancilla qubits after errors have been simulated.
+            Measure ancilla qubits after errors have been simulated. Only the ancilla-qubits connected to flipped edges are measured, see `measure_flipped`.
+
+        """
+        self.instance = new_instance()
+        ordered_errors = [self.errors[name] for name in apply_order] if apply_order else list(self.errors.values())
+        ErrorPlan(ordered_errors, bulk=self.bulk_errors, **kwargs).apply(self, self.layer)
+        if measure:
+            self.measure_layer()
+
+    def random_errors_weight(self, weight: int, error: Optional[str] = None, measure: bool = True, **kwargs):
+        """Applies exactly ``weight`` faults of a single error module to layer ``z``.
+
+        The faults are placed uniformly over the fault locations of the module by `~.errors._template.Sim.random_errors_weight`, see `~.main.run_fixed_weight`. The error rates are supplied as keyword arguments, of which only the nonzero rates select the fault locations.
 
+        Parameters
+        ----------
+        weight
+            Number of faults.
+        error
+            Name of the error module in ``self.errors``, which may be omitted if a single module is loaded.
+        measure
+            Measure ancilla qubits after errors have been simulated.
         """
-        self.instance = time.time()
-        ordered_errors = [self.errors[name] for name in apply_order] if apply_order else self.errors.values()
-        for error_class in ordered_errors:
-            for qubit in self.data_qubits[self.layer].values():
-                error_class.random_error(qubit, **kwargs)
+        self.instance = new_instance()
+        if error is None:
+            (error,) = self.errors
+        self.errors[error].random_errors_weight(weight, self.layer, **kwargs)
         if measure:
-            for ancilla in self.ancilla_qubits[self.layer].values():
+            self.measure_layer()
+
+    def measure_layer(self):
+        """Measures the ancilla-qubits of the current layer after errors have been applied.
+
+        With the array backend, all ancilla-qubits of the layer are measured at once. Otherwise, only the ancilla-qubits connected to flipped edges are measured, see `measure_flipped`.
+        """
+        if self.arrays is not None:
+            self.arrays.measure(self.layer)
+            self.flipped_edges.clear()
+        else:
+            self.measure_flipped()
+
+    def measure_flipped(self):
+        """Measures the ancilla-qubits connected to the edges in ``self.flipped_edges``.
+
+        Every edge appends itself to ``self.flipped_edges`` when its state changes. The parity of all other ancilla-qubits is unchanged since their last measurement, such that only the ancilla-qubits connected to flipped edges need to be measured again. The list of flipped edges is cleared afterwards.
+        """
+        ancillas = {}
+        for edge in self.flipped_edges:
+            for ancilla in edge.nodes:
+                ancillas[ancilla] = None
+        self.flipped_edges.clear()
+        for ancilla in ancillas:
+            if not isinstance(ancilla, PseudoQubit):
                 ancilla.measure()
 
     @staticmethod
@@ -316,6 +813,7 @@ class FaultyMeasurements(PerfectMeasurements):
         else:
             self.layers = max(size) if type(size) == tuple else size
         self.decode_layer = self.layers - 1
+        self.round = 0
         self.default_faulty_measurements = dict(p_bitflip_plaq=p_bitflip_plaq, p_bitflip_star=p_bitflip_star)
 
     """
@@ -351,13 +849,22 @@ class FaultyMeasurements(PerfectMeasurements):
         super().init_surface(z=0, **kwargs)
         for z in range(1, self.layers):
             super().init_surface(z=z, **kwargs)
-            for upper in self.ancilla_qubits[z].values():
-                lower = self.ancilla_qubits[z - 1][upper.loc]
+            for lower, upper in zip(self.ancilla_list[z - 1], self.ancilla_list[z]):
                 self.add_vertical_edge(lower, upper)
-        for lower in self.ancilla_qubits[self.layers - 1].values():
-            upper = self.ancilla_qubits[0][lower.loc]
+        for lower, upper in zip(self.ancilla_list[self.layers - 1], self.ancilla_list[0]):
             self.add_vertical_edge(lower, upper)
 
+    def materialize_layer(self, z: float = 0, **kwargs):
+        """Creates the elements of layer ``z`` of the lattice described by ``self.bulk``.
+
+        After the final layer, the ancilla-qubits of all layers are connected by the vertical edges of `~.codes.bulk.BulkLattice.vertical_edges`, which are in the same order as in `init_surface`.
+        """
+        super().materialize_layer(z, **kwargs)
+        if z == self.layers - 1:
+            for lower, index in zip(*(edges.tolist() for edges in self.bulk.vertical_edges(self.layers))):
+                upper = (lower + 1) % self.layers
+                self.add_vertical_edge(self.ancilla_list[lower][index], self.ancilla_list[upper][index])
+
     def add_vertical_edge(
         self,
         lower_ancilla: AncillaQubit,
@@ -381,6 +888,17 @@ class FaultyMeasurements(PerfectMeasurements):
         lower_ancilla.z_neighbors[upper_ancilla] = pseudo_edge
         pseudo_edge.nodes = [upper_ancilla, lower_ancilla]
 
+    def reinitialize_lattice(self, initial_states: Tuple[float, float] = (None, None), **kwargs):
+        # Inherited docstring
+        for z in range(self.layers):
+            for data_qubit in self.data_qubits[z].values():
+                data_qubit._reinitialize(initial_states=initial_states)
+            if z:
+                for lower, upper in zip(self.ancilla_list[z - 1], self.ancilla_list[z]):
+                    upper.z_neighbors[lower]._reinitialize()
+        for lower, upper in zip(self.ancilla_list[self.layers - 1], self.ancilla_list[0]):
+            lower.z_neighbors[upper]._reinitialize()
+
     """
     ----------------------------------------------------------------------------------------
                                         Measurement
@@ -396,6 +914,8 @@ class FaultyMeasurements(PerfectMeasurements):
 
         """Performs a round of parity measurements on layer `z` with faulty measurements.
 
+        Every layer of the lattice is simulated once, with perfect measurements on the final layer, such that the lattice holds the final window of a stream of ``self.layers`` rounds. See `random_errors_stream`.
+
         Parameters
         ----------
         p_bitflip_plaq : int or float, optional
@@ -403,19 +923,266 @@ class FaultyMeasurements(PerfectMeasurements):
         p_bitflip_star : int or float, optional
             Probability of a bitflip during a parity check measurement on star operators (ZZZZ).
         """
+        for _ in self.random_errors_stream(self.layers, p_bitflip_plaq, p_bitflip_star, **kwargs):
+            pass
+
+    def random_errors_stream(
+        self,
+        rounds: int,
+        p_bitflip_plaq: Optional[float] = None,
+        p_bitflip_star: Optional[float] = None,
+        commit: Optional[int] = None,
+        **kwargs,
+    ) -> Iterator[int]:
+        """Streams a memory experiment of ``rounds`` rounds of errors and faulty measurements through a sliding window of the layers of the lattice.
+
+        The ``self.layers`` layers hold a window of the most recent rounds, such that the number of rounds is not limited by the number of layers, and memory does not grow with ``rounds``. The rounds are simulated by `random_errors_layer` and `random_measure_layer`, which take the state and measurements of the previous round from the layer below, or at once by `random_errors_window` if the loaded error modules support it, see `layered_errors`. Every time the window is full, the number of rounds simulated so far is yielded, and the window must be decoded before the generator is resumed.
+
+        Only the last round of the stream is measured perfectly. Until then, a window holds ``self.layers - 1`` rounds, and is closed by a virtual round on the final layer that repeats the newest measurements, see `close_window`. The window is decoded with ``self.correct_layers`` set, such that the decoder applies every correction on the layer where it is found. Only the corrections on the oldest ``commit`` layers are kept by `commit_window`, which applies them to the buffered rounds and shifts these down to the bottom of the window. The syndromes that are not resolved by the committed corrections, such as the end of a chain of measurement errors or of an error chain through the buffer, reappear on the first buffered round, and are decoded again in the next window together with the new rounds. The final window holds the remaining rounds, of which the last is measured perfectly, and is decoded onto ``self.decode_layer`` as after `random_errors`.
+
+        Parameters
+        ----------
+        rounds
+            Number of measurement rounds.
+        p_bitflip_plaq : int or float, optional
+            Probability of a bitflip during a parity check measurement on plaquette operators (XXXX).
+        p_bitflip_star : int or float, optional
+            Probability of a bitflip during a parity check measurement on star operators (ZZZZ).
+        commit
+            Number of rounds that are committed per window, by default half of the ``self.layers - 1`` rounds of a window. The other rounds of a window form its buffer.
+        kwargs
+            Keyword arguments are passed on to `random_errors_layer`.
+
+        Examples
+        --------
+        Decode a memory experiment of 1000 rounds with a window of 7 layers, of which 3 rounds are committed per window.
+
+            >>> code, decoder = initialize((5,5), "toric", "unionfind", enabled_errors=["pauli"], faulty_measurements=True, layers=7)
+            >>> for _ in code.random_errors_stream(1000, p_bitflip=0.01, p_bitflip_plaq=0.01, commit=3):
+            ...     decoder.decode()
+        """
         if p_bitflip_plaq is None:
             p_bitflip_plaq = self.default_faulty_measurements["p_bitflip_plaq"]
         if p_bitflip_star is None:
             p_bitflip_star = self.default_faulty_measurements["p_bitflip_star"]
-        for ancilla in self.ancilla_qubits[self.layers - 1].values():
+        layers = self.layers
+        if commit is None:
+            commit = max(1, (layers - 1) // 2)
+        if rounds > layers and not 0 < commit < layers:
+            raise ValueError(f"Cannot commit {commit} of the {layers - 1} rounds of a window of {layers} layers.")
+
+        self.round, filled = 0, 0
+        self.correct_layers = False
+        for ancilla in self.ancilla_list[layers - 1]:
             ancilla.measured_state = False
-        for z in range(self.layers - 1):
+        while rounds - self.round > layers - filled:
+            self.random_errors_rounds(rounds - self.round, filled, layers - 1, p_bitflip_plaq, p_bitflip_star, **kwargs)
+            self.close_window()
+            window = self.window_state()
+            self.correct_layers = True
+            try:
+                yield self.round
+            finally:
+                self.correct_layers = False
+            filled = self.commit_window(commit, window)
+        if rounds > self.round:
+            self.random_errors_rounds(rounds - self.round, filled, layers, p_bitflip_plaq, p_bitflip_star, **kwargs)
+            yield self.round
+
+    def random_errors_rounds(
+        self, rounds: int, start: int, stop: int, p_bitflip_plaq: float = 0, p_bitflip_star: float = 0, **kwargs
+    ):
+        """Simulates the next rounds of `random_errors_stream` on the layers ``start`` up to ``stop``.
+
+        Errors are applied on the first ``min(rounds, stop - start)`` layers. If all ``rounds`` fit, the final round is measured perfectly, and the remaining layers are filled up with perfectly measured rounds without errors.
+
+        Parameters
+        ----------
+        rounds
+            Number of remaining rounds.
+        start, stop
+            Range of layers to simulate.
+        p_bitflip_plaq
+            Probability of a bitflip during a parity check measurement on plaquette operators (XXXX).
+        p_bitflip_star
+            Probability of a bitflip during a parity check measurement on star operators (ZZZZ).
+        kwargs
+            Keyword arguments are passed on to `random_errors_layer`.
+        """
+        if self.layered_errors:
+            self.random_errors_window(rounds, p_bitflip_plaq, p_bitflip_star, start=start, stop=stop, **kwargs)
+            return
+        for i, z in enumerate(range(start, stop)):
             self.layer = z
-            self.random_errors_layer(**kwargs)
-            self.random_measure_layer(p_bitflip_plaq=p_bitflip_plaq, p_bitflip_star=p_bitflip_star)
-        self.layer = self.layers - 1
-        self.random_errors_layer(**kwargs)
-        self.random_measure_layer()
+            if i < rounds:
+                self.random_errors_layer(**kwargs)
+            else:
+                self.copy_previous_layer()
+            if i < rounds - 1:
+                self.random_measure_layer(p_bitflip_plaq=p_bitflip_plaq, p_bitflip_star=p_bitflip_star)
+            else:
+                self.random_measure_layer()
+        self.round += min(rounds, stop - start)
+
+    @property
+    def layered_errors(self) -> bool:
+        """Whether a window of rounds is simulated on all layers at once by `random_errors_window`, which requires the array backend, ``bulk_errors`` and error modules that implement `~.errors._template.Sim.random_flips_layers`."""
+        return self.arrays is not None and self.bulk_errors and all(error.layered for error in self.errors.values())
+
+    def random_errors_window(
+        self,
+        rounds: int,
+        p_bitflip_plaq: float = 0,
+        p_bitflip_star: float = 0,
+        start: int = 0,
+        stop: Optional[int] = None,
+        **kwargs,
+    ):
+        """Simulates the rounds of `random_errors_rounds` on the layers ``start`` up to ``stop`` at once.
+
+        The flips of the edge states of every layer are drawn by `~.errors._template.Sim.random_flips_layers` of the error modules, and the states of the layers are the cumulative XOR of the flips along the time axis, starting from the state of the layer below ``start``. The parities of all layers are computed in a single product with the parity-check matrix, the measurement errors of all layers are drawn at once by `~.errors._template.sample_indices`, and the syndrome of a layer is the difference between the measured states of consecutive layers. The window is equivalent to the rounds simulated layer by layer on the object elements, including the perfect final round, without copying the states of the data-qubits per layer.
+
+        Parameters
+        ----------
+        rounds
+            Number of remaining rounds. Errors are applied on the first ``min(rounds, stop - start)`` layers, and the measurements of the final round and of the layers after it are perfect.
+        p_bitflip_plaq
+            Probability of a bitflip during a parity check measurement on plaquette operators (XXXX).
+        p_bitflip_star
+            Probability of a bitflip during a parity check measurement on star operators (ZZZZ).
+        start, stop
+            Range of layers to simulate, all layers by default.
+        kwargs
+            Error rates that are passed on to `~.errors._template.Sim.random_flips_layers`.
+        """
+        arrays = self.arrays
+        if stop is None:
+            stop = self.layers
+        size = stop - start
+        active = min(rounds, size)
+        self.instance = new_instance()
+        previous_measured = arrays.measured_state[start - 1].copy()
+        flips = numpy.zeros((size,) + arrays.states.shape[1:], dtype=bool)
+        for error_class in self.errors.values():
+            flips[:active] ^= error_class.random_flips_layers(active, **kwargs)
+        flips[0] ^= arrays.states[start - 1]
+        states = arrays.states[start:stop]
+        numpy.bitwise_xor.accumulate(flips, axis=0, out=states)
+        parity = (arrays.parity_check @ states.reshape(size, -1).T.astype(numpy.uint8)).T % 2 == 1
+
+        errors = numpy.zeros((size, arrays.num_ancilla), dtype=bool)
+        faulty = max(0, min(rounds - 1, size))
+        if faulty and (p_bitflip_plaq or p_bitflip_star):
+            if p_bitflip_plaq == p_bitflip_star:
+                p_measure = p_bitflip_plaq
+            else:
+                p_measure = numpy.tile(numpy.where(arrays.ancilla_types == 0, p_bitflip_plaq, p_bitflip_star), faulty)
+            indices = sample_indices(faulty * arrays.num_ancilla, p_measure, self.rng, sparse=self.sparse_errors)
+            errors[:faulty].reshape(-1)[indices] = True
+
+        measured = arrays.measured_state[start:stop]
+        arrays.measurement_error[start:stop] = errors
+        numpy.not_equal(parity, errors, out=measured)
+        numpy.not_equal(measured[0], previous_measured, out=arrays.syndrome[start])
+        numpy.not_equal(measured[1:], measured[:-1], out=arrays.syndrome[start + 1 : stop])
+        self.flipped_edges.clear()
+        self.layer = stop - 1
+        self.round += active
+
+    def layer_state(self, z: int) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """Returns copies of the flattened edge states, the measured states and the measurement errors of layer ``z``, in the order of ``self.edge_list`` and ``AncillaQubit.index``."""
+        if self.arrays is not None:
+            arrays = self.arrays
+            return arrays.states[z].ravel().copy(), arrays.measured_state[z].copy(), arrays.measurement_error[z].copy()
+        ancillas = self.ancilla_list[z]
+        return (
+            numpy.fromiter((edge.state for edge in self.edge_list[z]), dtype=bool, count=len(self.edge_list[z])),
+            numpy.fromiter((ancilla.measured_state for ancilla in ancillas), dtype=bool, count=len(ancillas)),
+            numpy.fromiter((ancilla.measurement_error for ancilla in ancillas), dtype=bool, count=len(ancillas)),
+        )
+
+    def set_layer_state(
+        self,
+        z: int,
+        states: numpy.ndarray,
+        measured: numpy.ndarray,
+        syndrome: numpy.ndarray,
+        measurement_error: numpy.ndarray,
+    ):
+        """Sets the flattened edge states, the measured states, the syndromes and the measurement errors of layer ``z``, see `layer_state`."""
+        if self.arrays is not None:
+            arrays = self.arrays
+            arrays.states[z] = states.reshape(arrays.states[z].shape)
+            arrays.measured_state[z] = measured
+            arrays.syndrome[z] = syndrome
+            arrays.measurement_error[z] = measurement_error
+            return
+        for edge, state in zip(self.edge_list[z], states.tolist()):
+            if edge.state != state:
+                edge.state = state
+        for ancilla, state, is_syndrome, error in zip(
+            self.ancilla_list[z], measured.tolist(), syndrome.tolist(), measurement_error.tolist()
+        ):
+            ancilla.measured_state, ancilla.syndrome, ancilla.measurement_error = state, is_syndrome, error
+        self.flipped_edges.clear()
+
+    def window_state(self) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """Returns the states of all layers stacked along the first axis, see `layer_state`."""
+        return tuple(numpy.stack(arrays) for arrays in zip(*(self.layer_state(z) for z in range(self.layers))))
+
+    def close_window(self):
+        """Closes a window of `random_errors_stream` that is not the final window, with a virtual round on the final layer.
+
+        The virtual round repeats the edge states and measurements of the newest round on the layer below, and thus holds no syndromes, such that the window is decoded as if the newest measurements were perfect. On a lattice without boundaries, such as the toric lattice, the number of syndromes of each type in the window must be even to be matched. If it is odd, the newest syndrome of that type is matched to the end of the window by an additional syndrome of the same ancilla-qubit in the virtual round. The corrections near the end of the window are discarded by `commit_window`.
+        """
+        last = self.layers - 1
+        states, measured, _ = self.layer_state(last - 1)
+        syndrome = numpy.zeros_like(measured)
+        self.set_layer_state(last, states, measured, syndrome, syndrome)
+        if not self.pseudo_list[0]:
+            count, newest = defaultdict(int), {}
+            for ancilla in self.syndromes:
+                count[ancilla.state_type] += 1
+                newest[ancilla.state_type] = ancilla
+            for state_type, ancilla in newest.items():
+                syndrome[ancilla.index] = count[state_type] % 2
+            if syndrome.any():
+                self.set_layer_state(last, states, measured ^ syndrome, syndrome, numpy.zeros_like(syndrome))
+        self.layer = last
+
+    def commit_window(self, commit: int, window: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]) -> int:
+        """Commits the corrections on the oldest ``commit`` layers of a decoded window of `random_errors_stream`, and shifts the buffered rounds to the bottom of the window.
+
+        The corrections of a layer are the edge states that were flipped by the decoder, which are found by comparing with the states of the window before decoding. The corrections on all other layers are discarded. The committed corrections are applied as a Pauli frame on the edge states of the buffered rounds, whose measured states are flipped by the parity of the corrections, such that the next window is measured relative to the corrected state. The syndromes of the buffered rounds are then recomputed from their measured states, where the syndromes of the first buffered round also hold every syndrome of the committed rounds that is not resolved by the committed corrections.
+
+        Parameters
+        ----------
+        commit
+            Number of committed layers.
+        window
+            States of the window before decoding, see `window_state`.
+
+        Returns
+        -------
+        int
+            Number of buffered rounds.
+        """
+        states, measured, errors = window
+        correction = numpy.zeros_like(states[0])
+        for z in range(commit):
+            correction ^= self.layer_state(z)[0] ^ states[z]
+        flips = self.parity_check_matrix() @ correction.astype(numpy.uint8) % 2 == 1
+        buffered = self.layers - 1 - commit
+        previous = numpy.zeros_like(measured[0])
+        for z in range(buffered):
+            current = measured[commit + z] ^ flips
+            self.set_layer_state(z, states[commit + z] ^ correction, current, current ^ previous, errors[commit + z])
+            previous = current
+        cleared = numpy.zeros_like(measured[0])
+        for z in range(buffered, self.layers - 1):
+            self.set_layer_state(z, states[z], measured[z], cleared, errors[z])
+        self.set_layer_state(self.layers - 1, states[self.layers - 2] ^ correction, cleared, cleared, cleared)
+        return buffered
 
     def random_errors_layer(self, **kwargs):
         """Applies a layer of random errors loaded in ``self.errors``.
@@ -425,9 +1192,17 @@ class FaultyMeasurements(PerfectMeasurements):
         kwargs
             Keyword arguments are passed on to `~._template.sim.PerfectMeasurements.random_errors`.
         """
-        for data in self.data_qubits[self.layer].values():
-            data.state = self.data_qubits[(self.layer - 1) % self.layers][data.loc].state
-        super().random_errors(**kwargs)
+        self.copy_previous_layer()
+        super().random_errors(measure=False, **kwargs)
+
+    def copy_previous_layer(self):
+        """Copies the states of the data-qubits of the previous layer, which holds the previous round, to ``self.layer``."""
+        if self.arrays is not None:
+            self.arrays.states[self.layer] = self.arrays.states[(self.layer - 1) % self.layers]
+        else:
+            previous_edges = self.edge_list[(self.layer - 1) % self.layers]
+            for edge, previous_edge in zip(self.edge_list[self.layer], previous_edges):
+                edge.state = previous_edge.state
 
     def random_measure_layer(self, **kwargs):
         """Measures a layer of ancillas.
@@ -439,7 +1214,8 @@ class FaultyMeasurements(PerfectMeasurements):
         kwargs
             Keyword arguments are passed on to `~.codes.elements.AncillaQubit.get_state`.
         """
-        for ancilla in self.ancilla_qubits[self.layer].values():
-            previous_ancilla = self.ancilla_qubits[(ancilla.z - 1) % self.layers][ancilla.loc]
+        previous_ancillas = self.ancilla_list[(self.layer - 1) % self.layers]
+        for ancilla, previous_ancilla in zip(self.ancilla_list[self.layer], previous_ancillas):
             measured_state = ancilla.measure(**kwargs)
             ancilla.syndrome = measured_state != previous_ancilla.measured_state
+        self.flipped_edges.clear()
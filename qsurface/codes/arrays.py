@@ -0,0 +1,171 @@
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from scipy import sparse
+import numpy
+
+
+state_types = ["x", "z"]
+matrix_cache = OrderedDict()
+matrix_cache_size = 32
+
+
+def matrix_key(code) -> tuple:
+    """Returns the key of the matrices of ``code`` in ``matrix_cache``."""
+    return (type(code), code.size, code.layers)
+
+
+def lattice_matrices(code) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """Returns the parity-check and logical-operator matrices of an initialized code.
+
+    Both matrices act on the flattened edge states of a single layer, where the edge of type ``t`` of a data-qubit with index ``i`` is located at column ``t * num_data + i``. The row of an ancilla-qubit in the parity-check matrix is ``AncillaQubit.index``, the rows of the logical matrix follow the order of ``code.logical_operators``. The matrices only depend on the geometry of the lattice and are stored in an LRU cache of at most ``matrix_cache_size`` entries, keyed on the code class, size and number of layers.
+
+    Parameters
+    ----------
+    code : `~.codes._template.sim.PerfectMeasurements`
+        Code with initialized surface and logical operators, or with a lattice built by `~.codes._template.sim.PerfectMeasurements.init_bulk`, of which the matrices are built from ``code.bulk`` without materializing the elements.
+
+    Returns
+    -------
+    parity_check : `~scipy.sparse.csr_matrix`
+        Matrix of shape ``(num_ancilla, 2 * num_data)``.
+    logical : `~scipy.sparse.csr_matrix`
+        Matrix of shape ``(num_logical, 2 * num_data)``.
+    """
+    key = matrix_key(code)
+    if key in matrix_cache:
+        matrix_cache.move_to_end(key)
+        return matrix_cache[key]
+
+    if code.bulk is not None:
+        parity_check, logical = code.bulk.matrices()
+    else:
+        num_data = len(code.data_qubits[0])
+
+        def edge_column(edge):
+            return state_types.index(edge.state_type) * num_data + edge.qubit.index
+
+        ancillas = code.ancilla_list[0]
+        indptr, indices = [0], []
+        for ancilla in ancillas:
+            indices += sorted(edge_column(data_qubit.edges[ancilla.state_type]) for data_qubit in ancilla.parity_qubits.values())
+            indptr.append(len(indices))
+        parity_check = sparse.csr_matrix(
+            (numpy.ones(len(indices), dtype=numpy.uint8), indices, indptr), shape=(len(ancillas), 2 * num_data)
+        )
+
+        indptr, indices = [0], []
+        for operator in code.logical_operators.values():
+            indices += sorted(edge_column(edge) for edge in operator)
+            indptr.append(len(indices))
+        logical = sparse.csr_matrix(
+            (numpy.ones(len(indices), dtype=numpy.uint8), indices, indptr),
+            shape=(len(code.logical_operators), 2 * num_data),
+        )
+
+    matrix_cache[key] = (parity_check, logical)
+    while len(matrix_cache) > matrix_cache_size:
+        matrix_cache.popitem(last=False)
+    return parity_check, logical
+
+
+class LatticeArrays(object):
+    """Contiguous array storage of the state of a surface code lattice.
+
+    The states of the `~.codes.elements.ArrayEdge` objects of layer ``z`` are stored in ``states[z]``, an array of shape ``(2, num_data)``. The first axis corresponds to the ``"x"`` and ``"z"`` edges of a data-qubit, the second axis to ``DataQubit.index``. The measurement outcomes of the `~.codes.elements.ArrayAncillaQubit` objects are stored in arrays of shape ``(layers, num_ancilla)``, indexed by ``AncillaQubit.index``. The elements of the code are thin views onto these arrays, such that the lattice can be accessed both per element and as whole arrays.
+
+    The parity checks and logical operators are stored as sparse matrices (see `lattice_matrices`) that act on the flattened states of a layer, where the edge of type ``t`` of a data-qubit with index ``i`` has index ``t * num_data + i``. The syndrome of a layer is thus ``parity_check @ e % 2`` and the logical state ``logical @ e % 2``.
+
+    Parameters
+    ----------
+    code : `~.codes._template.sim.PerfectMeasurements`
+        Initialized surface code with `~.codes.elements.ArrayEdge` and `~.codes.elements.ArrayAncillaQubit` elements. If the lattice of the code is not yet materialized (see `~.codes._template.sim.PerfectMeasurements.materialize`), the arrays are built from ``code.bulk`` and the elements are bound once they are created.
+
+    Attributes
+    ----------
+    states : `~numpy.ndarray`
+        Edge states of shape ``(layers, 2, num_data)``.
+    measured_state, syndrome, measurement_error : `~numpy.ndarray`
+        Measurement outcomes of shape ``(layers, num_ancilla)``.
+    ancilla_types : `~numpy.ndarray`
+        The index of the ``state_type`` in ``state_types`` of each ancilla-qubit.
+    parity_check : `~scipy.sparse.csr_matrix`
+        Parity-check matrix of a single layer.
+    logical : `~scipy.sparse.csr_matrix`
+        Logical-operator matrix of a single layer.
+    logical_keys : list
+        Keys of ``code.logical_operators`` in the order of the rows of ``logical``.
+    """
+
+    state_types = state_types
+
+    def __init__(self, code, **kwargs):
+        self.layers = code.layers
+        bulk = code.bulk
+        if bulk is not None:
+            self.num_data, self.num_ancilla = bulk.num_data, bulk.num_ancilla
+        else:
+            self.num_data = len(code.data_qubits[0])
+            self.num_ancilla = len(code.ancilla_qubits[0])
+
+        self.states = numpy.zeros((self.layers, len(self.state_types), self.num_data), dtype=bool)
+        self.measured_state = numpy.zeros((self.layers, self.num_ancilla), dtype=bool)
+        self.syndrome = numpy.zeros((self.layers, self.num_ancilla), dtype=bool)
+        self.measurement_error = numpy.zeros((self.layers, self.num_ancilla), dtype=bool)
+
+        if bulk is not None:
+            self.ancilla_types = bulk.ancilla_types
+            self.logical_keys = list(bulk.logical_data)
+        else:
+            ancillas = code.ancilla_list[0]
+            self.ancilla_types = numpy.array([self.state_types.index(a.state_type) for a in ancillas], dtype=numpy.uint8)
+            self.logical_keys = list(code.logical_operators)
+        self.parity_check, self.logical = lattice_matrices(code)
+        if code.materialized:
+            self.bind(code)
+
+    def __repr__(self):
+        return f"<LatticeArrays {self.layers}x{self.num_data} data, {self.layers}x{self.num_ancilla} ancilla>"
+
+    def edge_index(self, edge) -> int:
+        """Returns the index of ``edge`` in the flattened states of its layer."""
+        return self.state_types.index(edge.state_type) * self.num_data + edge.qubit.index
+
+    def bind(self, code):
+        """Binds all edges and ancilla-qubits of ``code`` to the arrays. The current states of the elements are copied."""
+        for z, layer in code.data_qubits.items():
+            for data_qubit in layer.values():
+                for t, state_type in enumerate(self.state_types):
+                    data_qubit.edges[state_type].bind(self.states, (z, t, data_qubit.index))
+        for z, layer in code.ancilla_qubits.items():
+            for ancilla_qubit in layer.values():
+                ancilla_qubit.bind(self, (z, ancilla_qubit.index))
+
+    def parity(self, z: int = 0) -> numpy.ndarray:
+        """Returns the parities of all parity checks on layer ``z`` without storing a measurement."""
+        return (self.parity_check @ self.states[z].reshape(-1).view(numpy.uint8)) % 2 == 1
+
+    def measure(self, z: int = 0, measurement_errors: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """Measures all ancilla-qubits of layer ``z`` and stores the outcomes.
+
+        Parameters
+        ----------
+        z
+            Layer to measure.
+        measurement_errors
+            Boolean array of shape ``(num_ancilla,)`` of measurements that are flipped.
+        """
+        parity = self.parity(z)
+        if measurement_errors is None:
+            self.measurement_error[z] = False
+        else:
+            self.measurement_error[z] = measurement_errors
+            parity ^= measurement_errors
+        self.measured_state[z] = parity
+        self.syndrome[z] = parity
+        return parity
+
+    def logical_state(self, z: int = 0) -> Dict[str, int]:
+        """Returns the states of the logical operators on layer ``z``."""
+        logical = (self.logical @ self.states[z].reshape(-1).view(numpy.uint8)) % 2
+        return {key: int(state) for key, state in zip(self.logical_keys, logical)}
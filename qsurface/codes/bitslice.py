@@ -0,0 +1,220 @@
+from __future__ import annotations
+from typing import Optional
+from scipy import sparse
+import numpy
+from .arrays import lattice_matrices, state_types
+from ._template.sim import new_instance
+from ..errors._template import sample_indices
+
+
+word_bits = 64
+
+
+def num_words(shots: int) -> int:
+    """Returns the number of 64-bit words needed to store one bit for each of ``shots`` shots."""
+    return -(-shots // word_bits)
+
+
+def pack_shots(bits: numpy.ndarray) -> numpy.ndarray:
+    """Packs a boolean array of shape ``(n, shots)`` into bit-sliced words of shape ``(n, num_words(shots))``, where shot ``i`` is stored at bit ``i % 64`` of word ``i // 64``."""
+    bits = numpy.asarray(bits, dtype=bool)
+    n, shots = bits.shape
+    padded = numpy.zeros((n, num_words(shots) * word_bits), dtype=bool)
+    padded[:, :shots] = bits
+    return numpy.packbits(padded, axis=1, bitorder="little").view("<u8").astype(numpy.uint64)
+
+
+def unpack_shots(words: numpy.ndarray, shots: Optional[int] = None) -> numpy.ndarray:
+    """Unpacks bit-sliced words of shape ``(n, words)`` into a boolean array of shape ``(n, shots)``, see `pack_shots`."""
+    words = numpy.ascontiguousarray(words, dtype=numpy.uint64)
+    bits = numpy.unpackbits(words.astype("<u8").view(numpy.uint8), axis=1, bitorder="little").astype(bool)
+    return bits if shots is None else bits[:, :shots]
+
+
+def xor_rows(matrix: sparse.csr_matrix, words: numpy.ndarray) -> numpy.ndarray:
+    """Returns the bit-sliced products of a binary CSR ``matrix`` with the bit-sliced ``words`` of its columns.
+
+    Every row of the result is the XOR of the words of the columns in that row, such that bit ``i`` of row ``r`` equals ``(matrix @ e_i)[r] % 2`` for the columns ``e_i`` of shot ``i``. A single pass over the nonzero entries of the matrix thus serves 64 shots per word.
+    """
+    result = numpy.zeros((matrix.shape[0], words.shape[1]), dtype=numpy.uint64)
+    nonempty = numpy.diff(matrix.indptr) > 0
+    if matrix.nnz:
+        result[nonempty] = numpy.bitwise_xor.reduceat(words[matrix.indices], matrix.indptr[:-1][nonempty], axis=0)
+    return result
+
+
+def flip_shots(words: numpy.ndarray, rows: numpy.ndarray, shots: numpy.ndarray):
+    """Flips bit ``shots[i]`` of row ``rows[i]`` of the bit-sliced ``words`` in place, for every ``i``. Repeated pairs are flipped repeatedly."""
+    bits = numpy.left_shift(numpy.uint64(1), (shots % word_bits).astype(numpy.uint64))
+    numpy.bitwise_xor.at(words, (rows, shots // word_bits), bits)
+
+
+def load_errors(code, errors: numpy.ndarray, loaded: Optional[list] = None) -> Optional[list]:
+    """Sets the edge states of layer 0 of ``code`` to the flattened boolean ``errors`` of length ``2 * num_data`` and measures the ancilla-qubits.
+
+    The edges in ``loaded``, which are set by the previous call, and the edges flipped since, e.g. by a decoder correction, are reset first. All edges of the layer are reset if ``loaded`` is none. As for `~.codes._template.sim.PerfectMeasurements.random_errors`, the instance of the code is renewed.
+
+    Returns
+    -------
+    list or None
+        The edges that are set, to be passed as ``loaded`` to the next call. None for the array backend, which sets all edges at once.
+    """
+    code.instance = new_instance()
+    if code.arrays is not None:
+        code.arrays.states[0] = errors.reshape(len(state_types), -1)
+        code.arrays.measure(0)
+        code.flipped_edges.clear()
+        return None
+    edges = code.edge_list[0]
+    for edge in edges if loaded is None else loaded + code.flipped_edges:
+        edge.state = 0
+    loaded = [edges[i] for i in numpy.flatnonzero(errors).tolist()]
+    for edge in loaded:
+        edge.state = 1
+    code.measure_flipped()
+    return loaded
+
+
+def layer_logical_state(code) -> dict:
+    """Returns the logical state of the decode layer of ``code``, without comparing it to a previous state as `~.codes._template.sim.PerfectMeasurements.logical_state` does."""
+    if code.arrays is not None:
+        return code.arrays.logical_state(code.decode_layer)
+    return {key: sum(edge.state for edge in operator) % 2 for key, operator in code.logical_operators.items()}
+
+
+class BitSlicedShots(object):
+    """Errors of a batch of shots on a single layer of a surface code, stored bit-sliced in 64-bit words.
+
+    The state of every edge is stored as ``num_words(shots)`` words of type ``uint64``, where bit ``i % 64`` of word ``i // 64`` belongs to shot ``i``. The edges are ordered as the flattened edge states of `~.codes.arrays.LatticeArrays`, such that the edge of type ``t`` of the data-qubit with index ``i`` is stored at ``states[t * num_data + i]``. The syndromes and logical states of all shots are computed with the parity-check and logical-operator matrices of the code (see `~.codes.arrays.lattice_matrices`) as an XOR over the incident edges of each row, see `xor_rows`.
+
+    The shots are decoded one by one by loading their errors onto layer 0 of ``code`` with `load_shot`. Shots with a trivial syndrome are not decoded at all, as their logical state is known from the packed logical states.
+
+    Parameters
+    ----------
+    code : `~.codes._template.sim.PerfectMeasurements`
+        Initialized surface code with perfect measurements, of which the lattice topology is used. The code may be built lazily with `~.codes._template.sim.PerfectMeasurements.init_bulk`, in which case its elements are only created once a shot is loaded.
+    shots
+        Number of shots in the batch, preferably a multiple of 64.
+
+    Attributes
+    ----------
+    states : `~numpy.ndarray`
+        Bit-sliced edge states of shape ``(2 * num_data, num_words(shots))``.
+    parity_check : `~scipy.sparse.csr_matrix`
+        Parity-check matrix of the layer.
+    logical : `~scipy.sparse.csr_matrix`
+        Logical-operator matrix of the layer.
+    """
+
+    def __init__(self, code, shots: int = word_bits, **kwargs):
+        self.code = code
+        self.shots = shots
+        self.parity_check, self.logical = lattice_matrices(code)
+        self.num_data = self.parity_check.shape[1] // len(state_types)
+        self.states = numpy.zeros((self.parity_check.shape[1], num_words(shots)), dtype=numpy.uint64)
+        self._loaded = None
+
+    def __repr__(self):
+        return f"<BitSlicedShots {self.shots} shots of {self.num_data} data>"
+
+    def clear(self):
+        """Resets the edge states of all shots."""
+        self.states[:] = 0
+
+    def set_errors(self, errors: numpy.ndarray):
+        """Sets the edge states of all shots to the boolean ``errors`` of shape ``(2 * num_data, shots)``."""
+        self.states[:] = pack_shots(errors)
+
+    def random_errors(
+        self,
+        p_bitflip: float = 0,
+        p_phaseflip: float = 0,
+        rng: Optional[numpy.random.Generator] = None,
+        sparse: bool = True,
+        **kwargs,
+    ):
+        """Applies Pauli X and Z errors on all edges of all shots.
+
+        The errors of a type are drawn as the indices of the erroneous trials among ``num_data * shots`` trials with `~.errors._template.sample_indices`, such that the cost of the sparse mode is proportional to the number of errors. The bits of the drawn trials are flipped in the packed states by `flip_shots`.
+
+        Parameters
+        ----------
+        p_bitflip
+            Probability of X-errors or bitflip errors.
+        p_phaseflip
+            Probability of Z-errors or phaseflip errors.
+        rng
+            Random number generator, the generator of the code at ``code.rng`` by default.
+        sparse
+            Sample the gaps between errors instead of a uniform number per trial.
+        """
+        if rng is None:
+            rng = self.code.rng
+        for t, p in enumerate([p_bitflip, p_phaseflip]):
+            trials = sample_indices(self.num_data * self.shots, p, rng=rng, sparse=sparse)
+            edges, shots = numpy.divmod(trials, self.shots)
+            flip_shots(self.states, t * self.num_data + edges, shots)
+
+    def syndrome(self) -> numpy.ndarray:
+        """Returns the bit-sliced syndromes of shape ``(num_ancilla, num_words(shots))``, ordered by ``AncillaQubit.index``."""
+        return xor_rows(self.parity_check, self.states)
+
+    def logical_state(self) -> numpy.ndarray:
+        """Returns the bit-sliced logical states of shape ``(num_logical, num_words(shots))``, in the order of ``code.logical_operators``."""
+        return xor_rows(self.logical, self.states)
+
+    def nontrivial_shots(self, syndrome: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """Returns the indices of the shots with a nontrivial syndrome."""
+        if syndrome is None:
+            syndrome = self.syndrome()
+        words = numpy.bitwise_or.reduce(syndrome, axis=0) if len(syndrome) else numpy.zeros(self.states.shape[1], numpy.uint64)
+        return numpy.flatnonzero(unpack_shots(words[None, :], self.shots)[0])
+
+    def shot_errors(self, shot: int) -> numpy.ndarray:
+        """Returns the flattened edge states of ``shot`` as a boolean array of length ``2 * num_data``."""
+        word, bit = divmod(shot, word_bits)
+        return (self.states[:, word] >> numpy.uint64(bit)) & numpy.uint64(1) == 1
+
+    def load_shot(self, shot: int):
+        """Sets the edge states of layer 0 of ``code`` to the errors of ``shot`` and measures the ancilla-qubits, see `load_errors`."""
+        self._loaded = load_errors(self.code, self.shot_errors(shot), self._loaded)
+
+    def decode(self, decoder, **kwargs) -> numpy.ndarray:
+        """Decodes all shots and returns whether each shot is free of a logical error.
+
+        Only the shots with a nontrivial syndrome are loaded onto ``code`` and decoded by ``decoder``. The logical error of a shot with a trivial syndrome is read from the packed logical states.
+
+        Parameters
+        ----------
+        decoder : `~.decoders._template.Sim`
+            Decoder of ``code``.
+        kwargs
+            Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+
+        Returns
+        -------
+        `~numpy.ndarray`
+            Boolean array of length ``shots``, which is false for shots with a logical error.
+        """
+        logical = unpack_shots(self.logical_state(), self.shots)
+        shots = self.nontrivial_shots()
+        logical[:, shots] ^= self.corrections(decoder, shots, **kwargs)
+        return ~logical.any(axis=0)
+
+    def corrections(self, decoder, shots: numpy.ndarray, **kwargs) -> numpy.ndarray:
+        """Decodes ``shots`` one by one and returns the logical states of the corrections of ``decoder``, of shape ``(num_logical, len(shots))``.
+
+        As the correction of a shot only depends on its syndrome, the returned states also apply to any other error with the same syndrome, see `~.main.run_sweep`.
+        """
+        logical = unpack_shots(self.logical_state(), self.shots)
+        corrections = numpy.zeros((len(logical), len(shots)), dtype=bool)
+        for i, shot in enumerate(numpy.asarray(shots).tolist()):
+            self.load_shot(shot)
+            decoder.decode(**kwargs)
+            corrections[:, i] = list(self.corrected_logical_state().values())
+            corrections[:, i] ^= logical[:, shot]
+        return corrections
+
+    def corrected_logical_state(self) -> dict:
+        """Returns the logical state of the decode layer of ``code``, see `layer_logical_state`."""
+        return layer_logical_state(self.code)
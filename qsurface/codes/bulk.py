@@ -0,0 +1,202 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+from scipy import sparse
+import numpy
+
+
+state_types = ["x", "z"]
+
+
+def grid_locs(xs: Sequence[float], ys: Sequence[float], outer: str = "y") -> numpy.ndarray:
+    """Returns the coordinates of the product of ``xs`` and ``ys`` as an array of shape ``(len(xs) * len(ys), 2)``.
+
+    The coordinates are ordered as in a nested loop with ``outer`` as the outer loop variable.
+    """
+    if outer == "y":
+        ys, xs = numpy.meshgrid(ys, xs, indexing="ij")
+    else:
+        xs, ys = numpy.meshgrid(xs, ys, indexing="ij")
+    return numpy.stack([xs.ravel(), ys.ravel()], axis=-1).astype(float)
+
+
+def interleave(*blocks: numpy.ndarray) -> numpy.ndarray:
+    """Interleaves arrays of coordinates of equal length, as if they were added in turn in a single loop."""
+    return numpy.stack(blocks, axis=1).reshape(-1, 2)
+
+
+def as_loc(loc: Sequence[float]) -> Tuple[float, ...]:
+    """Returns a coordinate as a tuple, with integer values as ``int`` such that it equals the locations used by the element based constructors."""
+    return tuple(int(value) if value.is_integer() else value for value in loc)
+
+
+class NodeBlock(object):
+    """A block of ancilla-qubits or pseudo-qubits of a single type.
+
+    Parameters
+    ----------
+    locs
+        Coordinates of shape ``(n, 2)``, in the order in which the qubits are added.
+    state_type
+        The ``state_type`` of the qubits.
+    pseudo
+        The block consists of `~.codes.elements.PseudoQubit` objects.
+    keys
+        The keys of ``AncillaQubit.parity_qubits``, which are the offsets from the qubits to their data-qubits.
+    """
+
+    def __init__(self, locs: numpy.ndarray, state_type: str, keys: List[Tuple[float, float]], pseudo: bool = False):
+        self.locs = numpy.asarray(locs, dtype=float).reshape(-1, 2)
+        self.state_type = state_type
+        self.keys = keys
+        self.pseudo = pseudo
+
+
+class BulkLattice(object):
+    """Array description of a single layer of a surface code lattice.
+
+    The lattice is described by the coordinates of the data-qubits, of the ancilla-qubits and pseudo-qubits, and the incidence between them. All tables are built with array arithmetic, without creating any element objects, and in the same order as the element based constructors of the code. Their elements can thus be created from the tables by `~.codes._template.sim.PerfectMeasurements.materialize`.
+
+    The ancilla-qubits and pseudo-qubits are stored together as the nodes of the lattice, in the order in which they are added. The data-qubits of node ``i`` are ``node_data[node_indptr[i]:node_indptr[i+1]]``, entangled with the keys ``keys[k]`` for ``k`` in ``node_keys[node_indptr[i]:node_indptr[i+1]]``.
+
+    Parameters
+    ----------
+    size
+        Size of the lattice.
+    data_locs
+        Coordinates of the data-qubits of shape ``(num_data, 2)``, ordered by ``DataQubit.index``.
+    blocks
+        Blocks of nodes in the order in which they are added.
+    logical
+        The logical operators by name, as the ``state_type`` of the operator and the coordinates of its data-qubits.
+    periodic
+        Wrap the coordinates of the data-qubits of a node around the lattice.
+
+    Attributes
+    ----------
+    node_locs : `~numpy.ndarray`
+        Coordinates of all nodes.
+    node_types : `~numpy.ndarray`
+        The index of the ``state_type`` in ``state_types`` of each node.
+    node_pseudo : `~numpy.ndarray`
+        Whether a node is a pseudo-qubit.
+    node_index : `~numpy.ndarray`
+        The ``index`` of each node among the ancilla-qubits or pseudo-qubits.
+    logical_data : dict of `~numpy.ndarray`
+        The indices of the data-qubits of each logical operator.
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        data_locs: numpy.ndarray,
+        blocks: List[NodeBlock],
+        logical: Dict[str, Tuple[str, numpy.ndarray]],
+        periodic: bool = False,
+    ):
+        self.size = size
+        self.periodic = periodic
+        self.data_locs = numpy.asarray(data_locs, dtype=float).reshape(-1, 2)
+
+        self.keys = []
+        for block in blocks:
+            self.keys += [key for key in block.keys if key not in self.keys]
+        self.node_locs = numpy.concatenate([block.locs for block in blocks])
+        self.node_types = numpy.concatenate(
+            [numpy.full(len(block.locs), state_types.index(block.state_type), dtype=numpy.uint8) for block in blocks]
+        )
+        self.node_pseudo = numpy.concatenate([numpy.full(len(block.locs), block.pseudo) for block in blocks])
+        self.node_index = numpy.empty(len(self.node_locs), dtype=numpy.intp)
+        for pseudo in [False, True]:
+            nodes = self.node_pseudo == pseudo
+            self.node_index[nodes] = numpy.arange(numpy.count_nonzero(nodes))
+
+        self._grid_offset = -numpy.rint(2 * self.data_locs).astype(int).min(axis=0)
+        points = numpy.rint(2 * self.data_locs).astype(int) + self._grid_offset
+        self._grid = numpy.full(points.max(axis=0) + 1, -1, dtype=numpy.intp)
+        self._grid[points[:, 0], points[:, 1]] = numpy.arange(len(points))
+
+        # Look up the data-qubits of the keys of every node, in the order of the keys of its block
+        counts, node_data, node_keys = [], [], []
+        for block in blocks:
+            key_index = numpy.array([self.keys.index(key) for key in block.keys], dtype=numpy.intp)
+            key_data = numpy.stack([self.locate(block.locs + key) for key in block.keys], axis=1)
+            found = key_data != -1
+            rows, columns = numpy.nonzero(found)
+            counts.append(found.sum(axis=1))
+            node_data.append(key_data[rows, columns])
+            node_keys.append(key_index[columns])
+        self.node_indptr = numpy.concatenate([[0], numpy.cumsum(numpy.concatenate(counts))]).astype(numpy.intp)
+        self.node_data = numpy.concatenate(node_data)
+        self.node_keys = numpy.concatenate(node_keys)
+
+        self.logical_types = {name: state_type for name, (state_type, _) in logical.items()}
+        self.logical_data = {name: self.locate(locs) for name, (_, locs) in logical.items()}
+
+    def __repr__(self):
+        return f"<BulkLattice {self.size} {self.num_data} data, {self.num_ancilla} ancilla, {self.num_pseudo} pseudo>"
+
+    @property
+    def num_data(self) -> int:
+        return len(self.data_locs)
+
+    @property
+    def num_ancilla(self) -> int:
+        return int(len(self.node_pseudo) - numpy.count_nonzero(self.node_pseudo))
+
+    @property
+    def num_pseudo(self) -> int:
+        return int(numpy.count_nonzero(self.node_pseudo))
+
+    @property
+    def ancilla_types(self) -> numpy.ndarray:
+        """The index of the ``state_type`` of each ancilla-qubit, ordered by ``AncillaQubit.index``."""
+        return self.node_types[~self.node_pseudo]
+
+    def locs(self, kind: str) -> numpy.ndarray:
+        """Returns the coordinates of the qubits of ``kind``, which is one of ``"data"``, ``"ancilla"`` or ``"pseudo"``, ordered by index."""
+        if kind == "data":
+            return self.data_locs
+        return self.node_locs[self.node_pseudo == (kind == "pseudo")]
+
+    def locate(self, locs: numpy.ndarray) -> numpy.ndarray:
+        """Returns the indices of the data-qubits at ``locs``, or -1 where there is no data-qubit."""
+        locs = numpy.asarray(locs, dtype=float).reshape(-1, 2)
+        if self.periodic:
+            locs = numpy.mod(locs, self.size)
+        points = numpy.rint(2 * locs).astype(int) + self._grid_offset
+        inside = numpy.all((points >= 0) & (points < self._grid.shape), axis=-1)
+        points = numpy.where(inside[:, None], points, 0)
+        return numpy.where(inside, self._grid[points[:, 0], points[:, 1]], -1)
+
+    def vertical_edges(self, layers: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Returns the vertical edges between the ancilla-qubits of ``layers`` stacked layers.
+
+        Every ancilla-qubit on layer ``z`` is connected to its instance on layer ``(z + 1) % layers``. The edges are returned as the layers of their lower instances and the indices of their ancilla-qubits, ordered by layer.
+        """
+        if layers < 2:
+            return numpy.empty(0, dtype=numpy.intp), numpy.empty(0, dtype=numpy.intp)
+        lower = numpy.repeat(numpy.arange(layers), self.num_ancilla)
+        return lower, numpy.tile(numpy.arange(self.num_ancilla), layers)
+
+    def matrices(self) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """Returns the parity-check and logical-operator matrices of the lattice, see `~.codes.arrays.lattice_matrices`."""
+        node_of = numpy.repeat(numpy.arange(len(self.node_locs)), numpy.diff(self.node_indptr))
+        columns = self.node_types[node_of].astype(numpy.intp) * self.num_data + self.node_data
+        ancilla = ~self.node_pseudo[node_of]
+        rows = self.node_index[node_of][ancilla]
+        parity_check = self._matrix(rows, columns[ancilla], self.num_ancilla)
+
+        rows, columns = [], []
+        for i, (name, data) in enumerate(self.logical_data.items()):
+            rows.append(numpy.full(len(data), i))
+            columns.append(state_types.index(self.logical_types[name]) * self.num_data + data)
+        logical = self._matrix(numpy.concatenate(rows), numpy.concatenate(columns), len(self.logical_data))
+        return parity_check, logical
+
+    def _matrix(self, rows: numpy.ndarray, columns: numpy.ndarray, num_rows: int) -> sparse.csr_matrix:
+        """Builds a binary matrix on the flattened edge states with sorted column indices."""
+        order = numpy.lexsort((columns, rows))
+        rows, columns = rows[order], columns[order]
+        indptr = numpy.searchsorted(rows, numpy.arange(num_rows + 1))
+        data = numpy.ones(len(columns), dtype=numpy.uint8)
+        return sparse.csr_matrix((data, columns, indptr), shape=(num_rows, 2 * self.num_data))
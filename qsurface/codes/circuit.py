@@ -0,0 +1,318 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+import numpy
+from .arrays import lattice_matrices, state_types
+from .bitslice import flip_shots, layer_logical_state, num_words, unpack_shots, word_bits, xor_rows
+from ._template.sim import new_instance
+from ..errors._template import sample_indices
+
+
+key_type = Tuple[float, float]
+default_orders = {
+    "x": [(0, 0.5), (0.5, 0), (-0.5, 0), (0, -0.5)],
+    "z": [(0, 0.5), (-0.5, 0), (0.5, 0), (0, -0.5)],
+}
+
+
+def ancilla_types(code) -> numpy.ndarray:
+    """Returns the index of the ``state_type`` in ``state_types`` of each ancilla-qubit of ``code``, ordered by ``AncillaQubit.index``."""
+    if code.bulk is not None:
+        return code.bulk.ancilla_types
+    return numpy.array([state_types.index(ancilla.state_type) for ancilla in code.ancilla_list[0]], dtype=numpy.uint8)
+
+
+def check_pairs(code) -> Tuple[numpy.ndarray, numpy.ndarray, List[key_type]]:
+    """Returns the entangled pairs of the parity checks of a single layer of ``code``.
+
+    Returns
+    -------
+    ancillas : `~numpy.ndarray`
+        The ``AncillaQubit.index`` of every pair.
+    data : `~numpy.ndarray`
+        The ``DataQubit.index`` of every pair.
+    keys : list of tuple
+        The key of the data-qubit in ``AncillaQubit.parity_qubits`` of every pair, which is the offset from the ancilla-qubit to the data-qubit.
+    """
+    bulk = code.bulk
+    if bulk is not None:
+        node_of = numpy.repeat(numpy.arange(len(bulk.node_locs)), numpy.diff(bulk.node_indptr))
+        ancilla = ~bulk.node_pseudo[node_of]
+        keys = [bulk.keys[k] for k in bulk.node_keys[ancilla].tolist()]
+        return bulk.node_index[node_of][ancilla], bulk.node_data[ancilla], keys
+    ancillas, data, keys = [], [], []
+    for ancilla in code.ancilla_list[0]:
+        for key, data_qubit in ancilla.parity_qubits.items():
+            ancillas.append(ancilla.index)
+            data.append(data_qubit.index)
+            keys.append(key)
+    return numpy.array(ancillas, dtype=numpy.intp), numpy.array(data, dtype=numpy.intp), keys
+
+
+def cnot_schedule(code, orders: Optional[Dict[str, List[key_type]]] = None) -> List[Tuple[numpy.ndarray, numpy.ndarray]]:
+    """Returns the CNOT schedule of a round of parity measurements on ``code``.
+
+    In step ``k`` of the schedule, every ancilla-qubit of type ``t`` is entangled with its data-qubit in the direction ``orders[t][k]``, if it has one. The schedule must entangle every data-qubit at most once per step, and every pair of parity checks of different types must act on their shared data-qubits in an order that preserves their commutation, i.e. the check of type ``"x"`` must come first on an even number of the shared data-qubits. The `default_orders` satisfy both for the toric and planar codes.
+
+    Parameters
+    ----------
+    code : `~.codes._template.sim.PerfectMeasurements`
+        Initialized surface code.
+    orders
+        The order of the keys of ``AncillaQubit.parity_qubits`` for each ``state_type``, `default_orders` by default.
+
+    Returns
+    -------
+    list of tuple
+        The indices of the ancilla-qubits and data-qubits of the pairs in every step.
+    """
+    if orders is None:
+        orders = default_orders
+    ancillas, data, keys = check_pairs(code)
+    types = ancilla_types(code)[ancillas]
+    steps = numpy.empty(len(ancillas), dtype=numpy.intp)
+    for i, (t, key) in enumerate(zip(types.tolist(), keys)):
+        order = orders.get(state_types[t], [])
+        if key not in order:
+            raise ValueError(f"The key {key} of the parity checks of type {state_types[t]} is not in the schedule.")
+        steps[i] = order.index(key)
+
+    schedule = []
+    for step in range(int(steps.max(initial=-1)) + 1):
+        in_step = steps == step
+        if len(numpy.unique(data[in_step])) != numpy.count_nonzero(in_step):
+            raise ValueError(f"Data-qubits are entangled more than once in step {step} of the schedule.")
+        schedule.append((ancillas[in_step], data[in_step]))
+
+    before = defaultdict(int)
+    by_data = defaultdict(list)
+    for ancilla, t, data_qubit, step in zip(ancillas.tolist(), types.tolist(), data.tolist(), steps.tolist()):
+        by_data[data_qubit].append((ancilla, t, step))
+    for pairs in by_data.values():
+        for ancilla, t, step in pairs:
+            for other, u, other_step in pairs:
+                if t == 0 and u == 1:
+                    before[ancilla, other] += step < other_step
+    if any(count % 2 for count in before.values()):
+        raise ValueError("The schedule does not preserve the commutation of the parity checks.")
+    return schedule
+
+
+def random_flips(words: numpy.ndarray, rows: numpy.ndarray, shots: int, p: float, rng: numpy.random.Generator):
+    """Flips the bits of each of ``shots`` shots in the bit-sliced ``rows`` of ``words`` with probability ``p``, drawn by `~.errors._template.sample_indices`."""
+    trials = sample_indices(len(rows) * shots, p, rng, sparse=True)
+    index, shot = numpy.divmod(trials, shots)
+    flip_shots(words, rows[index], shot)
+
+
+def depolarize(
+    x: numpy.ndarray, z: numpy.ndarray, qubits: List[numpy.ndarray], shots: int, p: float, rng: numpy.random.Generator
+):
+    """Applies depolarizing noise on the bit-sliced Pauli frames ``x`` and ``z``, for each of ``shots`` shots.
+
+    Every location, which is a tuple of the qubits at the same position in the arrays of ``qubits``, fails with probability ``p``. A failed location is hit by one of the ``4 ** len(qubits) - 1`` nontrivial Paulis on its qubits, drawn uniformly.
+    """
+    trials = sample_indices(len(qubits[0]) * shots, p, rng, sparse=True)
+    if not len(trials):
+        return
+    location, shot = numpy.divmod(trials, shots)
+    paulis = rng.integers(1, 4 ** len(qubits), size=len(trials))
+    for i, rows in enumerate(qubits):
+        for frame, bit in [(x, 2 * i), (z, 2 * i + 1)]:
+            flips = (paulis >> bit) & 1 == 1
+            flip_shots(frame, rows[location[flips]], shot[flips])
+
+
+def load_layers(code, errors: numpy.ndarray, measured: numpy.ndarray, loaded: Optional[list] = None) -> Optional[list]:
+    """Sets the edge states and measurements of all layers of ``code`` to the boolean ``errors`` of shape ``(layers, 2 * num_data)`` and ``measured`` of shape ``(layers, num_ancilla)``.
+
+    The syndrome of an ancilla-qubit is the difference between its measurements on consecutive layers, as in `~.codes._template.sim.FaultyMeasurements.random_measure_layer`. As for `~.codes.bitslice.load_errors`, the edges in ``loaded`` and the edges flipped since are reset first, all edges if ``loaded`` is none, and the instance of the code is renewed. The measurement errors of the ancilla-qubits are not set.
+
+    Returns
+    -------
+    list or None
+        The edges that are set, to be passed as ``loaded`` to the next call. None for the array backend.
+    """
+    code.instance = new_instance()
+    syndrome = measured.copy()
+    syndrome[1:] ^= measured[:-1]
+    if code.arrays is not None:
+        arrays = code.arrays
+        arrays.states[:] = errors.reshape(arrays.states.shape)
+        arrays.measured_state[:] = measured
+        arrays.syndrome[:] = syndrome
+        code.flipped_edges.clear()
+        return None
+
+    if loaded is None:
+        loaded = [edge for z in range(code.layers) for edge in code.edge_list[z]]
+    for edge in loaded + code.flipped_edges:
+        edge.state = 0
+    loaded = [code.edge_list[z][i] for z, i in zip(*(axis.tolist() for axis in numpy.nonzero(errors)))]
+    for edge in loaded:
+        edge.state = 1
+    code.flipped_edges.clear()
+
+    for z in range(code.layers):
+        for ancilla in list(code._nontrivial[z]):
+            ancilla.measured_state = False
+    for ancilla in list(code._syndromes):
+        ancilla.syndrome = False
+    for z, i in zip(*(axis.tolist() for axis in numpy.nonzero(measured))):
+        code.ancilla_list[z][i].measured_state = True
+    for z, i in zip(*(axis.tolist() for axis in numpy.nonzero(syndrome))):
+        code.ancilla_list[z][i].syndrome = True
+    return loaded
+
+
+class CircuitShots(object):
+    """Circuit-level noise on the parity measurements of a surface code for a batch of shots, simulated by Pauli frames.
+
+    A round of parity measurements is a fixed schedule of CNOT gates (see `cnot_schedule`). An ancilla-qubit of type ``"x"`` detects the flips of the ``"x"`` edges of its data-qubits: it is prepared in the Z basis, is the target of CNOT gates from its data-qubits, and is measured in the Z basis. An ancilla-qubit of type ``"z"`` is prepared in the X basis, is the control of CNOT gates to its data-qubits, and is measured in the X basis. The X and Z frames of the Pauli errors on the data-qubits and ancilla-qubits are propagated through the gates of a step for all shots at once, with bitwise operations on the index arrays of the schedule. The frames are stored bit-sliced in 64-bit words as in `~.codes.bitslice.BitSlicedShots`, where bit ``i % 64`` of word ``i // 64`` belongs to shot ``i``.
+
+    Every layer of ``code`` holds a round. The data-qubits are depolarized at the start of every round with ``p_idle``. Every ancilla-qubit is prepared with a flip in its basis with ``p_prep``, every CNOT gate is followed by two-qubit depolarizing noise with ``p_cnot``, and every measurement is flipped with ``p_measure``. As for `~.codes._template.sim.FaultyMeasurements`, the final round measures the parities of the data-qubits perfectly. The shots are decoded one by one by loading their rounds onto the layers of ``code`` with `load_shot`, where the syndromes are the differences between the measurements of consecutive rounds. Shots with a trivial syndrome in all rounds are not decoded.
+
+    Parameters
+    ----------
+    code : `~.codes._template.sim.FaultyMeasurements`
+        Initialized surface code with faulty measurements, of which the lattice topology and the number of layers is used.
+    shots
+        Number of shots in the batch, preferably a multiple of 64.
+    orders
+        The order of the CNOT gates of each type of parity check, see `cnot_schedule`.
+
+    Attributes
+    ----------
+    schedule : list of tuple
+        The indices of the ancilla-qubits and data-qubits of the CNOT gates in every step, see `cnot_schedule`.
+    states : `~numpy.ndarray`
+        Bit-sliced edge states of the data-qubits at the end of every round, of shape ``(layers, 2 * num_data, num_words(shots))``.
+    measured : `~numpy.ndarray`
+        Bit-sliced measurements of every round of shape ``(layers, num_ancilla, num_words(shots))``, ordered by ``AncillaQubit.index``.
+    """
+
+    def __init__(self, code, shots: int = word_bits, orders: Optional[Dict[str, List[key_type]]] = None, **kwargs):
+        self.code = code
+        self.shots = shots
+        self.layers = code.layers
+        self.parity_check, self.logical = lattice_matrices(code)
+        self.num_data = self.parity_check.shape[1] // len(state_types)
+        self.num_ancilla = self.parity_check.shape[0]
+        self.ancilla_types = ancilla_types(code)
+        self.schedule = cnot_schedule(code, orders)
+
+        # Controls and targets of the gates of every step, indexed in the frames of the data-qubits and ancilla-qubits
+        self._gates = []
+        for ancillas, data in self.schedule:
+            z_check = self.ancilla_types[ancillas] == 1
+            ancillas = ancillas + self.num_data
+            self._gates.append((numpy.where(z_check, ancillas, data), numpy.where(z_check, data, ancillas)))
+
+        words = num_words(shots)
+        self.states = numpy.zeros((self.layers, 2 * self.num_data, words), dtype=numpy.uint64)
+        self.measured = numpy.zeros((self.layers, self.num_ancilla, words), dtype=numpy.uint64)
+        self._loaded = None
+
+    def __repr__(self):
+        return f"<CircuitShots {self.shots} shots of {self.layers} rounds, {len(self.schedule)} CNOT steps>"
+
+    def random_errors(
+        self,
+        p_cnot: float = 0,
+        p_idle: float = 0,
+        p_prep: float = 0,
+        p_measure: float = 0,
+        rng: Optional[numpy.random.Generator] = None,
+        **kwargs,
+    ):
+        """Simulates the rounds of parity measurements of all shots with circuit-level noise.
+
+        Parameters
+        ----------
+        p_cnot
+            Probability of two-qubit depolarizing noise after a CNOT gate.
+        p_idle
+            Probability of depolarizing noise on a data-qubit at the start of a round.
+        p_prep
+            Probability of a flip of an ancilla-qubit after preparation.
+        p_measure
+            Probability of a flipped measurement.
+        rng
+            Random number generator, the generator of the code at ``code.rng`` by default.
+        """
+        if rng is None:
+            rng = self.code.rng
+        num_data, shots = self.num_data, self.shots
+        x = numpy.zeros((num_data + self.num_ancilla, num_words(shots)), dtype=numpy.uint64)
+        z = numpy.zeros_like(x)
+        data = numpy.arange(num_data)
+        z_check = self.ancilla_types == 1
+        ancillas = numpy.arange(self.num_ancilla) + num_data
+
+        for layer in range(self.layers):
+            depolarize(x, z, [data], shots, p_idle, rng)
+            if layer == self.layers - 1:
+                self.states[layer] = numpy.concatenate([x[:num_data], z[:num_data]])
+                self.measured[layer] = xor_rows(self.parity_check, self.states[layer])
+                break
+
+            x[num_data:] = 0
+            z[num_data:] = 0
+            random_flips(x, ancillas[~z_check], shots, p_prep, rng)
+            random_flips(z, ancillas[z_check], shots, p_prep, rng)
+            for controls, targets in self._gates:
+                x[targets] ^= x[controls]
+                z[controls] ^= z[targets]
+                depolarize(x, z, [controls, targets], shots, p_cnot, rng)
+
+            self.states[layer] = numpy.concatenate([x[:num_data], z[:num_data]])
+            self.measured[layer] = numpy.where(z_check[:, None], z[num_data:], x[num_data:])
+            random_flips(self.measured[layer], numpy.arange(self.num_ancilla), shots, p_measure, rng)
+
+    def syndrome(self) -> numpy.ndarray:
+        """Returns the bit-sliced syndromes of all rounds of shape ``(layers, num_ancilla, num_words(shots))``, which are the differences between the measurements of consecutive rounds."""
+        syndrome = self.measured.copy()
+        syndrome[1:] ^= self.measured[:-1]
+        return syndrome
+
+    def logical_state(self) -> numpy.ndarray:
+        """Returns the bit-sliced logical states of the data-qubits after the final round, of shape ``(num_logical, num_words(shots))``."""
+        return xor_rows(self.logical, self.states[-1])
+
+    def nontrivial_shots(self) -> numpy.ndarray:
+        """Returns the indices of the shots with a nontrivial syndrome in any round."""
+        words = numpy.bitwise_or.reduce(self.syndrome().reshape(-1, self.states.shape[-1]), axis=0)
+        return numpy.flatnonzero(unpack_shots(words[None, :], self.shots)[0])
+
+    def shot_bits(self, shot: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Returns the edge states of shape ``(layers, 2 * num_data)`` and the measurements of shape ``(layers, num_ancilla)`` of ``shot`` as boolean arrays."""
+        word, bit = divmod(shot, word_bits)
+        return tuple((words[..., word] >> numpy.uint64(bit)) & numpy.uint64(1) == 1 for words in [self.states, self.measured])
+
+    def load_shot(self, shot: int):
+        """Loads the rounds of ``shot`` onto the layers of ``code``, see `load_layers`."""
+        self._loaded = load_layers(self.code, *self.shot_bits(shot), self._loaded)
+
+    def decode(self, decoder, **kwargs) -> numpy.ndarray:
+        """Decodes all shots and returns whether each shot is free of a logical error.
+
+        Only the shots with a nontrivial syndrome are loaded onto ``code`` and decoded by ``decoder``, after which the logical state of the decode layer is read by `~.codes.bitslice.layer_logical_state`. The logical error of a shot with a trivial syndrome is read from the packed logical states.
+
+        Parameters
+        ----------
+        decoder : `~.decoders._template.Sim`
+            Decoder of ``code``.
+        kwargs
+            Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+
+        Returns
+        -------
+        `~numpy.ndarray`
+            Boolean array of length ``shots``, which is false for shots with a logical error.
+        """
+        no_error = ~unpack_shots(self.logical_state(), self.shots).any(axis=0)
+        for shot in self.nontrivial_shots().tolist():
+            self.load_shot(shot)
+            decoder.decode(**kwargs)
+            no_error[shot] = not any(layer_logical_state(self.code).values())
+        return no_error
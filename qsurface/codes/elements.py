@@ -1,10 +1,47 @@
 from abc import ABC
+import copyreg
+import gc
+import pickle
 import random
+import numpy
+import io
 from typing import Optional, Tuple, Union
 from collections import defaultdict
 
 
-class Qubit(ABC):
+class Element(object):
+    """Base class of all code elements.
+
+    The element classes in this module are ``__slots__`` based and have no instance dictionary. A code does not instance these classes directly, but a subclass generated by `element_class`, which adds the extension fields declared with `register_fields`.
+    """
+
+    __slots__ = ()
+    _field_defaults = {}
+    _element, _compact = None, False
+
+    def _init_fields(self):
+        """Sets the default values of the extension fields of a compact element."""
+        for name, value in self._field_defaults.items():
+            setattr(self, name, value)
+
+    def get_fields(self) -> dict:
+        """Returns all attributes stored on the element, both in slots and in the instance dictionary."""
+        fields = dict(getattr(self, "__dict__", {}))
+        for name in slot_names(type(self)):
+            try:
+                fields[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return fields
+
+    def __reduce_ex__(self, protocol):
+        reduced = super().__reduce_ex__(protocol)
+        if self._element is None:
+            return reduced
+        return (new_element, (self._element, self._compact)) + tuple(reduced[2:])
+
+
+class Qubit(Element, ABC):
     """General type qubit object.
 
     # This class mainly serves as a superclass or template to other more useful qubit types, which have the apprioate subclass attributes and subclass methods. For other types to to the 'See Also' section.
@@ -15,18 +52,30 @@ class Qubit(ABC):
         Location of the qubit in coordinates.
     z
         Layer position of qubit. Different layers correspond to time instances of a surface for faulty measurement simulations.
+    index
+        Integer index of the qubit within its layer. Qubits of the same type are indexed in order of initialization.
     """
 
+    __slots__ = ("loc", "z", "index", "_errors")
     qubit_type = "Q"
 
-    def __init__(self, loc: Tuple[float, float], z: float = 0, *args, **kwargs):
+    def __init__(self, loc: Tuple[float, float], z: float = 0, *args, index: int = 0, **kwargs):
         self.loc = loc
         self.z = z
-        self.errors = defaultdict(float)
+        self.index = index
+        self._errors = None
+        self._init_fields()
 
     def __repr__(self):
         return f"{self.qubit_type}({self.loc[0]},{self.loc[1]}|{self.z})"
 
+    @property
+    def errors(self):
+        """Dictionary of errors applied to the qubit, allocated on first access."""
+        if self._errors is None:
+            self._errors = defaultdict(float)
+        return self._errors
+
 
 class DataQubit(Qubit):
     """Data type qubit object.
@@ -48,6 +97,7 @@ class DataQubit(Qubit):
         Indicator for a reinitialized (replaced) data qubit.
     """
 
+    __slots__ = ("edges", "reinitialized")
     qubit_type = "D"
 
     def __init__(self, *args, **kwargs):
@@ -89,6 +139,10 @@ class AncillaQubit(Qubit):
     ----------
     state_type : str, {"x", "z"}
         Type of 'codes.elements.Edge' objects belonging to the `~.codes.elements.DataQubit` objects entangled to the current ancilla-qubit for stabilizer measurements.
+    syndromes : dict, optional
+        Ordered set (dictionary with ``None`` values) shared by the ancilla-qubits of a code, which is kept up to date with all ancilla-qubits that are a syndrome.
+    nontrivial : dict, optional
+        Ordered set shared by the ancilla-qubits of a layer, which is kept up to date with all ancilla-qubits in the layer with a nontrivial ``measured_state``.
 
     Attributes
     ----------
@@ -113,11 +167,30 @@ class AncillaQubit(Qubit):
         True
     """
 
+    __slots__ = (
+        "state_type",
+        "parity_qubits",
+        "z_neighbors",
+        "measurement_error",
+        "_syndromes",
+        "_nontrivial",
+        "_measured_state",
+        "_syndrome",
+    )
     qubit_type = "A"
 
-    def __init__(self, *args, state_type: str = "default", **kwargs):
+    def __init__(
+        self,
+        *args,
+        state_type: str = "default",
+        syndromes: Optional[dict] = None,
+        nontrivial: Optional[dict] = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.state_type = state_type
+        self._syndromes, self._nontrivial = syndromes, nontrivial
+        self._measured_state, self._syndrome = False, False
         self.measured_state = False
         self.syndrome = False
         self.parity_qubits = {}
@@ -128,6 +201,32 @@ class AncillaQubit(Qubit):
     def state(self):
         return self.measure()
 
+    @property
+    def measured_state(self):
+        return self._measured_state
+
+    @measured_state.setter
+    def measured_state(self, state: bool):
+        self._measured_state = state
+        if self._nontrivial is not None:
+            if state:
+                self._nontrivial[self] = None
+            else:
+                self._nontrivial.pop(self, None)
+
+    @property
+    def syndrome(self):
+        return self._syndrome
+
+    @syndrome.setter
+    def syndrome(self, state: bool):
+        self._syndrome = state
+        if self._syndromes is not None:
+            if state:
+                self._syndromes[self] = None
+            else:
+                self._syndromes.pop(self, None)
+
     def measure(self, p_bitflip_plaq: float = 0, p_bitflip_star: float = 0, **kwargs) -> bool:
         """Applies a parity measurement on the ancilla.
 
@@ -142,7 +241,7 @@ class AncillaQubit(Qubit):
         """
         parity = False
         for data_qubit in self.parity_qubits.values():
-            if data_qubit.state[self.state_type]:
+            if data_qubit.edges[self.state_type].state:
                 parity = not parity
 
         p_measure = p_bitflip_plaq if self.state_type == "x" else p_bitflip_star
@@ -156,7 +255,7 @@ class AncillaQubit(Qubit):
         return parity
 
 
-class Edge(object):
+class Edge(Element):
     """A state object belonging to a `~.codes.elements.DataQubit` object.
 
     An edge cannot have open vertices and must be spanned by two nodes. In this case, the two nodes must be `~.codes.elements.AncillaQubit` objects, and are stored in ``self.nodes``.
@@ -169,6 +268,8 @@ class Edge(object):
         Error type associated with the current edge.
     initial_state
         State of the object after initialization.
+    flipped : list, optional
+        List shared by the edges of a code to which the edge appends itself whenever its state changes.
 
     Attributes
     ----------
@@ -178,6 +279,7 @@ class Edge(object):
         The current quantum state on the edge object.
     """
 
+    __slots__ = ("qubit", "state_type", "_nodes", "_flipped", "_state")
     edge_type, rep = "edge", "-"
 
     def __init__(
@@ -185,12 +287,16 @@ class Edge(object):
         qubit: DataQubit,
         state_type: str = "",
         initial_state: Optional[bool] = None,
+        flipped: Optional[list] = None,
         **kwargs,
     ):
         # fixed parameters
         self.qubit = qubit
         self.state_type = state_type
         self._nodes = []
+        self._flipped = flipped
+        self._state = False
+        self._init_fields()
         self.state = random.random() > 0.5 if initial_state is None else initial_state
 
     def _reinitialize(self, initial_state: Optional[bool] = None, **kwargs):
@@ -202,6 +308,16 @@ class Edge(object):
     def __repr__(self):
         return "e{}{}{}|{}".format(self.state_type, self.rep, self.qubit.loc, self.qubit.z)
 
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state: bool):
+        if self._flipped is not None and state != self._state:
+            self._flipped.append(self)
+        self._state = state
+
     @property
     def nodes(self):
         return self._nodes
@@ -215,7 +331,7 @@ class Edge(object):
         if len(self._nodes) < 2:
             self._nodes.append(node)
             if len(self._nodes) == 2:
-                self._nodes == tuple(self._nodes)
+                self._nodes = tuple(self._nodes)
         else:
             raise ValueError("This edge already has two nodes: {}".format(self._nodes))
 
@@ -226,10 +342,226 @@ class PseudoQubit(AncillaQubit):
     Edges needs to be spanned by two nodes. For data qubits on the boundary, one of its edges additionally requires an ancilla qubit like node, which is the pseudo-qubit.
     """
 
+    __slots__ = ()
     qubit_type = "pA"
 
 
 class PseudoEdge(Edge):
     """Vertical edge connecting time instances of ancilla-qubits, imitates `.codes.elements.Edge`."""
 
+    __slots__ = ()
     edge_type, rep = "pseudo", "|"
+
+
+class ArrayEdge(Edge):
+    """Edge object with its state stored in a `~.codes.arrays.LatticeArrays` object.
+
+    The edge is a thin view onto the ``states`` array of the lattice arrays, such that the state can be accessed both per edge and as a whole array. Until the edge is bound to the arrays of the code by `bind`, the state is stored in a private single-element array.
+    """
+
+    __slots__ = ("_states", "_key")
+
+    def __init__(self, *args, **kwargs):
+        self._states, self._key = numpy.zeros(1, dtype=bool), 0
+        super().__init__(*args, **kwargs)
+
+    @property
+    def state(self):
+        return bool(self._states[self._key])
+
+    @state.setter
+    def state(self, state: bool):
+        if self._flipped is not None and state != self._states[self._key]:
+            self._flipped.append(self)
+        self._states[self._key] = state
+
+    def bind(self, states: numpy.ndarray, key: Tuple[int, int, int]):
+        """Binds the edge to element ``key`` of the ``states`` array. The current state is copied to the array."""
+        states[key] = self.state
+        self._states, self._key = states, key
+
+
+class ArrayAncillaQubit(AncillaQubit):
+    """Ancilla-qubit with its measurement outcomes stored in a `~.codes.arrays.LatticeArrays` object.
+
+    The attributes ``measured_state``, ``syndrome`` and ``measurement_error`` are thin views onto the arrays with the same names in the lattice arrays. Until the ancilla is bound by `bind`, the values are stored in private single-element arrays.
+    """
+
+    __slots__ = ("_key", "_measured_state_array", "_syndrome_array", "_measurement_error_array")
+
+    def __init__(self, *args, **kwargs):
+        self._key = 0
+        self._measured_state_array = numpy.zeros(1, dtype=bool)
+        self._syndrome_array = numpy.zeros(1, dtype=bool)
+        self._measurement_error_array = numpy.zeros(1, dtype=bool)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def measured_state(self):
+        return bool(self._measured_state_array[self._key])
+
+    @measured_state.setter
+    def measured_state(self, state: bool):
+        self._measured_state_array[self._key] = state
+
+    @property
+    def syndrome(self):
+        return bool(self._syndrome_array[self._key])
+
+    @syndrome.setter
+    def syndrome(self, state: bool):
+        self._syndrome_array[self._key] = state
+
+    @property
+    def measurement_error(self):
+        return bool(self._measurement_error_array[self._key])
+
+    @measurement_error.setter
+    def measurement_error(self, state: bool):
+        self._measurement_error_array[self._key] = state
+
+    def bind(self, arrays, key: Tuple[int, int]):
+        """Binds the ancilla to element ``key`` of the measurement arrays of a `~.codes.arrays.LatticeArrays` object."""
+        for name in ["measured_state", "syndrome", "measurement_error"]:
+            array = getattr(arrays, name)
+            array[key] = getattr(self, name)
+            setattr(self, f"_{name}_array", array)
+        self._key = key
+
+
+extension_fields = defaultdict(dict)
+element_classes = {}
+_slot_names = {}
+_slot_setters = {}
+
+
+def slot_names(cls: type) -> Tuple[str, ...]:
+    """Returns the names of all slots of ``cls`` and its base classes."""
+    if cls not in _slot_names:
+        _slot_names[cls] = tuple(
+            name for base in cls.__mro__ for name in base.__dict__.get("__slots__", ()) if name != "__dict__"
+        )
+    return _slot_names[cls]
+
+
+def slot_setter(cls: type):
+    """Returns a function ``setter(element, values)`` that assigns the tuple ``values`` to the slots of ``cls`` in the order of `slot_names`."""
+    if cls not in _slot_setters:
+        targets = "".join(f"element.{name}, " for name in slot_names(cls))
+        namespace = {}
+        exec(f"def setter(element, values):\n    {targets or '_'} = values", namespace)
+        _slot_setters[cls] = namespace["setter"]
+    return _slot_setters[cls]
+
+
+def register_fields(element: type, **defaults):
+    """Declares extra per-element fields required by a decoder or error module.
+
+    The fields are added to every element class generated by `element_class` from ``element`` or any of its subclasses. Registration must take place before the code is instanced, which is why decoder and error modules register their fields at import.
+
+    Parameters
+    ----------
+    element
+        Element class from this module, e.g. `AncillaQubit`.
+    defaults
+        Field names with their default values. The default values must be immutable, as they are shared between all elements.
+
+    Examples
+    --------
+    The Union-Find decoder stores the cluster of an ancilla-qubit in a field ``cluster``:
+
+        >>> register_fields(AncillaQubit, cluster=None)
+    """
+    extension_fields[element].update(defaults)
+
+
+def element_class(element: type, compact: bool = False) -> type:
+    """Returns the class that is instanced by a code for the elements of type ``element``.
+
+    The returned class is a subclass of ``element`` with all fields registered by `register_fields` for ``element`` and its base classes. In the default mode, the subclass has an instance dictionary, and the fields are class attributes holding the default values. Other attributes can still be added to the elements, which is required for plotting. In the compact mode, the fields are added as ``__slots__`` and the elements have no instance dictionary, which reduces memory use and attribute access times.
+
+    Parameters
+    ----------
+    element
+        Element class from this module or a subclass of it.
+    compact
+        Generate a compact ``__slots__`` class.
+    """
+    fields = {}
+    for base in reversed(element.__mro__):
+        fields.update(extension_fields.get(base, {}))
+    key = (element, compact, tuple(fields.items()))
+    if key not in element_classes:
+        namespace = {"_element": element, "_compact": compact, "__module__": element.__module__}
+        if compact:
+            namespace.update(__slots__=tuple(fields), _field_defaults=fields)
+        else:
+            namespace.update(fields)
+        element_classes[key] = type(element.__name__, (element,), namespace)
+    return element_classes[key]
+
+
+def new_element(element: type, compact: bool = False):
+    """Creates an uninitialized element of the generated class of ``element``, used to unpickle elements."""
+    cls = element_class(element, compact)
+    return cls.__new__(cls)
+
+
+class _ElementPickler(pickle.Pickler):
+    """Pickler that creates the elements in ``elements`` without their fields, see `dumps_elements`.
+
+    Elements are intercepted by `pickle.Pickler.reducer_override`, which is only called from Python 3.8 onwards. Older interpreters are not supported, see *setup.py*.
+    """
+
+    def __init__(self, file, elements: list):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.element_ids = {id(element) for element in elements}
+
+    def reducer_override(self, obj):
+        if isinstance(obj, type) and issubclass(obj, Element) and obj._element is not None:
+            return element_class, (obj._element, obj._compact)
+        if not isinstance(obj, Element):
+            return NotImplemented
+        if id(obj) not in self.element_ids:
+            raise ValueError(f"Element {obj} is referenced but not included in the pickled elements.")
+        return copyreg.__newobj__, (type(obj),)
+
+
+def dumps_elements(elements: list, obj=None) -> bytes:
+    """Pickles a graph of elements and an object ``obj`` that refers to them.
+
+    The elements of a lattice refer to each other, such that the standard recursive pickling of an element pickles the entire graph depth first and exceeds the recursion limit on large lattices. Here, all elements are first pickled without their fields, after which the fields of all elements are pickled as a flat list, in which all references to elements are resolved by the pickle memo.
+
+    Parameters
+    ----------
+    elements
+        All elements that can be referenced by the fields of the elements or by ``obj``.
+    obj
+        Object to pickle together with the elements.
+    """
+    fields = [
+        (tuple(getattr(element, name, None) for name in slot_names(type(element))), getattr(element, "__dict__", None))
+        for element in elements
+    ]
+    file = io.BytesIO()
+    _ElementPickler(file, elements).dump((elements, fields, obj))
+    return file.getvalue()
+
+
+def loads_elements(data: bytes):
+    """Unpickles elements pickled by `dumps_elements` and returns ``obj``.
+
+    The cyclic garbage collector is paused while the elements are restored, as the many allocations would otherwise trigger repeated collections over the partially restored lattice.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        elements, fields, obj = pickle.loads(data)
+        for element, (values, instance_dict) in zip(elements, fields):
+            slot_setter(type(element))(element, values)
+            if instance_dict:
+                element.__dict__.update(instance_dict)
+    finally:
+        if enabled:
+            gc.enable()
+    return obj
@@ -1,4 +1,7 @@
-from qsurface.codes.elements import AncillaQubit
+from typing import Optional
+from qsurface.codes.elements import AncillaQubit, PseudoQubit
+from ..bulk import BulkLattice, NodeBlock, grid_locs, interleave
+import numpy
 from ..toric.sim import PerfectMeasurements as ToricPM, FaultyMeasurements as ToricFM
 
 
@@ -62,6 +65,22 @@ class PerfectMeasurements(ToricPM):
             if loc in self.data_qubits[z]:
                 self.entangle_pair(self.data_qubits[z][loc], ancilla_qubit, key)
 
+    def bulk_surface(self) -> BulkLattice:
+        # Inherited docstring
+        (X, Y), keys = self.size, [(0.5, 0), (-0.5, 0), (0, 0.5), (0, -0.5)]
+        xs, ys = numpy.arange(X), numpy.arange(Y)
+        return BulkLattice(
+            self.size,
+            numpy.concatenate([grid_locs(xs + 0.5, ys), grid_locs(xs[1:], ys[:-1] + 0.5)]),
+            [
+                NodeBlock(interleave(grid_locs([0], ys), grid_locs([X], ys)), "x", keys, pseudo=True),
+                NodeBlock(grid_locs(xs[1:], ys), "x", keys),
+                NodeBlock(interleave(grid_locs(xs + 0.5, [-0.5]), grid_locs(xs + 0.5, [Y - 0.5])), "z", keys, pseudo=True),
+                NodeBlock(grid_locs(xs + 0.5, ys[:-1] + 0.5, outer="x"), "z", keys),
+            ],
+            {"x": ("x", grid_locs([0.5], xs)), "z": ("z", grid_locs(ys + 0.5, [0]))},
+        )
+
     def init_logical_operator(self, **kwargs):
         """Initiates the logical operators [x,z] of the planar code."""
         operators = {
@@ -70,6 +89,19 @@ class PerfectMeasurements(ToricPM):
         }
         self.logical_operators = operators
 
+    def get_boundary_pseudo(self, ancilla: AncillaQubit) -> Optional[PseudoQubit]:
+        """Returns the closest `~.codes.elements.PseudoQubit` in the boundary of the code to ``ancilla``.
+
+        The ``"x"`` pseudo-qubits lie on the left and right boundaries, the ``"z"`` pseudo-qubits on the bottom and top boundaries.
+        """
+        if ancilla.state_type == "x":
+            x = 0 if ancilla.loc[0] < self.size[0] / 2 else self.size[0]
+            loc = (x, ancilla.loc[1])
+        else:
+            y = -0.5 if ancilla.loc[1] < self.size[1] / 2 else self.size[1] - 0.5
+            loc = (ancilla.loc[0], y)
+        return self.pseudo_qubits.get(ancilla.z, {}).get(loc)
+
 
 class FaultyMeasurements(ToricFM, PerfectMeasurements):
     # Inherited docstring
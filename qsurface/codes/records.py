@@ -0,0 +1,231 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional, Tuple, Union
+import os
+import pickle
+import numpy
+from .bitslice import layer_logical_state, load_errors
+from .snapshot import _aligned, _prefix
+
+
+magic = b"QSURFREC"
+version = 1
+fields = ["errors", "erasures", "syndrome"]
+
+
+def _widths(code) -> dict:
+    """Returns the number of bits of every field of a recorded shot of ``code``."""
+    num_data = len(code.locs["data"])
+    return {"errors": 2 * num_data, "erasures": num_data, "syndrome": len(code.locs["ancilla"])}
+
+
+def read_header(path: Union[str, Path]) -> Tuple[dict, int]:
+    """Reads the header of a shot record written by `ShotRecorder` and returns it together with the offset of the first row."""
+    with open(path, "rb") as file:
+        name, file_version, length = _prefix.unpack(file.read(_prefix.size))
+        if name != magic or file_version != version:
+            raise ValueError(f"{path} is not a shot record of version {version}.")
+        header = pickle.loads(file.read(length))
+    return header, _aligned(_prefix.size + length)
+
+
+def check_header(header: dict, code, path: Union[str, Path], chunk_size: Optional[int] = None):
+    """Raises a `ValueError` if the record at ``path`` with ``header`` does not belong to the lattice of ``code``, or was written with a different ``chunk_size``."""
+    expected = {"code": code.name, "size": code.size, "layers": code.layers, "fields": _widths(code)}
+    if chunk_size is not None:
+        expected["chunk_size"] = chunk_size
+    for key, value in expected.items():
+        if header[key] != value:
+            raise ValueError(f"Record {path} has {key} {header[key]}, which differs from {value} of {code}.")
+
+
+class ShotRecorder(object):
+    """Records the shots of a surface code with perfect measurements to a single binary file.
+
+    Every shot is stored as a row of bit-packed fields: the flattened edge states of the true error in the order of ``code.edge_list[0]``, the erasure mask of the data-qubits (see `~.errors.erasure.Sim.erased`), and the syndrome ordered by ``AncillaQubit.index``. The file starts with the same prefix as a lattice snapshot (see `~.codes.snapshot.write_snapshot`) with its own magic bytes, followed by a pickled header that describes the lattice and the row layout. All rows have the same number of bytes, such that shot ``i`` is found at a fixed offset and the shots of chunk ``c`` are the rows ``c * chunk_size`` up to ``(c + 1) * chunk_size``. Rows are written per chunk, and a record can be extended by opening it with ``append``.
+
+    Parameters
+    ----------
+    code : `~.codes._template.sim.PerfectMeasurements`
+        Initialized surface code with perfect measurements.
+    path
+        File to write.
+    chunk_size
+        Number of shots per chunk.
+    append
+        Append to an existing record of the same lattice and ``chunk_size`` instead of overwriting it. Raises a `ValueError` if the record belongs to another lattice, see `check_header`.
+
+    Attributes
+    ----------
+    header : dict
+        Description of the lattice and the row layout.
+    row_bytes : int
+        Number of bytes of every row.
+    buffer : list of `~numpy.ndarray`
+        Rows of the current chunk that are not yet written.
+    """
+
+    def __init__(self, code, path: Union[str, Path], chunk_size: int = 1024, append: bool = False, **kwargs):
+        if code.layers != 1:
+            raise ValueError("Only shots of codes with perfect measurements can be recorded.")
+        self.code, self.path = code, Path(path)
+        widths = _widths(code)
+        self.header = {
+            "code": code.name,
+            "size": code.size,
+            "layers": code.layers,
+            "fields": {name: widths[name] for name in fields},
+            "chunk_size": chunk_size,
+        }
+        self.row_bytes = -(-sum(widths.values()) // 8)
+        self.buffer = []
+
+        if append and self.path.exists():
+            header, self.start = read_header(self.path)
+            check_header(header, code, path, chunk_size)
+            self.header = header
+            self.file = open(self.path, "r+b")
+            self.file.seek(0, os.SEEK_END)
+        else:
+            table = pickle.dumps(self.header)
+            self.start = _aligned(_prefix.size + len(table))
+            self.file = open(self.path, "wb")
+            self.file.write(_prefix.pack(magic, version, len(table)))
+            self.file.write(table)
+            self.file.seek(self.start)
+
+    def __repr__(self):
+        return f"<ShotRecorder {self.path}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record(self):
+        """Records the current shot of ``code``, after its errors have been applied and its ancilla-qubits have been measured."""
+        code, widths = self.code, self.header["fields"]
+        if code.arrays is not None:
+            errors = code.arrays.states[0].ravel()
+        else:
+            errors = numpy.fromiter((edge.state for edge in code.edge_list[0]), dtype=bool, count=widths["errors"])
+        erasure = code.errors.get("erasure")
+        if erasure is not None and erasure.mask_instance == code.instance:
+            erasures = erasure.erased(0)
+        else:
+            erasures = numpy.zeros(widths["erasures"], dtype=bool)
+        syndrome = numpy.zeros(widths["syndrome"], dtype=bool)
+        syndrome[[ancilla.index for ancilla in code.syndromes]] = True
+        self.buffer.append(numpy.packbits(numpy.concatenate([errors, erasures, syndrome]), bitorder="little"))
+        if len(self.buffer) == self.header["chunk_size"]:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered rows to the file."""
+        if self.buffer:
+            self.file.write(numpy.stack(self.buffer).tobytes())
+            self.buffer = []
+
+    def close(self):
+        """Writes the buffered rows and closes the file."""
+        self.flush()
+        self.file.close()
+
+
+class ShotReplay(object):
+    """Replays the shots of a record written by `ShotRecorder` on a surface code.
+
+    The rows of the record are memory-mapped, such that a chunk of shots is read without loading the entire record. A shot is loaded onto layer 0 of ``code`` by `load_shot`, which sets the recorded errors and erasure mask without sampling any random numbers, after which any decoder can decode it.
+
+    Parameters
+    ----------
+    code : `~.codes._template.sim.PerfectMeasurements`
+        Initialized surface code with perfect measurements, of the same lattice as the recorded code.
+    path
+        Record to read.
+    chunk_size
+        Expected number of shots per chunk of the record, which is not checked by default. Raises a `ValueError` if the record belongs to another lattice or chunk size, see `check_header`.
+
+    Attributes
+    ----------
+    header : dict
+        Description of the lattice and the row layout, see `ShotRecorder`.
+    rows : `~numpy.memmap`
+        Bit-packed rows of shape ``(shots, row_bytes)``.
+    """
+
+    def __init__(self, code, path: Union[str, Path], chunk_size: Optional[int] = None, **kwargs):
+        self.code, self.path = code, Path(path)
+        self.header, start = read_header(self.path)
+        check_header(self.header, code, path, chunk_size)
+        widths = [self.header["fields"][name] for name in fields]
+        self.bounds = numpy.cumsum([0] + widths)
+        row_bytes = -(-self.bounds[-1] // 8)
+        shots = (os.path.getsize(self.path) - start) // row_bytes
+        self.rows = numpy.memmap(self.path, dtype=numpy.uint8, mode="r", offset=start, shape=(shots, row_bytes))
+        self._loaded = None
+
+    def __repr__(self):
+        return f"<ShotReplay {len(self)} shots of {self.path}>"
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def num_chunks(self) -> int:
+        """Number of chunks in the record."""
+        return -(-len(self) // self.header["chunk_size"])
+
+    def chunk_shots(self, chunk: int) -> range:
+        """Returns the indices of the shots of ``chunk``."""
+        chunk_size = self.header["chunk_size"]
+        return range(chunk * chunk_size, min((chunk + 1) * chunk_size, len(self)))
+
+    def shots(self, shots: Union[int, slice, numpy.ndarray]) -> dict:
+        """Returns the unpacked fields of ``shots`` as boolean arrays by name, see `ShotRecorder`."""
+        bits = numpy.unpackbits(self.rows[shots], axis=-1, bitorder="little").astype(bool)
+        return {name: bits[..., self.bounds[i] : self.bounds[i + 1]] for i, name in enumerate(fields)}
+
+    def load_shot(self, shot: int, verify: bool = False):
+        """Loads the errors and erasures of ``shot`` onto layer 0 of ``code`` and measures the ancilla-qubits, see `~.codes.bitslice.load_errors`.
+
+        Parameters
+        ----------
+        shot
+            Index of the shot.
+        verify
+            Check whether the measured syndrome equals the recorded syndrome. Raises a `ValueError` otherwise.
+        """
+        shot_fields = self.shots(shot)
+        self._loaded = load_errors(self.code, shot_fields["errors"], self._loaded)
+        erasure = self.code.errors.get("erasure")
+        if erasure is not None:
+            erasure.erased(0)[:] = shot_fields["erasures"]
+        if verify:
+            measured = [ancilla.index for ancilla in self.code.syndromes]
+            if measured != numpy.flatnonzero(shot_fields["syndrome"]).tolist():
+                raise ValueError(f"Measured syndrome of shot {shot} differs from the record.")
+
+    def decode(self, decoder, shots: Optional[range] = None, verify: bool = False, **kwargs) -> numpy.ndarray:
+        """Decodes the recorded ``shots`` one by one and returns whether each shot is free of a logical error.
+
+        Parameters
+        ----------
+        decoder : `~.decoders._template.Sim`
+            Decoder of ``code``.
+        shots
+            Indices of the shots to decode, all shots by default.
+        verify
+            Check the measured syndromes against the record, see `load_shot`.
+        kwargs
+            Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+        """
+        if shots is None:
+            shots = range(len(self))
+        no_error = numpy.zeros(len(shots), dtype=bool)
+        for i, shot in enumerate(shots):
+            self.load_shot(shot, verify=verify)
+            decoder.decode(**kwargs)
+            no_error[i] = not any(layer_logical_state(self.code).values())
+        return no_error
@@ -0,0 +1,2 @@
+from . import sim
+from . import plot
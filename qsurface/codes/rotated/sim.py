@@ -0,0 +1,122 @@
+from typing import Optional
+from ..elements import AncillaQubit, PseudoQubit
+from ..bulk import BulkLattice, NodeBlock, grid_locs, interleave
+import numpy
+from ..planar.sim import PerfectMeasurements as PlanarPM
+from ..toric.sim import FaultyMeasurements as ToricFM
+
+
+class PerfectMeasurements(PlanarPM):
+    """Simulation rotated code class for perfect measurements.
+
+    The rotated planar code of distance ``d`` consists of ``d*d`` data-qubits located at ``(x+0.5, y+0.5)``, and ancilla-qubits located on the vertices ``(x, y)`` in between. An ancilla on vertex ``(x, y)`` is a star ``"x"`` ancilla if ``x + y`` is even and a plaquette ``"z"`` ancilla otherwise. Each ancilla-qubit is entangled with the data-qubits on its diagonals, which are stored by the keys ``(±0.5, ±0.5)``. The code thus reaches the same distance as the planar code with about half the number of data-qubits.
+
+    The left and right boundaries hold weight-2 star ancillas on every other vertex, and the top and bottom boundaries weight-2 plaquette ancillas. The ``"z"`` edges of the data-qubits in the outer columns terminate on a `~.codes.elements.PseudoQubit` at ``(0, y+0.5)`` or ``(size, y+0.5)``, and the ``"x"`` edges of the data-qubits in the outer rows on a pseudo-qubit at ``(x+0.5, 0)`` or ``(x+0.5, size)``. As in the planar code, every pseudo-qubit is thus connected to a single edge.
+    """
+
+    name = "rotated"
+
+    def init_surface(self, z: float = 0, **kwargs):
+        """Initializes the rotated surface code on layer ``z``.
+
+        Parameters
+        ----------
+        z : int or float, optional
+            Layer of qubits, ``z=0`` for perfect measurements.
+        """
+        self.ancilla_qubits[z], self.data_qubits[z], self.pseudo_qubits[z] = {}, {}, {}
+        parity = self.init_parity_check
+
+        # Add data qubits to surface
+        for y in range(self.size[1]):
+            for x in range(self.size[0]):
+                self.add_data_qubit((x + 0.5, y + 0.5), z=z, **kwargs)
+
+        # Add ancilla qubits to surface
+        for y in range(1, self.size[1]):
+            for x in range(self.size[0] + 1):
+                if (x + y) % 2 == 0:
+                    parity(self.add_ancilla_qubit((x, y), z=z, state_type="x", **kwargs))
+        for x in range(self.size[0]):
+            parity(self.add_pseudo_qubit((x + 0.5, 0), z=z, state_type="x", **kwargs))
+            parity(self.add_pseudo_qubit((x + 0.5, self.size[1]), z=z, state_type="x", **kwargs))
+
+        for y in range(self.size[1] + 1):
+            for x in range(1, self.size[0]):
+                if (x + y) % 2 == 1:
+                    parity(self.add_ancilla_qubit((x, y), z=z, state_type="z", **kwargs))
+        for y in range(self.size[1]):
+            parity(self.add_pseudo_qubit((0, y + 0.5), z=z, state_type="z", **kwargs))
+            parity(self.add_pseudo_qubit((self.size[0], y + 0.5), z=z, state_type="z", **kwargs))
+
+    def init_parity_check(self, ancilla_qubit: AncillaQubit, **kwargs):
+        """Initiates a parity check measurement.
+
+        For every ancilla qubit on ``(x,y)``, the data-qubits on its four diagonals are entangled for parity check measurements, of which there are two for ancilla-qubits on the boundary. A pseudo-qubit is entangled with the single data-qubit next to it.
+
+        Parameters
+        ----------
+        ancilla_qubit : `~.codes.elements.AncillaQubit`
+            Ancilla qubit to initialize.
+        """
+        (x, y), z = ancilla_qubit.loc, ancilla_qubit.z
+        if isinstance(ancilla_qubit, PseudoQubit):
+            checks = {(0.5, 0): (x + 0.5, y), (-0.5, 0): (x - 0.5, y), (0, 0.5): (x, y + 0.5), (0, -0.5): (x, y - 0.5)}
+        else:
+            checks = {
+                (0.5, 0.5): (x + 0.5, y + 0.5),
+                (-0.5, 0.5): (x - 0.5, y + 0.5),
+                (0.5, -0.5): (x + 0.5, y - 0.5),
+                (-0.5, -0.5): (x - 0.5, y - 0.5),
+            }
+        for key, loc in checks.items():
+            if loc in self.data_qubits[z]:
+                self.entangle_pair(self.data_qubits[z][loc], ancilla_qubit, key)
+
+    def init_logical_operator(self, **kwargs):
+        """Initiates the logical operators [x,z] of the rotated code.
+
+        The ``"x"`` edges connect the top and bottom boundaries, such that the logical ``"x"`` operator is measured on the bottom row of data-qubits. The ``"z"`` operator is measured on the left column of data-qubits.
+        """
+        operators = {
+            "x": [self.data_qubits[self.decode_layer][(i + 0.5, 0.5)].edges["x"] for i in range(self.size[0])],
+            "z": [self.data_qubits[self.decode_layer][(0.5, i + 0.5)].edges["z"] for i in range(self.size[1])],
+        }
+        self.logical_operators = operators
+
+    def bulk_surface(self) -> BulkLattice:
+        # Inherited docstring
+        (X, Y), xs, ys = self.size, numpy.arange(self.size[0]), numpy.arange(self.size[1])
+        diagonal, straight = [(0.5, 0.5), (-0.5, 0.5), (0.5, -0.5), (-0.5, -0.5)], [(0.5, 0), (-0.5, 0), (0, 0.5), (0, -0.5)]
+        stars = grid_locs(numpy.arange(X + 1), ys[1:])
+        plaqs = grid_locs(xs[1:], numpy.arange(Y + 1))
+        return BulkLattice(
+            self.size,
+            grid_locs(xs + 0.5, ys + 0.5),
+            [
+                NodeBlock(stars[stars.sum(axis=1) % 2 == 0], "x", diagonal),
+                NodeBlock(interleave(grid_locs(xs + 0.5, [0]), grid_locs(xs + 0.5, [Y])), "x", straight, pseudo=True),
+                NodeBlock(plaqs[plaqs.sum(axis=1) % 2 == 1], "z", diagonal),
+                NodeBlock(interleave(grid_locs([0], ys + 0.5), grid_locs([X], ys + 0.5)), "z", straight, pseudo=True),
+            ],
+            {"x": ("x", grid_locs(xs + 0.5, [0.5])), "z": ("z", grid_locs([0.5], ys + 0.5))},
+        )
+
+    def get_boundary_pseudo(self, ancilla: AncillaQubit) -> Optional[PseudoQubit]:
+        """Returns the closest `~.codes.elements.PseudoQubit` in the boundary of the code to ``ancilla``.
+
+        The ``"x"`` pseudo-qubits lie on the bottom and top boundaries, the ``"z"`` pseudo-qubits on the left and right boundaries. As the ancilla-qubits are connected diagonally, all pseudo-qubits within one position to the side of ``ancilla`` are equally close.
+        """
+        (x, y), pseudos = ancilla.loc, self.pseudo_qubits.get(ancilla.z, {})
+        if ancilla.state_type == "x":
+            boundary = 0 if y < self.size[1] / 2 else self.size[1]
+            return pseudos.get((x - 0.5 if x > 0 else x + 0.5, boundary))
+        else:
+            boundary = 0 if x < self.size[0] / 2 else self.size[0]
+            return pseudos.get((boundary, y - 0.5 if y > 0 else y + 0.5))
+
+
+class FaultyMeasurements(ToricFM, PerfectMeasurements):
+    # Inherited docstring
+
+    pass
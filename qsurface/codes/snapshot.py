@@ -0,0 +1,94 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Tuple, Union
+import pickle
+import struct
+import numpy
+
+
+magic = b"QSURFSNP"
+version = 1
+alignment = 64
+_prefix = struct.Struct("<8sIQ")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def write_snapshot(path: Union[str, Path], header: dict, lattice: bytes, arrays: Dict[str, numpy.ndarray] = {}):
+    """Writes a lattice snapshot to a single binary file.
+
+    The file starts with a fixed prefix of the magic bytes, the format version and the length of a pickled table of contents. The table of contents holds ``header``, and the offset and length of every block in the file. The serialized lattice and all arrays are stored as raw blocks that are aligned to ``alignment`` bytes, such that the arrays can be memory-mapped by `read_snapshot` without copying.
+
+    Parameters
+    ----------
+    path
+        File to write.
+    header
+        Picklable description of the snapshot.
+    lattice
+        Serialized lattice, see `~.codes._template.sim.PerfectMeasurements.dump_lattice`.
+    arrays
+        Arrays to store by name.
+    """
+    arrays = {name: numpy.ascontiguousarray(array) for name, array in arrays.items()}
+    blocks, contents = [(0, lattice)], {"header": header, "lattice": (0, len(lattice)), "arrays": {}}
+    end = len(lattice)
+    for name, array in arrays.items():
+        offset = _aligned(end)
+        blocks.append((offset, array.tobytes()))
+        contents["arrays"][name] = (array.dtype.str, array.shape, offset)
+        end = offset + array.nbytes
+
+    table = pickle.dumps(contents)
+    start = _aligned(_prefix.size + len(table))
+    with open(path, "wb") as file:
+        file.write(_prefix.pack(magic, version, len(table)))
+        file.write(table)
+        for offset, data in blocks:
+            file.seek(start + offset)
+            file.write(data)
+
+
+def read_snapshot(path: Union[str, Path], mmap: bool = True) -> Tuple[dict, memoryview, Dict[str, numpy.ndarray]]:
+    """Reads a lattice snapshot written by `write_snapshot`.
+
+    Parameters
+    ----------
+    path
+        File to read.
+    mmap
+        Memory-map the file instead of reading it into memory. The returned arrays are then read-only views onto the file.
+
+    Returns
+    -------
+    header : dict
+        The header of the snapshot.
+    lattice : memoryview
+        Serialized lattice.
+    arrays : dict of `~numpy.ndarray`
+        Arrays stored in the snapshot by name.
+    """
+    data = numpy.memmap(path, dtype=numpy.uint8, mode="r") if mmap else numpy.fromfile(path, dtype=numpy.uint8)
+    if data.size < _prefix.size:
+        raise ValueError(f"File {path} is not a qsurface snapshot.")
+    file_magic, file_version, table_length = _prefix.unpack(data[: _prefix.size].tobytes())
+    if file_magic != magic:
+        raise ValueError(f"File {path} is not a qsurface snapshot.")
+    if file_version != version:
+        raise ValueError(f"Snapshot {path} has version {file_version}, expected version {version}.")
+    contents = pickle.loads(data[_prefix.size : _prefix.size + table_length])
+    start = _aligned(_prefix.size + table_length)
+
+    offset, length = contents["lattice"]
+    lattice = memoryview(data[start + offset : start + offset + length])
+    arrays = {}
+    for name, (dtype, shape, offset) in contents["arrays"].items():
+        dtype = numpy.dtype(dtype)
+        count = int(numpy.prod(shape))
+        if count:
+            arrays[name] = numpy.frombuffer(data, dtype=dtype, count=count, offset=start + offset).reshape(shape)
+        else:
+            arrays[name] = numpy.empty(shape, dtype=dtype)
+    return contents["header"], lattice, arrays
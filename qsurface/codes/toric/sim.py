@@ -1,4 +1,6 @@
 from ..elements import AncillaQubit
+import numpy
+from ..bulk import BulkLattice, NodeBlock, grid_locs, interleave
 from .._template.sim import PerfectMeasurements as TemplatePM, FaultyMeasurements as TemplateFM
 
 
@@ -55,6 +57,23 @@ class PerfectMeasurements(TemplatePM):
             if loc in self.data_qubits[z]:
                 self.entangle_pair(self.data_qubits[z][loc], ancilla_qubit, key)
 
+    def bulk_surface(self) -> BulkLattice:
+        # Inherited docstring
+        (X, Y), keys = self.size, [(0.5, 0), (-0.5, 0), (0, 0.5), (0, -0.5)]
+        stars = grid_locs(range(X), range(Y))
+        return BulkLattice(
+            self.size,
+            interleave(stars + (0.5, 0), stars + (0, 0.5)),
+            [NodeBlock(stars, "x", keys), NodeBlock(stars + 0.5, "z", keys)],
+            {
+                "x1": ("x", grid_locs(range(X), [0.5])),
+                "x2": ("x", grid_locs([0.5], range(Y))),
+                "z1": ("z", grid_locs(numpy.arange(X) + 0.5, [0])),
+                "z2": ("z", grid_locs([0], numpy.arange(Y) + 0.5)),
+            },
+            periodic=True,
+        )
+
     def init_logical_operator(self, **kwargs):
         """Initiates the logical operators [x1, x2, z1, z2] of the toric code."""
         operators = {
@@ -6,6 +6,7 @@ from pathlib import Path
 import configparser
 import ast
 import os
+import numpy
 from ..codes._template.sim import PerfectMeasurements
 from ..codes.elements import AncillaQubit, Edge, PseudoQubit
 
@@ -134,7 +135,16 @@ class Sim(ABC):
         Compatibility with perfect or faulty measurements.
     compatibility_errors : dict
         Compatibility with the various error modules in :doc:`../errors/index`.
-
+    nodes : list of `~.codes.elements.AncillaQubit`
+        All ancilla-qubits and pseudo-qubits of the code, the position in the list is the node id. See `init_adjacency`.
+    edges : list of `~.codes.elements.Edge`
+        All edges of the decoding graph, the position in the list is the edge id.
+    adjacency_indptr, adjacency_nodes, adjacency_edges, adjacency_keys : `~numpy.ndarray`
+        Compressed sparse row adjacency of the decoding graph. The neighbors of the node with id ``i`` are found at ``[adjacency_indptr[i]:adjacency_indptr[i+1]]``, where ``adjacency_nodes`` holds the node id of the neighbor, ``adjacency_edges`` the id of the connecting edge and ``adjacency_keys`` the index of the direction key in ``adjacency_key_list``.
+    boundary_pseudo : `~numpy.ndarray`
+        Node id of the nearest pseudo-qubit in the boundary for every node, or -1 if there is none.
+    snapshot_names, snapshot_arrays : list of str
+        Names of the static tables that are stored in a lattice snapshot by `save_snapshot`, as serialized objects and as memory-mapped arrays, respectively.
     """
 
     name = ("Template simulation decoder",)
@@ -148,6 +158,8 @@ class Sim(ABC):
         pauli=True,
         erasure=True,
     )
+    snapshot_names = ["nodes", "edges", "adjacency_key_list", "_neighbors", "_neighbors_loop", "_boundary_pseudo"]
+    snapshot_arrays = ["adjacency_indptr", "adjacency_nodes", "adjacency_edges", "adjacency_keys", "boundary_pseudo"]
 
     def __init__(self, code: PerfectMeasurements, check_compatibility: bool = False, **kwargs):
 
@@ -155,6 +167,11 @@ class Sim(ABC):
         self.config_file = Path(__file__).resolve().parent / "decoders.ini"
         self.config = init_config(self.config_file)[self.short]
         self.config.update(kwargs)
+        tables = getattr(code, "decoder_tables", {}).get(self.short)
+        if tables is not None:
+            self.__dict__.update(tables)
+        else:
+            self.init_tables()
 
         if check_compatibility:
             self.check_compatibility()
@@ -189,29 +206,97 @@ class Sim(ABC):
         if compatible and not unspecified:
             print("✅ This decoder is compatible with the code.")
 
-    @staticmethod
-    def get_neighbor(ancilla_qubit: AncillaQubit, key: str) -> Tuple[AncillaQubit, Edge]:
+    def init_tables(self):
+        """Initializes the static tables of the decoder, which depend only on the lattice of the code. These are the tables listed in ``snapshot_names`` and ``snapshot_arrays``, which are loaded from a snapshot instead if the code is initialized by `~.codes._template.sim.PerfectMeasurements.load_snapshot`."""
+        self.init_adjacency()
+
+    def save_snapshot(self, path: Union[str, Path]):
+        """Saves the lattice of the code together with the static tables of the decoder to a snapshot file. See `~.codes._template.sim.PerfectMeasurements.save_snapshot`."""
+        self.code.save_snapshot(path, decoders=[self])
+
+    def init_adjacency(self):
+        """Builds the adjacency tables of the decoding graph of ``self.code``.
+
+        The decoding graph is static for an initialized code. All neighbors of each ancilla-qubit and pseudo-qubit are therefore resolved once, and stored both as integer arrays in compressed sparse row format and as a table of neighbor dictionaries that is used by `get_neighbor` and `get_neighbors`. The nearest pseudo-qubit in the boundary used by `get_syndrome` is also stored per ancilla.
+        """
+        self.nodes = [
+            ancilla
+            for qubits in [self.code.ancilla_qubits, self.code.pseudo_qubits]
+            for layer in qubits.values()
+            for ancilla in layer.values()
+        ]
+        node_ids = {ancilla: i for i, ancilla in enumerate(self.nodes)}
+        self.edges, edge_ids = [], {}
+        self.adjacency_key_list, key_ids = [], {}
+        self._neighbors, self._neighbors_loop, self._boundary_pseudo = {}, {}, {}
+        indptr, adjacent_nodes, adjacent_edges, adjacent_keys = [0], [], [], []
+
+        for ancilla_qubit in self.nodes:
+            neighbors = {}
+            for key, data_qubit in ancilla_qubit.parity_qubits.items():
+                edge = data_qubit.edges[ancilla_qubit.state_type]
+                neighbors[key] = (edge.nodes[not edge.nodes.index(ancilla_qubit)], edge)
+            for ancilla, edge in ancilla_qubit.z_neighbors.items():
+                neighbors[ancilla.z - ancilla_qubit.z] = (ancilla, edge)
+            adjacent = {
+                key: neighbor
+                for key, neighbor in neighbors.items()
+                if type(key) is not int or abs(neighbor[0].z - ancilla_qubit.z) == 1
+            }
+            self._neighbors_loop[ancilla_qubit] = neighbors
+            self._neighbors[ancilla_qubit] = neighbors if len(adjacent) == len(neighbors) else adjacent
+
+            for key, (neighbor, edge) in neighbors.items():
+                if edge not in edge_ids:
+                    edge_ids[edge] = len(self.edges)
+                    self.edges.append(edge)
+                if key not in key_ids:
+                    key_ids[key] = len(self.adjacency_key_list)
+                    self.adjacency_key_list.append(key)
+                adjacent_nodes.append(node_ids[neighbor])
+                adjacent_edges.append(edge_ids[edge])
+                adjacent_keys.append(key_ids[key])
+            indptr.append(len(adjacent_nodes))
+
+            pseudo = self._find_boundary_pseudo(ancilla_qubit)
+            if pseudo is not None:
+                self._boundary_pseudo[ancilla_qubit] = pseudo
+
+        self.adjacency_indptr = numpy.array(indptr, dtype=numpy.intp)
+        self.adjacency_nodes = numpy.array(adjacent_nodes, dtype=numpy.intp)
+        self.adjacency_edges = numpy.array(adjacent_edges, dtype=numpy.intp)
+        self.adjacency_keys = numpy.array(adjacent_keys, dtype=numpy.intp)
+        self.boundary_pseudo = numpy.array(
+            [node_ids[self._boundary_pseudo[ancilla]] if ancilla in self._boundary_pseudo else -1 for ancilla in self.nodes],
+            dtype=numpy.intp,
+        )
+
+    def _find_boundary_pseudo(self, ancilla: AncillaQubit) -> Optional[PseudoQubit]:
+        """Returns the closest `~.codes.elements.PseudoQubit` in the boundary of the code to ``ancilla``, if it exists. See `~.codes._template.sim.PerfectMeasurements.get_boundary_pseudo`."""
+        return self.code.get_boundary_pseudo(ancilla)
+
+    def get_neighbor(self, ancilla_qubit: AncillaQubit, key: str) -> Tuple[AncillaQubit, Edge]:
         """Returns the neighboring ancilla-qubit of ``ancilla_qubit`` in the direction of ``key``."""
-        data_qubit = ancilla_qubit.parity_qubits[key]
-        edge = data_qubit.edges[ancilla_qubit.state_type]
-        neighbor = edge.nodes[not edge.nodes.index(ancilla_qubit)]
-        return neighbor, edge
+        return self._neighbors_loop[ancilla_qubit][key]
 
     def get_neighbors(self, ancilla_qubit: AncillaQubit, loop: bool = False, **kwargs):
         """Returns all neighboring ancillas, including other time instances.
 
+        The returned dictionary is shared by all calls and must not be altered.
+
         Parameters
         ----------
         loop
             Include neighbors in time that are not chronologically next to each other during decoding within the same instance.
         """
-        neighbors = {}
-        for key in ancilla_qubit.parity_qubits:
-            neighbors[key] = self.get_neighbor(ancilla_qubit, key)
-        for ancilla, edge in ancilla_qubit.z_neighbors.items():
-            if loop or abs(ancilla.z - ancilla_qubit.z) == 1:
-                neighbors[ancilla.z - ancilla_qubit.z] = (ancilla, edge)
-        return neighbors
+        return self._neighbors_loop[ancilla_qubit] if loop else self._neighbors[ancilla_qubit]
+
+    def correction_layer(self, *qubits: AncillaQubit) -> int:
+        """Returns the layer on which the correction between ``qubits`` is applied.
+
+        The corrections are applied on ``self.code.decode_layer``, or on the newest layer of ``qubits`` if ``self.code.correct_layers`` is set, see `~.codes._template.sim.FaultyMeasurements.random_errors_stream`.
+        """
+        return max(qubit.z for qubit in qubits) if self.code.correct_layers else self.code.decode_layer
 
     def correct_edge(self, ancilla_qubit: AncillaQubit, key: str, **kwargs) -> AncillaQubit:
         """Applies a correction.
@@ -222,6 +307,20 @@ class Sim(ABC):
         edge.state = not edge.state
         return next_qubit
 
+    def get_erasures(self) -> List[Edge]:
+        """Returns the erased edges of the current simulation instance.
+
+        The erased data-qubits are read from the erasure mask of the `~.errors.erasure.Sim` module of the code, see `~.errors.erasure.Sim.erased`, such that only the erased data-qubits are visited. Both edges of every erased data-qubit are returned. If no erasure module is loaded or no qubit was erased in the current instance, an empty list is returned.
+        """
+        erasure = self.code.errors.get("erasure")
+        if erasure is None or erasure.mask is None or erasure.mask_instance != self.code.instance:
+            return []
+        edges = []
+        for z, mask in enumerate(erasure.mask):
+            for index in numpy.flatnonzero(mask).tolist():
+                edges.extend(self.code.data_list[z][index].edges.values())
+        return edges
+
     def get_syndrome(self, find_pseudo: bool = False) -> Union[Tuple[LA, LA], Tuple[LTAP, LTAP]]:
         """Finds the syndrome of the code.
 
@@ -239,28 +338,17 @@ class Sim(ABC):
         """
         plaqs, stars = [], []
         if find_pseudo is False:
-            for ancilla in [
-                ancilla for layer in self.code.ancilla_qubits.values() for ancilla in layer.values() if ancilla.syndrome
-            ]:
+            for ancilla in self.code.syndromes:
                 if ancilla.state_type == "x":
                     plaqs.append(ancilla)
                 elif ancilla.state_type == "z":
                     stars.append(ancilla)
         else:
-            for ancilla in [
-                ancilla for layer in self.code.ancilla_qubits.values() for ancilla in layer.values() if ancilla.syndrome
-            ]:
+            for ancilla in self.code.syndromes:
+                pseudo = self._boundary_pseudo[ancilla]
                 if ancilla.state_type == "x":
-                    if ancilla.loc[0] < self.code.size[0] / 2:
-                        pseudo = self.code.pseudo_qubits[ancilla.z][(0, ancilla.loc[1])]
-                    else:
-                        pseudo = self.code.pseudo_qubits[ancilla.z][(self.code.size[0], ancilla.loc[1])]
                     plaqs.append((ancilla, pseudo))
                 else:
-                    if ancilla.loc[1] < self.code.size[1] / 2:
-                        pseudo = self.code.pseudo_qubits[ancilla.z][(ancilla.loc[0], -0.5)]
-                    else:
-                        pseudo = self.code.pseudo_qubits[ancilla.z][(ancilla.loc[0], self.code.size[1] - 0.5)]
                     stars.append((ancilla, pseudo))
         return plaqs, stars
 
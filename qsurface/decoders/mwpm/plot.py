@@ -1,4 +1,4 @@
-from .sim import Toric as SimToric, Planar as SimPlanar
+from .sim import Toric as SimToric, Planar as SimPlanar, Rotated as SimRotated
 from .._template import Plot
 
 
@@ -24,3 +24,15 @@ class Planar(Toric, SimPlanar):
     """
 
     pass
+
+
+class Rotated(Planar, SimRotated):
+    """Plot MWPM decoder for the rotated code.
+
+    Parameters
+    ----------
+    args, kwargs
+        Positional and keyword arguments are passed on to `~.decoders.mwpm.plot.Planar` and `.decoders.mwpm.sim.Rotated`.
+    """
+
+    pass
@@ -1,9 +1,13 @@
 from typing import List, Tuple
-from qsurface.codes.elements import AncillaQubit
+from qsurface.codes.elements import AncillaQubit, Edge, PseudoQubit
 from .._template import Sim
+from scipy.sparse import csgraph
+from scipy import sparse
 import networkx as nx
+import numpy
 from numpy.ctypeslib import ndpointer
 import ctypes
+import math
 import os
 
 
@@ -13,10 +17,17 @@ LA = List[AncillaQubit]
 class Toric(Sim):
     """Minimum-Weight Perfect Matching decoder for the toric lattice.
 
+    If any qubits are erased in the current instance, the syndromes are matched by `match_erasures` on the decoding graph in which the erased edges have a negligible weight, instead of on the distances of the lattice.
+
     Parameters
     ----------
     args, kwargs
         Positional and keyword arguments are passed on to `.decoders._template.Sim`.
+
+    Attributes
+    ----------
+    _erasure_tables : tuple
+        The node id of every node and the edge id of every edge of the decoding graph by object, and the node ids of all pseudo-qubits, which are used by `match_erasures`.
     """
 
     name = "Minimum-Weight Perfect Matching"
@@ -31,8 +42,20 @@ class Toric(Sim):
         erasure=True,
     )
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._erasure_tables = (
+            {node: i for i, node in enumerate(self.nodes)},
+            {edge: i for i, edge in enumerate(self.edges)},
+            numpy.flatnonzero([isinstance(node, PseudoQubit) for node in self.nodes]),
+        )
+
     def decode(self, **kwargs):
         # Inherited docstring
+        erasures = self.get_erasures()
+        if erasures:
+            self.match_erasures(erasures, **kwargs)
+            return
         plaqs, stars = self.get_syndrome()
         self.correct_matching(plaqs, self.match_syndromes(plaqs, **kwargs))
         self.correct_matching(stars, self.match_syndromes(stars, **kwargs))
@@ -72,6 +95,64 @@ class Toric(Sim):
             weight += self._correct_matched_qubits(syndromes[i0], syndromes[i1])
         return weight
 
+    def match_erasures(self, erasures: List[Edge], use_blossomv: bool = False, **kwargs):
+        """Decodes the code on the decoding graph with zero-weight erased edges.
+
+        Every edge of the decoding graph has weight ``len(self.edges) + 1``, and every erased edge in ``erasures`` weight 1, such that a path through erased edges is always preferred over a path with fewer edges but more unerased edges. As the weights stay positive, the distances and shortest paths between the syndromes of each type are found by Dijkstra's algorithm, see `scipy.sparse.csgraph.dijkstra`. The matching graph is the same as for the lattice distances, with a virtual boundary node for every syndrome if the code has pseudo-qubits, see `.mwpm.sim.Planar.get_qubit_distances`. A virtual boundary node is connected to the nearest pseudo-qubit of its syndrome. The matched syndromes are corrected along the shortest path by `correct_path`.
+
+        Parameters
+        ----------
+        erasures
+            Erased edges of the current instance, see `~.decoders._template.Sim.get_erasures`.
+        use_blossomv
+            Use external C++ Blossom V library for minimum-weight matching.
+        """
+        node_ids, edge_ids, pseudos = self._erasure_tables
+        weights = numpy.full(len(self.edges), len(self.edges) + 1)
+        weights[[edge_ids[edge] for edge in erasures if edge in edge_ids]] = 1
+        graph = sparse.csr_matrix(
+            (weights[self.adjacency_edges], self.adjacency_nodes, self.adjacency_indptr), shape=(len(self.nodes),) * 2
+        )
+        matching_graph = self.match_blossomv if use_blossomv else self.match_networkx
+
+        for syndromes in self.get_syndrome():
+            if not syndromes:
+                continue
+            sources = [node_ids[ancilla] for ancilla in syndromes]
+            distances, predecessors = csgraph.dijkstra(graph, indices=sources, return_predecessors=True)
+            num = len(sources)
+            edges = [[i0, i1, int(distances[i0, sources[i1]])] for i0 in range(num) for i1 in range(i0 + 1, num)]
+            if len(pseudos):
+                nearest = pseudos[numpy.argmin(distances[:, pseudos], axis=1)]
+                edges += [[i, num + i, int(distances[i, nearest[i]])] for i in range(num)]
+                edges += [[i0, i1, 0] for i0 in range(num, 2 * num) for i1 in range(i0 + 1, 2 * num)]
+                num_nodes = 2 * num
+            else:
+                num_nodes = num
+            matching = matching_graph(edges, maxcardinality=self.config["max_cardinality"], num_nodes=num_nodes, **kwargs)
+            for i0, i1 in matching:
+                i0, i1 = sorted((i0, i1))
+                if i0 < num:
+                    target = sources[i1] if i1 < num else nearest[i1 - num]
+                    self.correct_path(predecessors[i0], sources[i0], target)
+
+    def correct_path(self, predecessors: numpy.ndarray, source: int, target: int):
+        """Corrects the edges on the shortest path from node ``target`` back to node ``source``, following the ``predecessors`` of a shortest-path tree from ``source``.
+
+        The nodes are identified by their ids in ``self.nodes``. As for the walks between matched qubits, the corrections are applied to the edges on the layer of `correction_layer`, and the edges in time are skipped.
+        """
+        node = target
+        while node != source:
+            previous = predecessors[node]
+            start, stop = self.adjacency_indptr[previous], self.adjacency_indptr[previous + 1]
+            index = start + numpy.flatnonzero(self.adjacency_nodes[start:stop] == node)[0]
+            key = self.adjacency_key_list[self.adjacency_keys[index]]
+            if type(key) is not int:
+                ancilla = self.nodes[previous]
+                qubits = self.code.pseudo_list if isinstance(ancilla, PseudoQubit) else self.code.ancilla_list
+                self.correct_edge(qubits[self.correction_layer(ancilla)][ancilla.index], key)
+            node = previous
+
     @staticmethod
     def match_networkx(edges: list, maxcardinality: float, **kwargs) -> list:
         """Finds the minimum-weight matching of a list of ``edges`` using `networkx.algorithms.matching.max_weight_matching`.
@@ -159,10 +240,11 @@ class Toric(Sim):
 
     def _correct_matched_qubits(self, aq0: AncillaQubit, aq1: AncillaQubit) -> float:
         """Flips the values of edges between two matched qubits by doing a walk in between."""
-        ancillas = self.code.ancilla_qubits[self.code.decode_layer]
-        pseudos = self.code.pseudo_qubits[self.code.decode_layer]
-        dq0 = ancillas[aq0.loc] if aq0.loc in ancillas else pseudos[aq0.loc]
-        dq1 = ancillas[aq1.loc] if aq1.loc in ancillas else pseudos[aq1.loc]
+        layer = self.correction_layer(aq0, aq1)
+        ancillas = self.code.ancilla_list[layer]
+        pseudos = self.code.pseudo_list[layer]
+        dq0 = pseudos[aq0.index] if isinstance(aq0, PseudoQubit) else ancillas[aq0.index]
+        dq1 = pseudos[aq1.index] if isinstance(aq1, PseudoQubit) else ancillas[aq1.index]
         dx, dy, xd, yd = self._walk_direction(aq0, aq1, self.code.size)
         xv = self._walk_and_correct(dq0, dy, yd)
         self._walk_and_correct(dq1, dx, xd)
@@ -199,6 +281,10 @@ class Planar(Toric):
 
     def decode(self, **kwargs):
         # Inherited docstring
+        erasures = self.get_erasures()
+        if erasures:
+            self.match_erasures(erasures, **kwargs)
+            return
         plaqs, stars = self.get_syndrome(find_pseudo=True)
         self.correct_matching(plaqs, self.match_syndromes(plaqs, **kwargs))
         self.correct_matching(stars, self.match_syndromes(stars, **kwargs))
@@ -240,8 +326,8 @@ class Planar(Toric):
             edges.append([i, len(qubits) + i, int(abs(weight))])
 
         # Add edges of weight 0 between all pseudo-qubits
-        for i0 in range(len(qubits), len(qubits)):
-            for i1 in range(i0 + 1, len(qubits) - 1):
+        for i0 in range(len(qubits), 2 * len(qubits)):
+            for i1 in range(i0 + 1, 2 * len(qubits)):
                 edges.append([i0, i1, 0])
         return edges
 
@@ -253,3 +339,67 @@ class Planar(Toric):
         xd = (0.5, 0) if dx > 0 else (-0.5, 0)
         yd = (0, -0.5) if dy > 0 else (0, 0.5)
         return abs(dx), abs(dy), xd, yd
+
+
+class Rotated(Planar):
+    """Minimum-Weight Perfect Matching decoder for the rotated lattice.
+
+    The ancilla-qubits of the rotated code are connected to the ancilla-qubits of the same type on their diagonals. The distance between two ancilla-qubits is therefore the Chebyshev distance between their locations, and corrections are applied by a walk of diagonal steps. As with the planar code, every syndrome is additionally connected to its closest `~.codes.elements.PseudoQubit` in the boundary.
+    """
+
+    @staticmethod
+    def get_qubit_distances(qubits, *args):
+        """Computes the distance between a list of qubits.
+
+        The graph of syndromes consists of weighted edges between all syndromes and between each syndrome and its boundary pseudo-qubit, and edges of weight zero between all pseudo-qubits, such that a perfect matching always exists. See `.mwpm.sim.Planar.get_qubit_distances`.
+        """
+        edges = []
+
+        # Add edges between all ancilla-qubits
+        for i0, (a0, _) in enumerate(qubits):
+            (x0, y0), z0 = a0.loc, a0.z
+            for i1, (a1, _) in enumerate(qubits[i0 + 1 :], start=i0 + 1):
+                (x1, y1), z1 = a1.loc, a1.z
+                weight = int(max(abs(x0 - x1), abs(y0 - y1))) + int(abs(z0 - z1))
+                edges.append([i0, i1, weight])
+
+        # Add edges between ancilla-qubits and their boundary pseudo-qubits
+        for i, (ancilla, pseudo) in enumerate(qubits):
+            (xs, ys), (xb, yb) = ancilla.loc, pseudo.loc
+            edges.append([i, len(qubits) + i, math.ceil(max(abs(xb - xs), abs(yb - ys)))])
+
+        # Add edges of weight 0 between all pseudo-qubits
+        for i0 in range(len(qubits), 2 * len(qubits)):
+            for i1 in range(i0 + 1, 2 * len(qubits)):
+                edges.append([i0, i1, 0])
+        return edges
+
+    def _correct_matched_qubits(self, aq0: AncillaQubit, aq1: AncillaQubit) -> float:
+        """Flips the values of edges between two matched qubits by doing a diagonal walk in between.
+
+        The walk steps diagonally towards ``aq1`` until it is reached in one direction, after which it zigzags along the remaining direction. Pseudo-qubits are only connected to a single edge, such that a walk towards a pseudo-qubit is directed to its neighboring ancilla-qubit, after which the edge to the pseudo-qubit is corrected. Raises a `ValueError` naming the matched qubits if the walk gets stuck, rather than leaving a partial correction.
+        """
+        layer = self.correction_layer(aq0, aq1)
+        ancillas = self.code.ancilla_list[layer]
+        pseudos = self.code.pseudo_list[layer]
+        if isinstance(aq0, PseudoQubit):
+            aq0, aq1 = aq1, aq0
+        qubit = ancillas[aq0.index]
+        pseudo = pseudos[aq1.index] if isinstance(aq1, PseudoQubit) else None
+        if pseudo:
+            target = self.correct_edge(pseudo, next(iter(self.get_neighbors(pseudo))))
+        else:
+            target = ancillas[aq1.index]
+        weight = 1 if pseudo else 0
+        (x1, y1) = target.loc
+        while qubit.loc != (x1, y1):
+            (x, y) = qubit.loc
+            neighbors = self.get_neighbors(qubit)
+            dx, dy = (x1 > x) - (x1 < x), (y1 > y) - (y1 < y)
+            keys = [(0.5 * sx, 0.5 * sy) for sx in ([dx] if dx else [1, -1]) for sy in ([dy] if dy else [1, -1])]
+            key = next((key for key in keys if key in neighbors and not isinstance(neighbors[key][0], PseudoQubit)), None)
+            if key is None:
+                raise ValueError(f"No diagonal walk from {qubit} towards {target} between matched {aq0} and {aq1}.")
+            qubit = self.correct_edge(qubit, key)
+            weight += 1
+        return weight + abs(aq0.z - aq1.z)
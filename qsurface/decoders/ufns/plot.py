@@ -1,6 +1,6 @@
-from ...codes.elements import AncillaQubit, DataQubit, Edge
-from .sim import Toric as SimToric, Planar as SimPlanar
-from ..unionfind.plot import Toric as PlotToric, Planar as PlotPlanar
+from ...codes.elements import AncillaQubit, DataQubit, Edge, PseudoQubit
+from .sim import Toric as SimToric, Planar as SimPlanar, Rotated as SimRotated
+from ..unionfind.plot import Toric as PlotToric, Planar as PlotPlanar, Rotated as PlotRotated
 
 
 class Toric(PlotToric, SimToric):
@@ -33,11 +33,11 @@ class Toric(PlotToric, SimToric):
         def _pick_handler(self, event):
             """Function on when an object in the figure is picked"""
             obj = event.artist.object
-            if type(obj) == Edge:
+            if isinstance(obj, Edge):
                 print(f"{obj}L{self.decoder.support[obj]}")
-            elif type(obj) == AncillaQubit:
+            elif isinstance(obj, AncillaQubit) and not isinstance(obj, PseudoQubit):
                 print(f"{obj}-{obj.node._status}-{obj.cluster.find()}")
-            elif type(obj) == DataQubit:
+            elif isinstance(obj, DataQubit):
                 print(obj)
 
 
@@ -63,3 +63,12 @@ class Planar(Toric, PlotPlanar, SimPlanar):
     """
 
     pass
+
+
+class Rotated(Planar, PlotRotated, SimRotated):
+    """Union-Find Node-Suspension decoder for the rotated lattice with union-find plot.
+
+    Has all class attributes, methods, and nested figure classes from `.ufns.plot.Planar`. See its description for the parameters.
+    """
+
+    pass
@@ -1,12 +1,15 @@
 from typing import List, Optional, Tuple
-from ...codes.elements import AncillaQubit, Edge
-from ..unionfind.sim import Toric as UFToric, Planar as UFPlanar
+from ...codes.elements import AncillaQubit, Edge, register_fields
+from ..unionfind.sim import Toric as UFToric, Planar as UFPlanar, Rotated as UFRotated
 from ..unionfind.elements import Cluster
 from .elements import Node, Syndrome, Junction, OddNode, print_tree
 
 UL = List[Tuple[AncillaQubit, Edge, AncillaQubit]]
 
 
+register_fields(AncillaQubit, node=None)
+
+
 class Toric(UFToric):
     """Union-Find Node-Suspension decoder for the toric lattice.
 
@@ -28,6 +31,8 @@ class Toric(UFToric):
     ----------
     new_boundary : list
         List of newly found cluster boundary elements.
+    erasures : set
+        Erased edges of the current decoding instance, see `~.decoders._template.Sim.get_erasures`.
     """
 
     name = "Union-Find Node-Suspension"
@@ -36,6 +41,7 @@ class Toric(UFToric):
     _Syndrome = Syndrome
     _Junction = Junction
     _OddNode = OddNode
+    _Engine = None
 
     compatibility_measurements = dict(
         PerfectMeasurements=True,
@@ -56,10 +62,10 @@ class Toric(UFToric):
         )
         super().__init__(*args, **kwargs)
 
-        self.code._AncillaQubit.node = None
         self._Cluster.root_node = None
         self._Cluster.min_delay = 0
         self.new_boundary = []
+        self.erasures = set()
 
     """
     ================================================================================================
@@ -85,14 +91,13 @@ class Toric(UFToric):
         ancilla
             Ancilla from which the connected erased edges or boundary are searched.
         """
-        cluster.add_ancilla(ancilla)
+        self.add_ancilla(cluster, ancilla)
         if parent:
             ancilla.node = parent.node
 
         for (new_ancilla, edge) in self.get_neighbors(ancilla).values():
             if (
-                "erasure" in self.code.errors
-                and edge.qubit.erasure == self.code.instance
+                edge in self.erasures
                 and new_ancilla is not parent
                 and self.support[edge] == 0
             ):  # if edge not already traversed
@@ -126,12 +131,13 @@ class Toric(UFToric):
     def find_clusters(self, **kwargs):
         """Initializes the clusters on the lattice.
 
-        For every non-trivial ancilla on the lattice, a `~.unionfind.elements.Cluster` is initiated. If any set of ancillas are connected by some set of erased qubits, all connected ancillas are found by `cluster_add_ancilla` and a single cluster is initiated for the set.
+        For every non-trivial ancilla on the lattice, a `~.unionfind.elements.Cluster` is initiated. If any set of ancillas are connected by some set of erased qubits, all connected ancillas are found by `cluster_add_ancilla` and a single cluster is initiated for the set. The erased edges are read once from the erasure mask and stored in ``self.erasures``.
 
         Additionally, a syndrome-node is initiated on the non-trivial ancilla -- a syndrome -- with the ancilla as primer. New boundaries are saved to the nodes by ``bound_ancilla_to_node``.
 
         The cluster is then placed into a bucket based on its size and parity by `place_bucket`. See `grow_clusters` for more information on buckets.
         """
+        self.erasures = set(self.get_erasures())
         plaqs, stars = self.get_syndrome()
 
         for ancilla in plaqs + stars:
@@ -337,3 +343,12 @@ class Planar(Toric, UFPlanar):
     """
 
     pass
+
+
+class Rotated(Planar, UFRotated):
+    """Union-Find Node-Suspension decoder for the rotated lattice.
+
+    See the description of `.ufns.sim.Toric`.
+    """
+
+    pass
@@ -6,5 +6,6 @@ The leaves of each spanning tree are conditionally peeled in a tail-recursive br
 The complexity of the Union-Find decoder is driven by the merging of the clusters. For this, the algorithm uses the Union-Find or disjoint-set data structure [tarjan1975efficiency]_. This data structure contains a set of elements, in this case ancillas on the lattice. The set of elements is represented by a two-level tree. At the root of the tree sits one element chosen arbitrarily; the rest of the elements are linked to the root element. The structure admits two functions: :math:`Find` and :math:`Union`. Given :math:`v` an element from the structure, the function :math:`Find(v)` returns the root element of the tree. This is is used to identify the cluster to which :math:`v` belongs. The second function is :math:`Union(u, v)`, this function merges the sets associated with elements :math:`u` and :math:`v`. This requires pointing all the elements of one of the sets to the root of the other. In order to minimize the number of operations the root of the set with the larger number of elements is chosen as root for the merged set, this is called **Weighted Union**. In this context, :math:`Union` is used when the growth of a cluster requires adding a vertex that belongs to another. 
 """
 
+from . import arrays
 from . import sim
 from . import plot
@@ -0,0 +1,492 @@
+from __future__ import annotations
+from typing import List, Optional, Tuple
+from array import array
+from collections import defaultdict
+from ...codes.elements import PseudoQubit
+
+
+class Toric(object):
+    """Array-based engine of the Union-Find decoder for the toric lattice.
+
+    The engine runs the same algorithm as `.unionfind.sim.Toric`, in the same order, and thus applies the same corrections, but stores its state in flat typed arrays instead of on `~.unionfind.elements.Cluster` objects and elements of the code. Ancilla-qubits, pseudo-qubits and edges are identified by their node and edge ids in the decoding graph of the decoder, see `~.decoders._template.Sim.init_adjacency`. A cluster is identified by the node id of the first ancilla that it was initiated with, such that the cluster properties are arrays indexed by node id as well. The cluster tree is an array of parent ids, of which the root is found by `find` with path halving.
+
+    All arrays are `array.array` objects, which are reset by a single copy per decoding instance, and of which single items are read as Python integers. The engine is used by the decoder if the ``array_engine`` option is enabled, see `.unionfind.sim.Toric`.
+
+    Parameters
+    ----------
+    decoder : `.unionfind.sim.Toric`
+        Union-Find decoder of which the decoding graph and configuration are used.
+
+    Attributes
+    ----------
+    neighbors : list of tuple
+        Tuples ``(key, neighbor, edge)`` of every node, in the order of `~.decoders._template.Sim.get_neighbors`.
+    support : `array.array`
+        Growth states of the edges as signed bytes, see `.unionfind.sim.Toric`.
+    node_cluster : `array.array`
+        Cluster id of every node, or -1 if it is not part of a cluster. As ``AncillaQubit.cluster``, the stored id is not necessarily the root of the cluster tree.
+    parent, size, parity, on_bound : `array.array`
+        Parent cluster id, number of ancillas, number of non-trivial ancillas and whether the cluster is connected to the boundary, for every cluster id.
+    cluster_support, cluster_bucket : `array.array`
+        Growth state and bucket number of every cluster id, where a bucket of -1 means that the cluster is not placed in a bucket.
+    new_bound : dict
+        Next boundary ``[(node, edge, new_node),...]`` of every cluster id.
+    """
+
+    def __init__(self, decoder, **kwargs):
+        self.decoder = decoder
+        self.code = decoder.code
+        self.config = decoder.config
+
+        nodes, edges = decoder.nodes, decoder.edges
+        self.nodes = nodes
+        self.node_ids = {ancilla: i for i, ancilla in enumerate(nodes)}
+        self.edge_ids = {edge: i for i, edge in enumerate(edges)}
+        self.edge_nodes = [(self.node_ids[edge.nodes[0]], self.node_ids[edge.nodes[1]]) for edge in edges]
+        self.pseudo = [isinstance(ancilla, PseudoQubit) for ancilla in nodes]
+        self.plaquette = [ancilla.state_type == "x" for ancilla in nodes]
+        order = sorted(range(len(nodes)), key=lambda i: (nodes[i].z, nodes[i].index))
+        self.rank = [0] * len(nodes)
+        for rank, i in enumerate(order):
+            self.rank[i] = rank
+        layer = self.code.ancilla_list[self.code.decode_layer]
+        self.targets = [layer[ancilla.index] if not self.pseudo[i] else None for i, ancilla in enumerate(nodes)]
+
+        keys = decoder.adjacency_key_list
+        indptr = decoder.adjacency_indptr.tolist()
+        adjacent_nodes, adjacent_edges = decoder.adjacency_nodes.tolist(), decoder.adjacency_edges.tolist()
+        adjacent_keys = decoder.adjacency_keys.tolist()
+        self.neighbors, self.parity_neighbors = [], []
+        for i, ancilla in enumerate(nodes):
+            span = range(indptr[i], indptr[i + 1])
+            loop = [(keys[adjacent_keys[j]], adjacent_nodes[j], adjacent_edges[j]) for j in span]
+            adjacent = [
+                neighbor
+                for neighbor in loop
+                if type(neighbor[0]) is not int or abs(nodes[neighbor[1]].z - ancilla.z) == 1
+            ]
+            self.neighbors.append(tuple(adjacent))
+            self.parity_neighbors.append(tuple(neighbor for neighbor in loop if type(neighbor[0]) is not int))
+
+        num_nodes, num_edges = len(nodes), len(edges)
+        self._empty_nodes = array("q", [-1]) * num_nodes
+        self._zero_nodes = array("b", bytes(num_nodes))
+        self._zero_edges = array("b", bytes(num_edges))
+        self.node_cluster = array("q", self._empty_nodes)
+        self.syndrome = array("b", self._zero_nodes)
+        self.peeled = array("b", self._zero_nodes)
+        self.forest = array("b", self._zero_nodes)
+        self.support = array("b", self._zero_edges)
+        self.edge_forest = array("b", self._zero_edges)
+        self.parent = array("q", self._empty_nodes)
+        self.size = array("q", self._empty_nodes)
+        self.parity = array("q", self._empty_nodes)
+        self.on_bound = array("b", self._zero_nodes)
+        self.cluster_support = array("b", self._zero_nodes)
+        self.cluster_bucket = array("q", self._empty_nodes)
+        self.new_bound = {}
+
+        self.buckets_num = decoder.buckets_num
+        self.buckets = defaultdict(list)
+        self.bucket_max_filled = 0
+        self.clusters = []
+        self.cluster_ancillas = []
+        self.erased_components = {}
+
+    def __repr__(self):
+        return "<{} array engine ({})>".format(self.decoder.name, self.__class__.__name__)
+
+    def decode(self, **kwargs):
+        """Decodes the code of the decoder, see `.unionfind.sim.Toric.decode`.
+
+        The arrays of the nodes and edges are reset, after which the syndrome is read from the code into ``self.syndrome``. Cluster properties are only set when a cluster is initiated and need no reset.
+        """
+        self.node_cluster[:] = self._empty_nodes
+        self.syndrome[:] = self._zero_nodes
+        self.peeled[:] = self._zero_nodes
+        self.support[:] = self._zero_edges
+        if not self.config["dynamic_forest"]:
+            self.forest[:] = self._zero_nodes
+            self.edge_forest[:] = self._zero_edges
+        self.new_bound = {}
+        self.buckets = defaultdict(list)
+        self.bucket_max_filled = 0
+        self.clusters = []
+        self.cluster_ancillas = []
+        self.erased_components = {}
+        self.find_clusters()
+        self.grow_clusters()
+        self.peel_clusters()
+
+    """
+    -------------------------------------------------------------------------------------------
+                                    General helper functions
+    -------------------------------------------------------------------------------------------
+    """
+
+    def find(self, cluster: int) -> int:
+        """Returns the root of the cluster tree of ``cluster``, halving the path to the root on the way."""
+        parent = self.parent
+        while parent[cluster] != cluster:
+            parent[cluster] = parent[parent[cluster]]
+            cluster = parent[cluster]
+        return cluster
+
+    def get_cluster(self, node: int) -> int:
+        """Returns the root cluster of ``node`` and stores it in ``self.node_cluster``, or -1 if the node has no cluster."""
+        cluster = self.node_cluster[node]
+        if cluster != -1 and self.parent[cluster] != cluster:
+            cluster = self.find(cluster)
+            self.node_cluster[node] = cluster
+        return cluster
+
+    def new_cluster(self, node: int) -> int:
+        """Initiates an empty cluster with the id of ``node``."""
+        self.parent[node] = node
+        self.size[node] = 0
+        self.parity[node] = 0
+        self.on_bound[node] = 0
+        self.cluster_support[node] = 0
+        self.cluster_bucket[node] = -1
+        self.new_bound[node] = []
+        self.clusters.append(node)
+        return node
+
+    def add_ancilla(self, cluster: int, node: int):
+        """Adds ``node`` to ``cluster`` and stores it in ``self.cluster_ancillas`` for peeling."""
+        self.node_cluster[node] = cluster
+        if self.pseudo[node]:
+            self.on_bound[cluster] = 1
+        else:
+            self.size[cluster] += 1
+            self.parity[cluster] += self.syndrome[node]
+        self.cluster_ancillas.append(node)
+
+    def cluster_add_ancilla(self, cluster: int, node: int, **kwargs):
+        """Adds ``node`` to ``cluster`` and finds the new boundary, see `.unionfind.sim.Toric.cluster_add_ancilla`."""
+        component = self.erased_components.get(node)
+        if component is None:
+            self.add_ancilla(cluster, node)
+            self.cluster_add_bound(cluster, node)
+        else:
+            self.cluster_add_erasure(cluster, component)
+
+    def cluster_add_bound(self, cluster: int, node: int):
+        """Adds the edges from ``node`` to neighbors outside of ``cluster`` to the new boundary of ``cluster``."""
+        node_cluster, new_bound = self.node_cluster, self.new_bound[cluster]
+        for _, new_node, edge in self.neighbors[node]:
+            if node_cluster[new_node] != cluster:
+                new_bound.append((node, edge, new_node))
+
+    """
+    -------------------------------------------------------------------------------------------
+                                    1. Find clusters
+    -------------------------------------------------------------------------------------------
+    """
+
+    def find_clusters(self):
+        """Initializes the clusters on the lattice, see `.unionfind.sim.Toric.find_clusters`."""
+        node_ids, syndrome = self.node_ids, self.syndrome
+        syndromes = [node_ids[ancilla] for ancilla in self.code.syndromes]
+        for node in syndromes:
+            syndrome[node] = 1
+        self.merge_erasures()
+        for node in [node for node in syndromes if self.plaquette[node]] + [node for node in syndromes if not self.plaquette[node]]:
+            if self.node_cluster[node] == -1:
+                self.cluster_add_ancilla(self.new_cluster(node), node)
+        self.place_bucket(self.clusters, -1)
+
+    def merge_erasures(self):
+        """Merges all ancillas that are connected by erased edges, see `.unionfind.sim.Toric.merge_erasures`."""
+        erasures = self.decoder.get_erasures()
+        if not erasures:
+            return
+        parents, support = {}, self.support
+
+        def find(node):
+            root = parents.setdefault(node, node)
+            while parents[root] != root:
+                root = parents[root]
+            while parents[node] != root:
+                parents[node], node = root, parents[node]
+            return root
+
+        boundary_edges = []
+        for erased in erasures:
+            edge = self.edge_ids[erased]
+            node, new_node = self.edge_nodes[edge]
+            if self.pseudo[node]:
+                node, new_node = new_node, node
+            if self.pseudo[new_node]:
+                boundary_edges.append((node, edge, new_node))
+                find(node)
+                continue
+            root, new_root = find(node), find(new_node)
+            if root == new_root:
+                support[edge] = -1
+            else:
+                parents[new_root] = root
+                support[edge] = 2
+
+        components = defaultdict(lambda: ([], []))
+        for node in list(parents):
+            components[find(node)][0].append(node)
+        for node, edge, pseudo in boundary_edges:
+            boundary = components[find(node)][1]
+            if boundary:
+                support[edge] = -1
+            else:
+                support[edge] = 2
+                boundary.append((edge, pseudo))
+
+        for component in components.values():
+            if any(self.syndrome[node] for node in component[0]):
+                self.cluster_add_erasure(self.new_cluster(component[0][0]), component)
+            else:
+                for node in component[0]:
+                    self.erased_components[node] = component
+
+    def cluster_add_erasure(self, cluster: int, component: Tuple[List[int], List[Tuple[int, int]]]):
+        """Adds a component of nodes connected by erased edges to ``cluster`` and finds the new boundary, see `.unionfind.sim.Toric.cluster_add_erasure`."""
+        nodes, boundary = component
+        for node in nodes:
+            self.erased_components.pop(node, None)
+            self.add_ancilla(cluster, node)
+        for edge, pseudo in boundary:
+            if self.on_bound[cluster]:
+                self.support[edge] = -1
+            else:
+                self.add_ancilla(cluster, pseudo)
+        for node in nodes:
+            self.cluster_add_bound(cluster, node)
+
+    """
+    -------------------------------------------------------------------------------------------
+                                    2. Grow clusters
+    -------------------------------------------------------------------------------------------
+    """
+
+    def grow_clusters(self):
+        """Grows odd-parity clusters outward for union with others until all clusters are even, see `.unionfind.sim.Toric.grow_clusters`."""
+        if self.config["weighted_growth"]:
+            for bucket_i in range(self.buckets_num):
+                if bucket_i > self.bucket_max_filled:
+                    break
+                if self.buckets.get(bucket_i):
+                    union_list, place_list = self.grow_bucket(self.buckets.pop(bucket_i), bucket_i)
+                    self.union_bucket(union_list)
+                    self.place_bucket(place_list, bucket_i)
+        else:
+            bucket_i = 0
+            while self.buckets[0]:
+                union_list, place_list = self.grow_bucket(self.buckets.pop(0), bucket_i)
+                self.union_bucket(union_list)
+                self.place_bucket(place_list, bucket_i)
+                bucket_i += 1
+
+    def grow_bucket(self, bucket: List[int], bucket_i: int) -> Tuple[List, List]:
+        """Grows the clusters in ``bucket`` and returns the lists of potential mergers and of clusters to be placed in new buckets."""
+        union_list, place_list = [], []
+        support, cluster_support, new_bounds = self.support, self.cluster_support, self.new_bound
+        while bucket:
+            cluster = self.find(bucket.pop())
+            if self.cluster_bucket[cluster] == bucket_i and cluster_support[cluster] == bucket_i % 2:
+                place_list.append(cluster)
+                cluster_support[cluster] = 1 - cluster_support[cluster]
+                bound, new_bound = new_bounds[cluster], []
+                new_bounds[cluster] = new_bound
+                while bound:
+                    boundary = bound.pop()
+                    edge = boundary[1]
+                    if support[edge] == 1:
+                        support[edge] = 2
+                        union_list.append(boundary)
+                    elif support[edge] != 2:
+                        support[edge] += 1
+                        new_bound.append(boundary)
+        return union_list, place_list
+
+    def union_bucket(self, union_list: List[Tuple[int, int, int]]):
+        """Merges the clusters in ``union_list`` if `union_check` is passed, see `.unionfind.sim.Toric.union_bucket`."""
+        size = self.size
+        for node, edge, new_node in union_list:
+            cluster = self.get_cluster(node)
+            new_cluster = self.get_cluster(new_node)
+            if self.union_check(edge, node, new_node, cluster, new_cluster):
+                if self.config["weighted_union"] and size[cluster] < size[new_cluster]:
+                    cluster, new_cluster = new_cluster, cluster
+                self.parent[new_cluster] = cluster
+                size[cluster] += size[new_cluster]
+                self.parity[cluster] += self.parity[new_cluster]
+                self.new_bound[cluster].extend(self.new_bound[new_cluster])
+                if self.on_bound[new_cluster]:
+                    self.on_bound[cluster] = 1
+
+    def union_check(self, edge: int, node: int, new_node: int, cluster: int, new_cluster: int) -> bool:
+        """Checks whether ``cluster`` and ``new_cluster`` can be joined on ``edge``, see `.unionfind.sim.Toric.union_check`."""
+        if new_cluster == -1:
+            self.cluster_add_ancilla(cluster, new_node)
+        elif new_cluster == cluster:
+            if self.config["dynamic_forest"]:
+                self.support[edge] = -1
+        else:
+            return True
+        return False
+
+    def odd_cluster(self, cluster: int) -> bool:
+        """Returns whether ``cluster`` must be grown further."""
+        return self.parity[cluster] % 2 == 1
+
+    def place_bucket(self, clusters: List[int], bucket_i: int):
+        """Places all odd clusters in ``clusters`` in a bucket, see `.unionfind.sim.Toric.place_bucket`."""
+        for cluster in clusters:
+            cluster = self.find(cluster)
+            if self.odd_cluster(cluster):
+                if self.config["weighted_growth"]:
+                    bucket = 2 * (self.size[cluster] - 1) + self.cluster_support[cluster]
+                    self.cluster_bucket[cluster] = bucket
+                    self.buckets[bucket].append(cluster)
+                    if bucket > self.bucket_max_filled:
+                        self.bucket_max_filled = bucket
+                else:
+                    self.buckets[0].append(cluster)
+                    self.cluster_bucket[cluster] = bucket_i + 1
+            else:
+                self.cluster_bucket[cluster] = -1
+
+    """
+    -------------------------------------------------------------------------------------------
+                                    3. Peel clusters
+    -------------------------------------------------------------------------------------------
+    """
+
+    def cluster_ancillas_sorted(self, pseudo: bool = False) -> List[int]:
+        """Returns the nodes in ``self.cluster_ancillas`` that are pseudo-qubits or not, without duplicates and ordered by layer and index."""
+        nodes = {node: None for node in self.cluster_ancillas if self.pseudo[node] == pseudo}
+        return sorted(nodes, key=self.rank.__getitem__)
+
+    def peel_clusters(self):
+        """Peels all clusters, see `.unionfind.sim.Toric.peel_clusters`."""
+        for node in self.cluster_ancillas_sorted():
+            if not self.peeled[node] and self.node_cluster[node] != -1:
+                if not self.config["dynamic_forest"]:
+                    self.static_forest(node)
+                self.peel_leaf(self.get_cluster(node), node)
+
+    def peel_leaf(self, cluster: int, node: int):
+        """Peels the branch of the tree starting at the pendant ``node``, see `.unionfind.sim.Toric.peel_leaf`."""
+        nodes = self.nodes
+        while True:
+            leaf = self.find_leaf(cluster, node)
+            if leaf is None:
+                return
+            key, new_node, edge = leaf
+            if nodes[node].syndrome:
+                nodes[node].syndrome = not nodes[node].syndrome
+                nodes[new_node].syndrome = not nodes[new_node].syndrome
+                self.support[edge] = -2
+                if type(key) is not int:
+                    self.decoder.correct_edge(nodes[node] if self.code.correct_layers else self.targets[node], key)
+            else:
+                self.support[edge] = -1
+            self.peeled[node] = 1
+            node = new_node
+
+    def find_leaf(self, cluster: int, node: int) -> Optional[Tuple]:
+        """Returns the neighbor ``(key, new_node, edge)`` of ``node`` if it is the only neighbor in ``cluster`` that is connected by a fully grown edge."""
+        num_connect, leaf = 0, None
+        support, get_cluster = self.support, self.get_cluster
+        for neighbor in self.neighbors[node]:
+            if support[neighbor[2]] == 2 and get_cluster(neighbor[1]) == cluster:
+                num_connect += 1
+                if num_connect > 1:
+                    return None
+                leaf = neighbor
+        return leaf
+
+    def static_forest(self, node: int):
+        """Constructs an acyclic forest in the cluster of ``node``, see `.unionfind.sim.Toric.static_forest`."""
+        self.forest[node] = 1
+        for _, new_node, edge in self.neighbors[node]:
+            if self.support[edge] == 2:
+                if not self.forest[new_node]:
+                    self.edge_forest[edge] = 1
+                    self.static_forest(new_node)
+                elif not self.edge_forest[edge]:
+                    self.support[edge] = -1
+
+
+class Planar(Toric):
+    """Array-based engine of the Union-Find decoder for the planar lattice.
+
+    See the description of `.unionfind.arrays.Toric` and `.unionfind.sim.Planar`.
+    """
+
+    def cluster_add_bound(self, cluster: int, node: int):
+        """Adds the edges from ``node`` to neighbors outside of ``cluster`` to the new boundary of ``cluster``. Edges to pseudo-qubits are not added if the cluster is already connected to the boundary."""
+        node_cluster, new_bound, pseudo = self.node_cluster, self.new_bound[cluster], self.pseudo
+        on_bound = self.on_bound[cluster]
+        for _, new_node, edge in self.neighbors[node]:
+            if node_cluster[new_node] != cluster and not (pseudo[new_node] and on_bound):
+                new_bound.append((node, edge, new_node))
+
+    def union_check(self, edge: int, node: int, new_node: int, cluster: int, new_cluster: int) -> bool:
+        # Inherited docstring
+        if new_cluster == cluster or (self.pseudo[new_node] and self.on_bound[cluster]):
+            if self.config["dynamic_forest"]:
+                self.support[edge] = -1
+        elif new_cluster == -1:
+            self.cluster_add_ancilla(cluster, new_node)
+        else:
+            return True
+        return False
+
+    def odd_cluster(self, cluster: int) -> bool:
+        # Inherited docstring
+        return self.parity[cluster] % 2 == 1 and not self.on_bound[cluster]
+
+    def static_forest(self, node: int, found_bound: bool = False) -> bool:
+        # Inherited docstring
+        cluster = self.find(self.node_cluster[node])
+        if not found_bound and self.parity[cluster] % 2 == 0:
+            found_bound = True
+
+        self.forest[node] = 1
+        for _, new_node, edge in self.parity_neighbors[node]:
+            if self.support[edge] == 2:
+                if self.pseudo[new_node]:
+                    if found_bound or self.get_cluster(new_node) != cluster:
+                        self.support[edge] = -1
+                    else:
+                        self.edge_forest[edge] = 1
+                        found_bound = True
+                    continue
+                if self.forest[new_node]:
+                    if not self.edge_forest[edge]:
+                        self.support[edge] = -1
+                else:
+                    self.edge_forest[edge] = 1
+                    found_bound = self.static_forest(new_node, found_bound=found_bound)
+        return found_bound
+
+    def peel_clusters(self):
+        # Inherited docstring
+        super().peel_clusters()
+        for node in self.cluster_ancillas_sorted(pseudo=True):
+            if not self.peeled[node] and self.node_cluster[node] != -1:
+                if not self.config["dynamic_forest"]:
+                    self.static_forest(node)
+                cluster = self.get_cluster(node)
+                leaf = self.find_leaf(cluster, node)
+                if leaf is not None:
+                    self.support[leaf[2]] = -1
+                    self.peel_leaf(cluster, leaf[1])
+
+
+class Rotated(Planar):
+    """Array-based engine of the Union-Find decoder for the rotated lattice.
+
+    See the description of `.unionfind.arrays.Planar`.
+    """
+
+    pass
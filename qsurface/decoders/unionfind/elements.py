@@ -13,8 +13,8 @@ class Cluster(object):
     ----------
     index
         Indicator index number.
-    instance :
-        The epoch timestamp of the simulation.
+    instance
+        The simulation instance of the code, see `~.codes._template.sim.new_instance`.
 
     Attributes
     ----------
@@ -34,7 +34,7 @@ class Cluster(object):
         Whether this cluster is connected to the boundary.
     """
 
-    def __init__(self, index: int, instance: float, **kwargs):
+    def __init__(self, index: int, instance: int, **kwargs):
         self.index = index
         self.instance = instance
         self.size = 0
@@ -56,12 +56,12 @@ class Cluster(object):
     def add_ancilla(self, ancilla: AncillaQubit):
         """Adds an ancilla to a cluster."""
         ancilla.cluster = self
-        if type(ancilla) is AncillaQubit:
+        if isinstance(ancilla, PseudoQubit):
+            self.on_bound = True
+        elif isinstance(ancilla, AncillaQubit):
             self.size += 1
             if ancilla.syndrome:
                 self.parity += 1
-        elif type(ancilla) is PseudoQubit:
-            self.on_bound = True
 
     def union(self, cluster: Cluster, **kwargs):
         """Merges two clusters.
@@ -1,7 +1,7 @@
-from ...codes.elements import AncillaQubit, DataQubit, Edge
+from ...codes.elements import AncillaQubit, DataQubit, Edge, PseudoQubit
 from ...plot import Template2D, Template3D
 from .._template import Plot
-from .sim import Toric as SimToric, Planar as SimPlanar
+from .sim import Toric as SimToric, Planar as SimPlanar, Rotated as SimRotated
 from matplotlib.patches import Rectangle
 from matplotlib.lines import Line2D
 
@@ -26,6 +26,7 @@ class Toric(SimToric, Plot):
     """
 
     opposite_keys = dict(n="s", s="n", e="w", w="e")
+    _Engine = None
 
     def decode(self, *args, **kwargs):
         # Inherited docstring
@@ -186,7 +187,7 @@ class Toric(SimToric, Plot):
             self,
             edge: Edge,
             ancilla: AncillaQubit,
-            instance: float,
+            instance: int,
             full: bool = False,
         ):
             """Adds a line corresponding to a half-edge to the figure."""
@@ -272,11 +273,11 @@ class Toric(SimToric, Plot):
         def _pick_handler(self, event):
             """Function on when an object in the figure is picked"""
             obj = event.artist.object
-            if type(obj) == Edge:
+            if isinstance(obj, Edge):
                 print(f"{obj}L{self.decoder.support[obj]}")
-            elif type(obj) == AncillaQubit:
+            elif isinstance(obj, AncillaQubit) and not isinstance(obj, PseudoQubit):
                 print(f"{obj}-{obj.cluster.find()}")
-            elif type(obj) == DataQubit:
+            elif isinstance(obj, DataQubit):
                 print(obj)
 
     class Figure3D(Template3D, Figure2D):
@@ -292,12 +293,12 @@ class Toric(SimToric, Plot):
             self,
             edge: Edge,
             ancilla: AncillaQubit,
-            instance: float,
+            instance: int,
             full: bool = False,
         ):
             """Adds a line corresponding to a half-edge to the figure."""
 
-            if type(edge.qubit) is DataQubit:
+            if isinstance(edge.qubit, DataQubit):
                 edge_z = edge.qubit.z
             else:
                 edge_z = edge.qubit.z - 0.5
@@ -360,5 +361,17 @@ class Planar(Toric, SimPlanar):
         """
 
         def _plot_ancilla(self, ancilla, **kwargs):
-            if type(ancilla) == AncillaQubit:
+            if isinstance(ancilla, AncillaQubit) and not isinstance(ancilla, PseudoQubit):
                 super()._plot_ancilla(ancilla, **kwargs)
+
+
+class Rotated(Planar, SimRotated):
+    """Union-Find decoder for the rotated lattice with union-find plot.
+
+    Has all class attributes, methods, and nested figure classes from `.unionfind.plot.Planar`. See its description for the parameters.
+    """
+
+    def init_plot(self, **kwargs):
+        # Inherited docstring
+        size = [xy + 0.5 for xy in self.code.size]
+        self._init_axis([-0.25, -0.25] + size, title=self.decoder, aspect="equal")
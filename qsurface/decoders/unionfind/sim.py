@@ -1,11 +1,16 @@
 from __future__ import annotations
 from typing import List, Optional, Tuple
-from ...codes.elements import AncillaQubit, Edge, PseudoQubit
+from ...codes.elements import AncillaQubit, Edge, PseudoQubit, register_fields
 from .elements import Cluster
 from .._template import Sim
+from . import arrays
 from collections import defaultdict
 
 
+register_fields(AncillaQubit, cluster=None, peeled=None, forest=None)
+register_fields(Edge, forest=None)
+
+
 class Toric(Sim):
     """Union-Find decoder for the toric lattice.
 
@@ -24,6 +29,8 @@ class Toric(Sim):
         Enables weighted union, Default is true. See `union_bucket`.
     dynamic_forest : bool, optional
         Enables dynamically mainted forests. Default is true.
+    array_engine : bool, optional
+        Decodes with the array-based engine of `.unionfind.arrays`, which applies the same corrections as the object-based decoder in this class. Default is false. The engine is not used if ``print_steps`` is enabled.
     print_steps : bool, optional
         Prints additional decoding information. Default is false.
     kwargs
@@ -31,9 +38,9 @@ class Toric(Sim):
 
     Attributes
     ----------
-    support : dict
+    support : `~collections.defaultdict`
 
-        Dictionary of growth states of all edges in the code.
+        Dictionary of growth states of the edges in the code. Only edges that are touched in the current decoding instance are stored, all other edges have state 0. The dictionary is replaced at every call to `decode`.
 
         =====   ========================
         value   state
@@ -53,11 +60,18 @@ class Toric(Sim):
         List of all clusters at initialization.
     cluster_index : int
         Index value for cluster differentiation.
+    cluster_ancillas : list
+        All ancilla-qubits and pseudo-qubits added to a cluster in the current decoding instance. See `peel_clusters`.
+    erased_components : dict
+        Components of ancillas connected by erased edges without non-trivial ancillas, stored for each of their ancillas, that are not yet part of a cluster. See `merge_erasures`.
+    engine : `.unionfind.arrays.Toric` or None
+        Array-based engine that decodes the code if ``array_engine`` is enabled.
     """
 
     name = "Union-Find"
     short = "unionfind"
     _Cluster = Cluster
+    _Engine = arrays.Toric
 
     compatibility_measurements = dict(
         PerfectMeasurements=True,
@@ -65,7 +79,7 @@ class Toric(Sim):
     )
     compatibility_errors = dict(
         pauli=True,
-        erasure=False,
+        erasure=True,
     )
 
     def __init__(self, *args, **kwargs) -> None:
@@ -73,27 +87,6 @@ class Toric(Sim):
 
         self.config["step_growth"] = not (self.config["step_bucket"] or self.config["step_cluster"])
 
-        # Apply Monkey Patching
-        self.code._AncillaQubit.cluster = None
-        self.code._AncillaQubit.peeled = None
-        if not self.config["dynamic_forest"]:
-            self.code._AncillaQubit.forest = None
-            self.code._Edge.forest = None
-
-        # Initiated support table
-        self.support = {}
-        for layer in self.code.data_qubits.values():
-            for data_qubit in layer.values():
-                for edge in data_qubit.edges.values():
-                    self.support[edge] = 0
-        if self.code.layers > 1:
-            for layer in self.code.ancilla_qubits.values():
-                for ancilla_qubit in layer.values():
-                    self.support[
-                        ancilla_qubit.z_neighbors[
-                            self.code.ancilla_qubits[(ancilla_qubit.z + 1) % self.code.layers][ancilla_qubit.loc]
-                        ]
-                    ] = 0
         if self.config["weighted_growth"]:
             self.buckets_num = self.code.size[0] * self.code.size[1] * self.code.layers * 2
         else:
@@ -102,6 +95,13 @@ class Toric(Sim):
         self.bucket_max_filled = 0
         self.clusters = []
         self.cluster_index = 0
+        self.cluster_ancillas = []
+        self.support = defaultdict(int)
+        self.erased_components = {}
+        if self._Engine is not None and self.config.get("array_engine") and not self.config["print_steps"]:
+            self.engine = self._Engine(self)
+        else:
+            self.engine = None
 
     def decode(self, **kwargs):
         """Decodes the code using the Union-Find algorithm.
@@ -112,16 +112,25 @@ class Toric(Sim):
         2.  Growing and merging these clusters.
         3.  Peeling the clusters using the Peeling algorithm.
 
+        The state of a previous decoding instance is not reset per element. The growth states in ``self.support`` are replaced by an empty dictionary, and all state that is stored on the elements is stamped with ``self.code.instance``, see `~.codes._template.sim.new_instance`. The cost of starting a new instance is thus independent of the size of the lattice.
+
+        If the array-based engine is enabled, the code is decoded by `.unionfind.arrays.Toric.decode` instead.
+
         Parameters
         ----------
         kwargs
             Keyword arguments are passed on to `find_clusters`, `grow_clusters` and `peel_clusters`.
         """
+        if self.engine is not None:
+            self.engine.decode(**kwargs)
+            return
         self.buckets = defaultdict(list)
         self.bucket_max_filled = 0
         self.cluster_index = 0
         self.clusters = []
-        self.support = {edge: 0 for edge in self.support}
+        self.cluster_ancillas = []
+        self.support = defaultdict(int)
+        self.erased_components = {}
         self.find_clusters(**kwargs)
         self.grow_clusters(**kwargs)
         self.peel_clusters(**kwargs)
@@ -146,6 +155,11 @@ class Toric(Sim):
             ancilla.cluster = ancilla.cluster.find()
             return ancilla.cluster
 
+    def add_ancilla(self, cluster: Cluster, ancilla: AncillaQubit):
+        """Adds ``ancilla`` to ``cluster`` and stores it in ``self.cluster_ancillas`` for peeling."""
+        cluster.add_ancilla(ancilla)
+        self.cluster_ancillas.append(ancilla)
+
     def cluster_add_ancilla(
         self,
         cluster: Cluster,
@@ -153,32 +167,28 @@ class Toric(Sim):
         parent: Optional[AncillaQubit] = None,
         **kwargs,
     ):
-        """Recursively adds erased edges to ``cluster`` and finds the new boundary.
+        """Adds ``ancilla`` to ``cluster`` and finds the new boundary.
 
-        For a given ``ancilla``, this function finds the neighboring edges and ancillas that are in the the currunt cluster. If the newly found edge is erased, the edge and the corresponding ancilla will be added to the cluster, and the function applied recursively on the new ancilla. Otherwise, the neighbor is added to the new boundary ``self.new_bound``.
+        The components of ancillas that are connected by erased edges are already found by `merge_erasures` before growth. If ``ancilla`` is part of such a component, the entire component is added by `cluster_add_erasure`. Otherwise, ``ancilla`` has no erased edges to follow, and only its neighbors are added to the new boundary by `cluster_add_bound`.
 
         Parameters
         ----------
         cluster
             Current active cluster
         ancilla
-            Ancilla from which the connected erased edges or boundary are searched.
+            Ancilla to add to the cluster.
         """
-        cluster.add_ancilla(ancilla)
+        component = self.erased_components.get(ancilla)
+        if component is None:
+            self.add_ancilla(cluster, ancilla)
+            self.cluster_add_bound(cluster, ancilla)
+        else:
+            self.cluster_add_erasure(cluster, component)
 
+    def cluster_add_bound(self, cluster: Cluster, ancilla: AncillaQubit):
+        """Adds the edges from ``ancilla`` to neighbors outside of ``cluster`` to the new boundary ``cluster.new_bound``."""
         for (new_ancilla, edge) in self.get_neighbors(ancilla).values():
-            if (
-                "erasure" in self.code.errors
-                and edge.qubit.erasure == self.code.instance
-                and new_ancilla is not parent
-                and self.support[edge] == 0
-            ):  # if edge not already traversed
-                if new_ancilla.cluster == cluster:  # cycle detected, peel edge
-                    self._edge_peel(edge, variant="cycle")
-                else:  # if no cycle detected
-                    self._edge_full(ancilla, edge, new_ancilla)
-                    self.cluster_add_ancilla(cluster, new_ancilla, parent=ancilla)
-            elif new_ancilla.cluster is not cluster:  # Make sure new bound does not lead to self
+            if new_ancilla.cluster is not cluster:  # Make sure new bound does not lead to self
                 cluster.new_bound.append((ancilla, edge, new_ancilla))
 
     def _edge_peel(self, edge: Edge, variant: str = ""):
@@ -207,10 +217,11 @@ class Toric(Sim):
     def find_clusters(self, **kwargs):
         """Initializes the clusters on the lattice.
 
-        For every non-trivial ancilla on the lattice, a `~.unionfind.elements.Cluster` is initiated. If any set of ancillas are connected by some set of erased qubits, all connected ancillas are found by `cluster_add_ancilla` and a single cluster is initiated for the set.
+        All sets of ancillas that are connected by erased qubits are first found by `merge_erasures`, which initiates a cluster for every set that contains a non-trivial ancilla. For every non-trivial ancilla on the lattice that is not yet part of such a cluster, a `~.unionfind.elements.Cluster` is initiated by `cluster_add_ancilla`.
 
         The cluster is then placed into a bucket based on its size and parity by `place_bucket`. See `grow_clusters` for more information on buckets.
         """
+        self.merge_erasures()
         plaqs, stars = self.get_syndrome()
         for ancilla in plaqs + stars:
             if ancilla.cluster is None or ancilla.cluster.instance != self.code.instance:
@@ -224,6 +235,77 @@ class Toric(Sim):
         if self.config["print_steps"]:
             print(f"Found clusters:\n" + ", ".join(map(str, self.clusters)) + "\n")
 
+    def merge_erasures(self, **kwargs):
+        """Merges all ancillas that are connected by erased edges in a single pass.
+
+        The erased edges of the current instance are read at once from the erasure mask by `~.decoders._template.Sim.get_erasures`. The connected components of the erased edges between ancilla-qubits are found with a disjoint-set forest, in which an erased edge that closes a cycle is peeled and any other erased edge is fully grown. Every component is then connected to at most one pseudo-qubit; further erased edges to pseudo-qubits are peeled, as they would close a cycle through the boundary.
+
+        A `~.unionfind.elements.Cluster` is initiated for every component that contains a non-trivial ancilla. The other components are stored in ``self.erased_components`` for each of their ancillas, and are only added to a cluster as a whole by `cluster_add_erasure` once it grows onto one of them.
+        """
+        parents = {}
+
+        def find(ancilla):
+            root = parents.setdefault(ancilla, ancilla)
+            while parents[root] is not root:
+                root = parents[root]
+            while parents[ancilla] is not root:
+                parents[ancilla], ancilla = root, parents[ancilla]
+            return root
+
+        boundary_edges = []
+        for edge in self.get_erasures():
+            ancilla, new_ancilla = edge.nodes
+            if isinstance(ancilla, PseudoQubit):
+                ancilla, new_ancilla = new_ancilla, ancilla
+            if isinstance(new_ancilla, PseudoQubit):
+                boundary_edges.append((ancilla, edge, new_ancilla))
+                find(ancilla)
+                continue
+            root, new_root = find(ancilla), find(new_ancilla)
+            if root is new_root:
+                self._edge_peel(edge, variant="cycle")
+            else:
+                parents[new_root] = root
+                self._edge_full(ancilla, edge, new_ancilla)
+
+        components = defaultdict(lambda: ([], []))
+        for ancilla in list(parents):
+            components[find(ancilla)][0].append(ancilla)
+        for ancilla, edge, pseudo in boundary_edges:
+            boundary = components[find(ancilla)][1]
+            if boundary:
+                self._edge_peel(edge, variant="cycle")
+            else:
+                self._edge_full(ancilla, edge, pseudo)
+                boundary.append((edge, pseudo))
+
+        for component in components.values():
+            if any(ancilla.syndrome for ancilla in component[0]):
+                cluster = self._Cluster(self.cluster_index, self.code.instance)
+                self.cluster_index += 1
+                self.cluster_add_erasure(cluster, component)
+                self.clusters.append(cluster)
+            else:
+                for ancilla in component[0]:
+                    self.erased_components[ancilla] = component
+
+    def cluster_add_erasure(self, cluster: Cluster, component: Tuple[List[AncillaQubit], List[Tuple[Edge, PseudoQubit]]]):
+        """Adds a component of ancillas connected by erased edges to ``cluster`` and finds the new boundary.
+
+        The ``component`` consists of the list of its ancillas and a list with at most one erased edge and pseudo-qubit to the boundary, see `merge_erasures`. If ``cluster`` is already connected to the boundary, the erased edge to the boundary is peeled instead.
+        """
+        ancillas, boundary = component
+        for ancilla in ancillas:
+            self.erased_components.pop(ancilla, None)
+            self.add_ancilla(cluster, ancilla)
+        for edge, pseudo in boundary:
+            if cluster.on_bound:
+                self._edge_peel(edge, variant="cycle")
+            else:
+                self.add_ancilla(cluster, pseudo)
+        for ancilla in ancillas:
+            self.cluster_add_bound(cluster, ancilla)
+
     """
     -------------------------------------------------------------------------------------------
                                     2(a). Grow clusters expansion
@@ -435,20 +517,24 @@ class Toric(Sim):
     -------------------------------------------------------------------------------------------
     """
 
+    def cluster_ancillas_sorted(self, pseudo: bool = False) -> List[AncillaQubit]:
+        """Returns the ancilla-qubits or pseudo-qubits in ``self.cluster_ancillas`` without duplicates, ordered by layer and index."""
+        ancillas = {ancilla: None for ancilla in self.cluster_ancillas if isinstance(ancilla, PseudoQubit) == pseudo}
+        return sorted(ancillas, key=lambda ancilla: (ancilla.z, ancilla.index))
+
     def peel_clusters(self, **kwargs):
         """Loops over all clusters to find pendant ancillas to peel.
 
-        To make sure that all cluster-trees are fully peeled, all ancillas are considered in the loop. If the ancilla has not been peeled before and belongs to a cluster of the current simulation, the ancilla is considered for peeling by `peel_leaf`.
+        To make sure that all cluster-trees are fully peeled, all ancillas in the clusters are considered in the loop, in the order of their layer and index. These are the ancillas stored in ``self.cluster_ancillas``, such that ancillas outside of clusters are not visited. If the ancilla has not been peeled before and belongs to a cluster of the current simulation, the ancilla is considered for peeling by `peel_leaf`.
         """
         if self.config["print_steps"]:
             print("================\nPeeling clusters")
-        for layer in self.code.ancilla_qubits.values():
-            for ancilla in layer.values():
-                if ancilla.peeled != self.code.instance and ancilla.cluster and ancilla.cluster.instance == self.code.instance:
-                    if not self.config["dynamic_forest"]:
-                        self.static_forest(ancilla)
-                    cluster = self.get_cluster(ancilla)
-                    self.peel_leaf(cluster, ancilla)
+        for ancilla in self.cluster_ancillas_sorted():
+            if ancilla.peeled != self.code.instance and ancilla.cluster and ancilla.cluster.instance == self.code.instance:
+                if not self.config["dynamic_forest"]:
+                    self.static_forest(ancilla)
+                cluster = self.get_cluster(ancilla)
+                self.peel_leaf(cluster, ancilla)
 
     def peel_leaf(self, cluster, ancilla):
         """Recursive function which peels a branch of the tree if the input ancilla is a pendant ancilla
@@ -470,7 +556,7 @@ class Toric(Sim):
             if ancilla.syndrome:
                 self.flip_edge(ancilla, edge, new_ancilla)
                 if type(key) is not int:
-                    self.correct_edge(self.code.ancilla_qubits[self.code.decode_layer][ancilla.loc], key)
+                    self.correct_edge(self.code.ancilla_list[self.correction_layer(ancilla)][ancilla.index], key)
             else:
                 self._edge_peel(edge, variant="peel")
             ancilla.peeled = self.code.instance
@@ -527,48 +613,15 @@ class Planar(Toric):
     See the description of `.unionfind.sim.Toric`.
     """
 
-    def cluster_add_ancilla(
-        self,
-        cluster: Cluster,
-        ancilla: AncillaQubit,
-        parent: Optional[AncillaQubit] = None,
-        **kwargs,
-    ):
-        """Recursively adds erased edges to ``cluster`` and finds the new boundary.
+    _Engine = arrays.Planar
 
-        For a given ``ancilla``, this function finds the neighboring edges and ancillas that are in the the currunt cluster. If the newly found edge is erased, the edge and the corresponding ancilla will be added to the cluster, and the function applied recursively on the new ancilla. Otherwise, the neighbor is added to the new boundary ``self.new_bound``.
+    def cluster_add_bound(self, cluster: Cluster, ancilla: AncillaQubit):
+        """Adds the edges from ``ancilla`` to neighbors outside of ``cluster`` to the new boundary ``cluster.new_bound``.
 
-        Parameters
-        ----------
-        cluster
-            Current active cluster
-        ancilla
-            Ancilla from which the connected erased edges or boundary are searched.
+        Edges to pseudo-qubits are not added if the cluster is already connected to the boundary.
         """
-        cluster.add_ancilla(ancilla)
-
         for (new_ancilla, edge) in self.get_neighbors(ancilla).values():
-            if (
-                "erasure" in self.code.errors
-                and edge.qubit.erasure == self.code.instance
-                and new_ancilla is not parent
-                and self.support[edge] == 0
-            ):
-                if isinstance(new_ancilla, PseudoQubit):
-                    if cluster.on_bound:
-                        self._edge_peel(edge, variant="cycle")
-                    else:
-                        self._edge_full(ancilla, edge, new_ancilla)
-                        cluster.add_ancilla(new_ancilla)
-                else:
-                    if new_ancilla.cluster == cluster:
-                        self._edge_peel(edge, variant="cycle")
-                    else:
-                        self._edge_full(ancilla, edge, new_ancilla)
-                        self.cluster_add_ancilla(cluster, new_ancilla, parent=ancilla)
-            elif new_ancilla.cluster is not cluster and not (
-                isinstance(new_ancilla, PseudoQubit) and cluster.on_bound
-            ):  # Make sure new bound does not lead to self
+            if new_ancilla.cluster is not cluster and not (isinstance(new_ancilla, PseudoQubit) and cluster.on_bound):
                 cluster.new_bound.append((ancilla, edge, new_ancilla))
 
     def union_check(
@@ -631,8 +684,8 @@ class Planar(Toric):
 
             if self.support[edge] == 2:
 
-                if type(new_ancilla) is PseudoQubit:
-                    if found_bound:
+                if isinstance(new_ancilla, PseudoQubit):
+                    if found_bound or self.get_cluster(new_ancilla) is not ancilla.cluster.find():
                         self._edge_peel(edge, variant="cycle")
                     else:
                         edge.forest = self.code.instance
@@ -650,14 +703,22 @@ class Planar(Toric):
     def peel_clusters(self, **kwargs):
         # Inherited docstring
         super().peel_clusters(**kwargs)
-        for layer in self.code.pseudo_qubits.values():
-            for ancilla in layer.values():
-                if ancilla.peeled != self.code.instance and ancilla.cluster and ancilla.cluster.instance == self.code.instance:
-                    if not self.config["dynamic_forest"]:
-                        self.static_forest(ancilla)
-                    cluster = self.get_cluster(ancilla)
-                    leaf = self.find_leaf(cluster, ancilla)
-                    if leaf:
-                        key, (new_ancilla, edge) = leaf
-                        self._edge_peel(edge, variant="peel")
-                        self.peel_leaf(cluster, new_ancilla)
+        for ancilla in self.cluster_ancillas_sorted(pseudo=True):
+            if ancilla.peeled != self.code.instance and ancilla.cluster and ancilla.cluster.instance == self.code.instance:
+                if not self.config["dynamic_forest"]:
+                    self.static_forest(ancilla)
+                cluster = self.get_cluster(ancilla)
+                leaf = self.find_leaf(cluster, ancilla)
+                if leaf:
+                    key, (new_ancilla, edge) = leaf
+                    self._edge_peel(edge, variant="peel")
+                    self.peel_leaf(cluster, new_ancilla)
+
+
+class Rotated(Planar):
+    """Union-Find decoder for the rotated lattice.
+
+    The decoding graph of the rotated code has the same structure as the planar code, with its boundaries inhabited by `~.codes.elements.PseudoQubit` objects. See the description of `.unionfind.sim.Toric`.
+    """
+
+    _Engine = arrays.Rotated
@@ -1,8 +1,110 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Union
+from pathlib import Path
 from ..codes.elements import Qubit
 from matplotlib import pyplot as plt
-from functools import wraps
+from functools import partial, wraps
+import numpy
+
+
+rate_type = Union[float, numpy.ndarray]
+
+
+def sample_indices(
+    n: int, p: rate_type, rng: Optional[numpy.random.Generator] = None, sparse: bool = False
+) -> numpy.ndarray:
+    """Returns the sorted indices of the errors in ``n`` independent trials with error probability ``p``.
+
+    In the dense mode, a uniform number is drawn for every trial. In the sparse mode, the gaps between consecutive errors are drawn from the geometric distribution, such that the cost is proportional to the number of errors instead of ``n``. Both modes sample the same distribution. If ``p`` is an array of a probability per trial, the sparse mode draws the candidates at the largest probability, of which each is kept with the ratio of its own probability to the largest.
+
+    Parameters
+    ----------
+    n
+        Number of trials.
+    p
+        Probability of an error in a trial, or an array of length ``n`` of the probability of every trial.
+    rng
+        Random number generator, a new generator is used if none is supplied.
+    sparse
+        Draw geometric gaps instead of a uniform number per trial.
+    """
+    if rng is None:
+        rng = numpy.random.default_rng()
+    if isinstance(p, numpy.ndarray):
+        if not sparse:
+            return numpy.flatnonzero(rng.random(n) < p)
+        p_max = float(p.max(initial=0))
+        indices = sample_indices(n, p_max, rng, sparse=True)
+        return indices[rng.random(len(indices)) * p_max < p[indices]]
+    if p <= 0 or n == 0:
+        return numpy.empty(0, dtype=numpy.intp)
+    if p >= 1:
+        return numpy.arange(n)
+    if not sparse:
+        return numpy.flatnonzero(rng.random(n) < p)
+
+    # Draw enough gaps to pass n with high probability, and more only if needed
+    expected = n * p
+    chunk = int(expected + 4 * numpy.sqrt(expected) + 8)
+    indices = numpy.cumsum(rng.geometric(p, size=chunk)) - 1
+    while indices[-1] < n:
+        indices = numpy.concatenate([indices, indices[-1] + numpy.cumsum(rng.geometric(p, size=chunk))])
+    return indices[: numpy.searchsorted(indices, n)]
+
+
+def read_error_rates(file: Union[str, Path], code, names: List[str]) -> Dict[str, numpy.ndarray]:
+    """Reads maps of the error rates of the data-qubits of ``code`` from a file.
+
+    A map holds the error rate of every data-qubit by ``DataQubit.index``, as an array of shape ``(num_data,)``, or of shape ``(layers, num_data)`` for a different rate on each layer. The file may be
+
+    - a ``.npy`` file with the map of the single rate in ``names``,
+    - a ``.npz`` file with the maps of any of ``names`` by name,
+    - a ``.csv`` file with a header and a row per data-qubit, with its coordinates in the columns ``x``, ``y`` and optionally the layer ``z``, and a column for any of ``names``.
+
+    Parameters
+    ----------
+    file
+        Path to the file.
+    code : `~.codes._template.sim.PerfectMeasurements`
+        Initialized surface code of which the data-qubits are mapped.
+    names
+        Names of the error rates, e.g. ``["p_bitflip", "p_phaseflip"]``.
+
+    Returns
+    -------
+    dict of `~numpy.ndarray`
+        The maps of the rates in ``names`` that are found in the file.
+    """
+    file = Path(file)
+    num_data = len(code.locs["data"])
+    if file.suffix == ".npy":
+        if len(names) != 1:
+            raise ValueError(f"A .npy file holds the map of a single error rate, not of {names}.")
+        rates = {names[0]: numpy.load(file)}
+    elif file.suffix == ".npz":
+        with numpy.load(file) as data:
+            rates = {name: data[name] for name in names if name in data}
+    elif file.suffix == ".csv":
+        table = numpy.atleast_1d(numpy.genfromtxt(file, delimiter=",", names=True))
+        index = code.get_index("data", numpy.stack([table["x"], table["y"]], axis=-1))
+        if numpy.any(index == -1):
+            raise ValueError(f"{numpy.count_nonzero(index == -1)} rows of {file} are not located at a data-qubit.")
+        layers = table["z"].astype(int) if "z" in table.dtype.names else None
+        rates = {}
+        for name in names:
+            if name in table.dtype.names:
+                rate = numpy.full((code.layers, num_data) if layers is not None else num_data, numpy.nan)
+                rate[(layers, index) if layers is not None else index] = table[name]
+                rates[name] = rate
+    else:
+        raise ValueError(f"Cannot read error rates from {file}, which is not a .npy, .npz or .csv file.")
+
+    for name, rate in rates.items():
+        rate = rates[name] = numpy.asarray(rate, dtype=float)
+        if rate.shape[-1] != num_data or rate.ndim not in [1, 2] or numpy.any(numpy.isnan(rate)):
+            raise ValueError(f"The map of {name} in {file} does not hold a rate for each of the {num_data} data-qubits.")
+    return rates
 
 
 class Sim(ABC):
@@ -10,6 +112,8 @@ class Sim(ABC):
 
     The template simulation error class can be used as a parent class for error modules for surface code classes that inherit from `.codes._template.sim.PerfectMeasurements` or `.codes._template.sim.FaultyMeasurements`. The error of the module must be applied to each qubit separately using the abstract method `random_error`.
 
+    An error module can additionally apply its error to all data-qubits of a layer at once in `random_errors_bulk`, which is used instead of `random_error` if ``bulk`` is set and the code is instanced with ``bulk_errors`` enabled. An error rate may also be a map of the rate of every data-qubit (see `read_error_rates` and `load_error_rates`), which is applied in a single draw on the bulk path. An error module can also apply a fixed number of faults on a layer in `random_errors_weight`, over the locations counted by `fault_locations`. The loaded modules of a code are applied together by an `ErrorPlan`, with the per-qubit functions of `qubit_sampler`.
+
     Parameters
     ----------
     code : `.codes._template.sim.PerfectMeasurements`
@@ -19,8 +123,15 @@ class Sim(ABC):
     ----------
     default_error_rates : dict of float
         The error rates that are applied at default.
+    bulk : bool
+        The module implements `random_errors_bulk`.
+    layered : bool
+        The module implements `random_flips_layers`.
     """
 
+    bulk: bool = False
+    layered: bool = False
+
     def __init__(self, code=None, **kwargs) -> None:
         self.code = code
         self.default_error_rates = {}
@@ -40,6 +151,153 @@ class Sim(ABC):
         """
         pass
 
+    def resolve_rates(self, **kwargs) -> dict:
+        """Returns ``kwargs`` with the default error rates of the module in place of the omitted or none rates."""
+        rates = dict(kwargs)
+        for name, default in self.default_error_rates.items():
+            if rates.get(name) is None:
+                rates[name] = default
+        return rates
+
+    def qubit_sampler(self, **rates) -> Optional[Callable[[Qubit], None]]:
+        """Returns a function that applies the current error type to a single qubit at the resolved ``rates``, see `resolve_rates`.
+
+        The function of the template calls `random_error` with the bound ``rates``. Error modules may return a function with the rates checked in advance, or none if no error can occur at the ``rates``.
+        """
+        return partial(self.random_error, **rates)
+
+    def load_error_rates(self, file: Union[str, Path], names: Optional[List[str]] = None):
+        """Loads maps of the error rates per data-qubit from ``file`` as the default error rates, see `read_error_rates`.
+
+        Parameters
+        ----------
+        file
+            Path to a ``.npy``, ``.npz`` or ``.csv`` file.
+        names
+            Names of the error rates to load, all default error rates of the module by default.
+        """
+        self.default_error_rates.update(read_error_rates(file, self.code, names or list(self.default_error_rates)))
+
+    @staticmethod
+    def layer_rate(rate: rate_type, z: int = 0) -> rate_type:
+        """Returns the error rate of the data-qubits on layer ``z``, which is a map of shape ``(num_data,)`` or a scalar."""
+        if isinstance(rate, numpy.ndarray) and rate.ndim == 2:
+            return rate[z]
+        return rate
+
+    @staticmethod
+    def layers_rate(rate: rate_type, layers: int) -> rate_type:
+        """Returns the error rate of the data-qubits on the first ``layers`` layers, which broadcasts to the shape ``(layers, num_data)``."""
+        if isinstance(rate, numpy.ndarray) and rate.ndim == 2:
+            return rate[:layers]
+        return rate
+
+    @staticmethod
+    def qubit_rate(rate: rate_type, qubit: Qubit) -> float:
+        """Returns the error rate of ``qubit`` from a scalar rate or a map of rates."""
+        if isinstance(rate, numpy.ndarray):
+            return rate[qubit.z, qubit.index] if rate.ndim == 2 else rate[qubit.index]
+        return rate
+
+    def random_errors_bulk(self, z: int = 0, **kwargs) -> None:
+        """Applies the current error type to all data-qubits on layer ``z`` at once.
+
+        Parameters
+        ----------
+        z
+            Layer of the data-qubits.
+        """
+        raise NotImplementedError(f"The {self.type} error module has no bulk error path.")
+
+    def random_flips_layers(self, layers: int, **kwargs) -> numpy.ndarray:
+        """Draws the flips of the edge states by the current error type on the data-qubits of the first ``layers`` layers at once.
+
+        The flips are independent of the states of the edges, such that the states of all layers follow from a cumulative XOR along the time axis, see `~.codes._template.sim.FaultyMeasurements.random_errors_window`.
+
+        Parameters
+        ----------
+        layers
+            Number of layers.
+
+        Returns
+        -------
+        `~numpy.ndarray`
+            Boolean array of shape ``(layers, 2, num_data)``, in the order of the edge states of `~.codes.arrays.LatticeArrays`.
+        """
+        raise NotImplementedError(f"The {self.type} error module has no layered error path.")
+
+    def fault_locations(self, **kwargs) -> int:
+        """Returns the number of locations of the faults of the current error type on a layer, for the nonzero error rates in ``kwargs``.
+
+        Every location must fail independently with the same probability, see `~.main.run_fixed_weight`. Error rates that would give locations with different probabilities raise a `ValueError`.
+        """
+        raise NotImplementedError(f"The {self.type} error module has no fixed-weight error path.")
+
+    def random_errors_weight(self, weight: int, z: int = 0, **kwargs) -> None:
+        """Applies exactly ``weight`` faults of the current error type to distinct locations on layer ``z``, drawn uniformly from the `fault_locations`.
+
+        Parameters
+        ----------
+        weight
+            Number of faults.
+        z
+            Layer of the data-qubits.
+        """
+        raise NotImplementedError(f"The {self.type} error module has no fixed-weight error path.")
+
+
+class ErrorPlan(object):
+    """Fused sampling plan of the error modules loaded on a code.
+
+    The rates of every module are resolved once by `Sim.resolve_rates` when the plan is compiled, instead of for every qubit. Consecutive modules that are applied per qubit are fused into a single pass over the data-qubits of a layer, in which the functions of `Sim.qubit_sampler` of all modules are applied to every qubit in turn. Modules with a ``bulk`` path are applied to all data-qubits of the layer at once by `Sim.random_errors_bulk` if ``bulk`` is enabled. The modules are applied in the order of ``errors``, such that every qubit sees the errors of the modules in the same order as when the modules are applied one after another.
+
+    Parameters
+    ----------
+    errors
+        Error modules in the order in which they are applied.
+    bulk
+        Use the bulk path of the modules that implement it.
+    kwargs
+        Overriding error rates, see `~.codes._template.sim.PerfectMeasurements.random_errors`.
+
+    Attributes
+    ----------
+    steps : list of tuple
+        Tuples of an error module and its resolved rates for the bulk steps, or of none and a list of per-qubit functions for the fused steps.
+    """
+
+    def __init__(self, errors: List[Sim], bulk: bool = False, **kwargs):
+        self.steps = []
+        for error in errors:
+            rates = error.resolve_rates(**kwargs)
+            if bulk and error.bulk:
+                self.steps.append((error, rates))
+                continue
+            sampler = error.qubit_sampler(**rates)
+            if sampler is None:
+                continue
+            if self.steps and self.steps[-1][0] is None:
+                self.steps[-1][1].append(sampler)
+            else:
+                self.steps.append((None, [sampler]))
+
+    def __repr__(self) -> str:
+        return f"<ErrorPlan of {len(self.steps)} steps>"
+
+    def apply(self, code, z: int = 0):
+        """Applies the errors of the plan to the data-qubits on layer ``z`` of ``code``."""
+        for error, step in self.steps:
+            if error is not None:
+                error.random_errors_bulk(z, **step)
+            elif len(step) == 1:
+                (sample,) = step
+                for qubit in code.data_qubits[z].values():
+                    sample(qubit)
+            else:
+                for qubit in code.data_qubits[z].values():
+                    for sample in step:
+                        sample(qubit)
+
 
 class Plot(Sim):
     """Template plot class for errors.
@@ -97,7 +355,7 @@ class Plot(Sim):
                 # apply error
                 pass
 
-    Finally, error methods can be also be added to the GUI of the surface code plot. For this, each error method must a *static method* that is not dependant on the error class. Each error method to be added in the GUI must be included in ``self.gui_methods``. The GUI elements are included in `~.codes._template.PerfectMeasurements.Figure.init_plot`.
+    Finally, error methods can be also be added to the GUI of the surface code plot. For this, each error method is looked up on the loaded error instance, and called with the picked qubit and the keyword arguments ``instance`` and ``temporary``. An error method can thus be a *static method*, or a method that updates the state of the error instance, such as the erasure mask of `.errors.erasure.Sim`. Each error method to be added in the GUI must be included in ``self.gui_methods``. The GUI elements are included in `~.codes._template.PerfectMeasurements.Figure.init_plot`.
 
     .. code-block:: python
 
@@ -148,8 +406,11 @@ class Plot(Sim):
         If enabled, the application of an error method on a qubit cannot be reversed within the same simulation instance.
     gui_methods : list
         List of names of the static error methods include in the surface plot GUI.
+
+    The bulk error path is disabled for plotting, such that all errors are applied by the error methods.
     """
 
+    bulk: bool = False
     error_methods: list = []
     legend_params: dict = {}
     legend_titles: dict = {}
@@ -1,27 +1,57 @@
-from ._template import Sim as TemplateSim, Plot as TemplatePlot
-from ..codes.elements import DataQubit
-from typing import Optional, Tuple
+from ._template import Sim as TemplateSim, Plot as TemplatePlot, sample_indices, rate_type
+from ..codes.elements import DataQubit, AncillaQubit, register_fields
+from typing import Callable, Optional, Tuple
+import numpy
 import random
 
 
+register_fields(DataQubit, erasure=None)
+register_fields(AncillaQubit, erasure=None)
+
+
 class Sim(TemplateSim):
     """Simulation erasure error class.
 
     Parameters
     ----------
     p_erasure
-        Default probability of erasure errors.
+        Default probability of erasure errors, or a map of the rate of every data-qubit, see `~.errors._template.Sim.load_error_rates`.
     initial_states
         Default state of the qubit after re-initialization.
+
+    If the code is instanced with ``bulk_errors``, the erased qubits of a layer are drawn at once by `random_errors_bulk` instead of `random_error`.
+
+    Next to the ``erasure`` stamp on the qubit, every erasure is recorded in a boolean mask of the data-qubits of its layer, which is returned by `erased`. The decoders read the erased edges from this mask instead of testing every edge they visit, see `~.decoders._template.Sim.get_erasures`.
+
+    Attributes
+    ----------
+    mask : `~numpy.ndarray`
+        Boolean erasure mask of shape ``(layers, num_data)``, indexed by the layer and ``qubit.index`` of the data-qubits. Only valid for the instance at ``mask_instance``.
+    mask_instance : int
+        Simulation instance of the code in which ``mask`` was last written.
     """
 
-    def __init__(self, *args, p_erasure: float = 0, initial_states: Tuple[float, float] = (0, 0), **kwargs):
+    bulk = True
+
+    def __init__(self, *args, p_erasure: rate_type = 0, initial_states: Tuple[float, float] = (0, 0), **kwargs):
         super().__init__(*args, **kwargs)
         self.initial_states = initial_states
         self.default_error_rates = {"p_erasure": p_erasure}
-        self.code._DataQubit.erasure = None
-        self.code._AncillaQubit.erasure = None
-        # TODO above line is required for unionfind/ufns decoder, but doesn't make sense
+        self.mask = None
+        self.mask_instance = None
+
+    def erased(self, z: int = 0) -> numpy.ndarray:
+        """Returns the boolean erasure mask of the data-qubits on layer ``z`` in the current instance of the code.
+
+        The mask is indexed by ``qubit.index``. It is allocated on first use, and cleared once the instance of the code has changed since it was last written, such that the erasures of a previous simulation are never returned.
+        """
+        code = self.code
+        if self.mask is None:
+            self.mask = numpy.zeros((code.layers, len(code.locs["data"])), dtype=bool)
+        if self.mask_instance != code.instance:
+            self.mask[:] = False
+            self.mask_instance = code.instance
+        return self.mask[z]
 
     def random_error(self, qubit, p_erasure: float = 0, initial_states: Optional[Tuple[float, float]] = None, **kwargs):
         """Applies an erasure error.
@@ -37,14 +67,89 @@ class Sim(TemplateSim):
         """
         if p_erasure is None:
             p_erasure = self.default_error_rates["p_erasure"]
+        p_erasure = self.qubit_rate(p_erasure, qubit)
         if p_erasure != 0 and random.random() < p_erasure:
             if initial_states is None:
                 initial_states = self.initial_states
             self.erasure(qubit, instance=getattr(self.code, "instance", 0), initial_states=initial_states, **kwargs)
 
-    @staticmethod
-    def erasure(qubit: DataQubit, instance: float = 0, initial_states: Tuple[float, float] = (0, 0), **kwargs):
-        """Erases the ``qubit`` by resetting its attributes.
+    def qubit_sampler(
+        self, p_erasure: rate_type = 0, initial_states: Optional[Tuple[float, float]] = None, **kwargs
+    ) -> Optional[Callable[[DataQubit], None]]:
+        """Returns a function that erases a single qubit at the resolved scalar rate in the current instance of the code, which draws the same random numbers as `random_error`. None is returned if the rate is zero. Maps of rates are applied by `random_error`."""
+        if isinstance(p_erasure, numpy.ndarray):
+            return super().qubit_sampler(p_erasure=p_erasure, initial_states=initial_states, **kwargs)
+        if not p_erasure:
+            return None
+        if initial_states is None:
+            initial_states = self.initial_states
+        uniform, erasure, instance = random.random, self.erasure, getattr(self.code, "instance", 0)
+
+        def sample(qubit: DataQubit):
+            if uniform() < p_erasure:
+                erasure(qubit, instance=instance, initial_states=initial_states, **kwargs)
+
+        return sample
+
+    def random_errors_bulk(
+        self, z: int = 0, p_erasure: Optional[rate_type] = None, initial_states: Optional[Tuple[float, float]] = None, **kwargs
+    ):
+        """Applies erasure errors to all data-qubits on layer ``z`` at once.
+
+        The indices of the erased data-qubits are drawn by `~.errors._template.sample_indices` from the random number generator of the code at ``code.rng``, with geometric gaps if ``code.sparse_errors`` is enabled. Only the erased data-qubits are visited. With the array backend of the code, the erasure mask and the edge states of the erased data-qubits are set at once, and random states after re-initialization are drawn from ``code.rng``.
+
+        Parameters
+        ----------
+        z
+            Layer of the data-qubits.
+        p_erasure
+            Overriding probability of erasure errors.
+        initial_states
+            Overriding state of the qubit after re-initialization.
+        """
+        if p_erasure is None:
+            p_erasure = self.default_error_rates["p_erasure"]
+        if initial_states is None:
+            initial_states = self.initial_states
+        code, data_qubits = self.code, self.code.data_list[z]
+        p_erasure = self.layer_rate(p_erasure, z)
+        indices = sample_indices(len(data_qubits), p_erasure, code.rng, sparse=code.sparse_errors)
+        if code.arrays is None:
+            for i in indices.tolist():
+                self.erasure(data_qubits[i], instance=code.instance, initial_states=initial_states, **kwargs)
+            return
+        self.erased(z)[indices] = True
+        states = code.arrays.states[z]
+        for t, state in enumerate(initial_states):
+            states[t, indices] = code.rng.random(len(indices)) < 0.5 if state is None else bool(state)
+        for i in indices.tolist():
+            data_qubits[i].erasure = code.instance
+            data_qubits[i].reinitialized = True
+
+    def fault_locations(self, **kwargs) -> int:
+        """Returns the number of data-qubits of a layer, which can each be erased."""
+        return len(self.code.locs["data"])
+
+    def random_errors_weight(self, weight: int, z: int = 0, initial_states: Optional[Tuple[float, float]] = None, **kwargs):
+        """Erases exactly ``weight`` distinct data-qubits on layer ``z``, drawn uniformly from the random number generator of the code at ``code.rng``.
+
+        Parameters
+        ----------
+        weight
+            Number of erased data-qubits.
+        z
+            Layer of the data-qubits.
+        initial_states
+            Overriding state of the qubit after re-initialization.
+        """
+        if initial_states is None:
+            initial_states = self.initial_states
+        data_qubits = self.code.data_list[z]
+        for i in self.code.rng.choice(len(data_qubits), size=weight, replace=False).tolist():
+            self.erasure(data_qubits[i], instance=self.code.instance, initial_states=initial_states, **kwargs)
+
+    def erasure(self, qubit: DataQubit, instance: int = 0, initial_states: Tuple[float, float] = (0, 0), **kwargs):
+        """Erases the ``qubit`` by resetting its attributes and marking it in the erasure mask of its layer, see `erased`.
 
         Parameters
         ----------
@@ -56,6 +161,7 @@ class Sim(TemplateSim):
             State of the qubit after re-initialization.
         """
         qubit.erasure = instance
+        self.erased(qubit.z)[qubit.index] = True
         qubit._reinitialize(initial_states=initial_states, **kwargs)
 
 
@@ -1,7 +1,8 @@
 from ..codes.elements import Qubit
-from ._template import Sim as TemplateSim, Plot as TemplatePlot
-from typing import Optional
+from ._template import Sim as TemplateSim, Plot as TemplatePlot, sample_indices, rate_type
+from typing import Callable, Optional, Tuple, Union
 import random
+import numpy
 
 
 class Sim(TemplateSim):
@@ -9,13 +10,18 @@ class Sim(TemplateSim):
 
     Parameters
     ----------
-    p_bitflip : float or int, optional
+    p_bitflip : float or int or `~numpy.ndarray`, optional
         Default probability of X-errors or bitflip errors.
-    p_phaseflip : float or int, optional
+    p_phaseflip : float or int or `~numpy.ndarray`, optional
         Default probability of Z-errors or phaseflip errors.
+
+    If the code is instanced with ``bulk_errors``, the errors on a layer are applied by `random_errors_bulk` instead of `random_error`. Any rate may be a map of the rate of every data-qubit, see `~.errors._template.Sim.load_error_rates`.
     """
 
-    def __init__(self, *args, p_bitflip: float = 0, p_phaseflip: float = 0, **kwargs) -> None:
+    bulk = True
+    layered = True
+
+    def __init__(self, *args, p_bitflip: rate_type = 0, p_phaseflip: rate_type = 0, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.default_error_rates = {"p_bitflip": p_bitflip, "p_phaseflip": p_phaseflip}
 
@@ -36,6 +42,7 @@ class Sim(TemplateSim):
             p_bitflip = self.default_error_rates["p_bitflip"]
         if p_phaseflip is None:
             p_phaseflip = self.default_error_rates["p_phaseflip"]
+        p_bitflip, p_phaseflip = self.qubit_rate(p_bitflip, qubit), self.qubit_rate(p_phaseflip, qubit)
 
         do_bitflip = p_bitflip != 0 and random.random() < p_bitflip
         do_phaseflip = p_phaseflip != 0 and random.random() < p_phaseflip
@@ -47,6 +54,184 @@ class Sim(TemplateSim):
         elif do_phaseflip:
             self.phaseflip(qubit)
 
+    def qubit_sampler(self, p_bitflip: rate_type = 0, p_phaseflip: rate_type = 0, **kwargs) -> Optional[Callable[[Qubit], None]]:
+        """Returns a function that applies Pauli errors to a single qubit at the resolved scalar rates, which draws the same random numbers as `random_error`. None is returned if both rates are zero. Maps of rates are applied by `random_error`."""
+        if isinstance(p_bitflip, numpy.ndarray) or isinstance(p_phaseflip, numpy.ndarray):
+            return super().qubit_sampler(p_bitflip=p_bitflip, p_phaseflip=p_phaseflip, **kwargs)
+        if not p_bitflip and not p_phaseflip:
+            return None
+        uniform, bitflip, phaseflip, bitphaseflip = random.random, self.bitflip, self.phaseflip, self.bitphaseflip
+
+        def sample(qubit: Qubit):
+            do_bitflip = p_bitflip != 0 and uniform() < p_bitflip
+            do_phaseflip = p_phaseflip != 0 and uniform() < p_phaseflip
+            if do_bitflip and do_phaseflip:
+                bitphaseflip(qubit)
+            elif do_bitflip:
+                bitflip(qubit)
+            elif do_phaseflip:
+                phaseflip(qubit)
+
+        return sample
+
+    def random_errors_bulk(
+        self, z: int = 0, p_bitflip: Optional[rate_type] = None, p_phaseflip: Optional[rate_type] = None, **kwargs
+    ):
+        """Applies Pauli errors to all data-qubits on layer ``z`` at once.
+
+        The X and Z masks of the layer are drawn by `random_masks` from the random number generator of the code at ``code.rng``, for scalar rates or maps of the rate of every data-qubit. Y-errors are the data-qubits in both masks. The masks are applied to the edge states by `apply_masks`. If ``code.sparse_errors`` is enabled, only the indices of the flipped edges are drawn by `~.errors._template.sample_indices` and applied by `apply_flips`.
+
+        Parameters
+        ----------
+        z
+            Layer of the data-qubits.
+        p_bitflip
+            Overriding probability of X-errors or bitflip errors.
+        p_phaseflip
+            Overriding probability of Z-errors or phaseflip errors.
+        """
+        if p_bitflip is None:
+            p_bitflip = self.default_error_rates["p_bitflip"]
+        if p_phaseflip is None:
+            p_phaseflip = self.default_error_rates["p_phaseflip"]
+        p_bitflip, p_phaseflip = self.layer_rate(p_bitflip, z), self.layer_rate(p_phaseflip, z)
+        if not numpy.any(p_bitflip) and not numpy.any(p_phaseflip):
+            return
+        num_data = len(self.code.locs["data"])
+        if self.code.sparse_errors:
+            indices = [sample_indices(num_data, p, self.code.rng, sparse=True) for p in [p_bitflip, p_phaseflip]]
+            self.apply_flips(numpy.concatenate([indices[0], indices[1] + num_data]), z=z)
+        else:
+            self.apply_masks(self.random_masks(num_data, p_bitflip, p_phaseflip, rng=self.code.rng), z=z)
+
+    def random_flips_layers(
+        self, layers: int, p_bitflip: Optional[rate_type] = None, p_phaseflip: Optional[rate_type] = None, **kwargs
+    ) -> numpy.ndarray:
+        """Draws the X and Z masks of Pauli errors on the data-qubits of the first ``layers`` layers at once.
+
+        The masks of all layers are drawn by `random_masks` in a single call to ``code.rng``, or by `~.errors._template.sample_indices` over all layers if ``code.sparse_errors`` is enabled.
+
+        Parameters
+        ----------
+        layers
+            Number of layers.
+        p_bitflip
+            Overriding probability of X-errors or bitflip errors.
+        p_phaseflip
+            Overriding probability of Z-errors or phaseflip errors.
+
+        Returns
+        -------
+        `~numpy.ndarray`
+            Boolean array of shape ``(layers, 2, num_data)``.
+        """
+        if p_bitflip is None:
+            p_bitflip = self.default_error_rates["p_bitflip"]
+        if p_phaseflip is None:
+            p_phaseflip = self.default_error_rates["p_phaseflip"]
+        rates = [self.layers_rate(p_bitflip, layers), self.layers_rate(p_phaseflip, layers)]
+        num_data = len(self.code.locs["data"])
+        if not any(numpy.any(p) for p in rates):
+            return numpy.zeros((layers, 2, num_data), dtype=bool)
+        if self.code.sparse_errors:
+            masks = numpy.zeros((2, layers * num_data), dtype=bool)
+            for mask, p in zip(masks, rates):
+                if isinstance(p, numpy.ndarray):
+                    p = numpy.broadcast_to(p, (layers, num_data)).ravel()
+                mask[sample_indices(layers * num_data, p, self.code.rng, sparse=True)] = True
+            masks = masks.reshape(2, layers, num_data)
+        else:
+            masks = self.random_masks((layers, num_data), *rates, rng=self.code.rng)
+        return masks.swapaxes(0, 1)
+
+    def fault_types(self, p_bitflip: Optional[float] = None, p_phaseflip: Optional[float] = None, **kwargs) -> list:
+        """Returns the indices of the edge types, 0 for X and 1 for Z, of which the error rate is nonzero.
+
+        The fault locations of all returned types must fail with the same probability, such that a fixed number of faults is placed uniformly over them. Raises a `ValueError` if the nonzero rates differ, or if a rate is a map of per-qubit rates.
+        """
+        if p_bitflip is None:
+            p_bitflip = self.default_error_rates["p_bitflip"]
+        if p_phaseflip is None:
+            p_phaseflip = self.default_error_rates["p_phaseflip"]
+        rates = [p_bitflip, p_phaseflip]
+        if any(numpy.ndim(p) for p in rates):
+            raise ValueError("Fixed-weight Pauli errors require uniform error rates, not maps of per-qubit rates.")
+        types = [t for t, p in enumerate(rates) if p]
+        if len({rates[t] for t in types}) > 1:
+            raise ValueError(f"Fixed-weight Pauli errors require equal nonzero rates, not p_bitflip={p_bitflip} and p_phaseflip={p_phaseflip}.")
+        return types
+
+    def fault_locations(self, **kwargs) -> int:
+        """Returns the number of edges of a layer that can be flipped by the nonzero error rates, which are ``num_data`` edges per Pauli type."""
+        return len(self.fault_types(**kwargs)) * len(self.code.locs["data"])
+
+    def random_errors_weight(self, weight: int, z: int = 0, **kwargs):
+        """Flips exactly ``weight`` distinct edges on layer ``z``, drawn uniformly from the edges of the Pauli types with a nonzero error rate.
+
+        A Y-error is thus a fault of weight 2 if both rates are nonzero, as for independent X and Z errors with equal rates. Unequal nonzero rates raise a `ValueError`, see `fault_types`.
+
+        Parameters
+        ----------
+        weight
+            Number of flipped edges.
+        z
+            Layer of the data-qubits.
+        """
+        num_data, types = len(self.code.locs["data"]), self.fault_types(**kwargs)
+        chosen = self.code.rng.choice(len(types) * num_data, size=weight, replace=False)
+        self.apply_flips(numpy.array(types, dtype=numpy.intp)[chosen // num_data] * num_data + chosen % num_data, z=z)
+
+    @staticmethod
+    def random_masks(
+        shape: Union[int, Tuple[int, ...]],
+        p_bitflip: rate_type = 0,
+        p_phaseflip: rate_type = 0,
+        rng: Optional[numpy.random.Generator] = None,
+    ) -> numpy.ndarray:
+        """Draws the X and Z masks of Pauli errors in a single call to ``rng``.
+
+        Parameters
+        ----------
+        shape
+            Shape of a mask, e.g. the number of data-qubits of a layer, or ``(shots, num_data)`` for a batch of shots.
+        p_bitflip
+            Probability of X-errors or bitflip errors, or an array of probabilities that broadcasts to ``shape``.
+        p_phaseflip
+            Probability of Z-errors or phaseflip errors, or an array of probabilities that broadcasts to ``shape``.
+        rng
+            Random number generator, a new generator is used if none is supplied.
+
+        Returns
+        -------
+        `~numpy.ndarray`
+            Boolean array of shape ``(2, *shape)`` with the X mask at index 0 and the Z mask at index 1, in the order of the edge states of `~.codes.arrays.LatticeArrays`.
+        """
+        if rng is None:
+            rng = numpy.random.default_rng()
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        rates = numpy.stack(numpy.broadcast_arrays(numpy.asarray(p_bitflip, float), numpy.asarray(p_phaseflip, float)))
+        rates = rates.reshape((2,) + (1,) * (len(shape) - rates.ndim + 1) + rates.shape[1:])
+        return rng.random((2,) + shape) < rates
+
+    def apply_masks(self, masks: numpy.ndarray, z: int = 0):
+        """Flips the edges of the data-qubits on layer ``z`` in ``masks`` of shape ``(2, num_data)``, see `random_masks`.
+
+        With the array backend of the code, the masks are applied to the edge-state arrays at once. Otherwise, only the flagged edges are flipped by `apply_flips`.
+        """
+        if self.code.arrays is not None:
+            self.code.arrays.states[z] ^= masks
+        else:
+            self.apply_flips(numpy.flatnonzero(masks), z=z)
+
+    def apply_flips(self, indices: numpy.ndarray, z: int = 0):
+        """Flips the edges on layer ``z`` at the unique ``indices`` of the flattened edge states, see `~.codes.arrays.LatticeArrays`."""
+        if self.code.arrays is not None:
+            self.code.arrays.states[z].reshape(-1)[indices] ^= True
+        else:
+            edges = self.code.edge_list[z]
+            for i in indices.tolist():
+                edges[i].state = not edges[i].state
+
     @staticmethod
     def bitflip(qubit: Qubit, **kwargs):
         """Applies a bitflip or Pauli X on ``qubit``."""
@@ -1,11 +1,12 @@
 """
-Contains functions and classes to run and benchmark surface code simulations and visualizations. Use `initialize` to prepare a surface code and a decoder instance, which can be passed on to `run` and `run_multiprocess` to simulate errors and to decode them with the decoder. 
+Contains functions and classes to run and benchmark surface code simulations and visualizations. Use `initialize` to prepare a surface code and a decoder instance, which can be passed on to `run`, `run_multiprocess` and `run_bitsliced` to simulate errors and to decode them with the decoder. Low logical error rates are estimated from errors of fixed weight by `run_fixed_weight` and `fixed_weight_rate`, and a list of error rates is swept with common random numbers by `run_sweep`. Circuit-level noise on the parity measurements is simulated in batches by `run_circuit`. The shots of a simulation are stored by `record_shots`, and decoded again without sampling by `run_replay` to benchmark decoders on identical inputs. The random number generators of all runs are seeded per chunk of iterations from a campaign seed by `seed_code`, such that a run can be split over processes or machines, or resumed, without changing the simulated shots.
 """
 from __future__ import annotations
 from types import ModuleType
 from typing import List, Optional, Tuple, Union
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from functools import wraps
+from pathlib import Path
 from multiprocessing import Process, Queue, cpu_count
 import timeit
 import random
@@ -21,6 +22,9 @@ errors_type = List[Union[str, Error]]
 code_type = codes._template.sim.PerfectMeasurements
 decoder_type = decoders._template.Sim
 
+lattice_cache = OrderedDict()
+lattice_cache_size = 8
+
 
 def initialize(
     size: size_type,
@@ -29,6 +33,8 @@ def initialize(
     enabled_errors: errors_type = [],
     faulty_measurements: bool = False,
     plotting: bool = False,
+    cache_lattice: bool = True,
+    snapshot: Optional[Union[str, Path]] = None,
     **kwargs,
 ):
     """Initializes a code and a decoder.
@@ -49,6 +55,10 @@ def initialize(
         Enable faulty measurements (decode in a 3D lattice).
     plotting
         Enable plotting for the surface code and/or decoder.
+    cache_lattice
+        Copy the lattice from a cached template lattice instead of building it, see `get_lattice`. Not applied when ``plotting`` is enabled or for codes with a ``lazy`` lattice, see `~.codes._template.sim.PerfectMeasurements.init_bulk`.
+    snapshot
+        Load the lattice and the static decoder tables from a snapshot file saved by `~.decoders._template.Sim.save_snapshot`, see `~.codes._template.sim.PerfectMeasurements.load_snapshot`. Not applied when ``plotting`` is enabled.
     kwargs
         Keyword arguments are passed on to the chosen code, `~.codes._template.sim.PerfectMeasurements.initialize`, and the chosen decoder.
 
@@ -88,20 +98,91 @@ def initialize(
     Decoder_flow_code = getattr(Decoder_flow, Code.__name__.split(".")[-1].capitalize())
 
     code = Code_flow_dim(size, **kwargs)
-    code.initialize(*enabled_errors, **kwargs)
+    if snapshot is not None and not plotting:
+        code.load_snapshot(snapshot, **kwargs)
+        code.init_errors(*enabled_errors, **kwargs)
+    elif cache_lattice and not plotting and not code.lazy:
+        code.load_lattice(get_lattice(code, **kwargs), **kwargs)
+        code.init_errors(*enabled_errors, **kwargs)
+    else:
+        code.initialize(*enabled_errors, **kwargs)
     decoder = Decoder_flow_code(code, **kwargs)
 
     return code, decoder
 
 
+def get_lattice(code: code_type, **kwargs) -> bytes:
+    """Returns a serialized template lattice for ``code`` from the lattice cache.
+
+    The template is the lattice of an initialized code of the same class, size, number of layers and element classes as ``code``, serialized by `~.codes._template.sim.PerfectMeasurements.dump_lattice`. Templates are kept in ``lattice_cache`` with a least recently used eviction policy, holding at most ``lattice_cache_size`` lattices. A missing template is built and added to the cache. Codes are initialized from the template by `~.codes._template.sim.PerfectMeasurements.load_lattice`.
+
+    Parameters
+    ----------
+    code
+        Uninitialized code instance.
+    kwargs
+        Keyword arguments are passed on to the code class to build a missing template.
+    """
+    key = (type(code), code.size, code.layers, code.array_backend, code.compact)
+    if key in lattice_cache:
+        lattice_cache.move_to_end(key)
+        return lattice_cache[key]
+
+    kwargs.update(initial_states=(0, 0), layers=code.layers, array_backend=code.array_backend, compact=code.compact)
+    random_state = random.getstate()
+    template = type(code)(code.size, **kwargs)
+    template.initialize(**kwargs)
+    random.setstate(random_state)
+    lattice_cache[key] = template.dump_lattice()
+    while len(lattice_cache) > lattice_cache_size:
+        lattice_cache.popitem(last=False)
+    return lattice_cache[key]
+
+
+def seed_sequence(seed: Optional[float] = None, *key: int) -> numpy.random.SeedSequence:
+    """Returns the seed sequence of the random stream identified by ``key`` within the campaign of ``seed``.
+
+    The streams of a campaign are the children of a `numpy.random.SeedSequence` with ``seed`` as entropy, where ``key`` is the spawn key, e.g. the indices of a configuration and of a chunk of iterations. Streams with different keys are statistically independent, and the stream of a key does not depend on which process or machine requests it, or in which order. An integral ``seed`` is used as entropy directly, other floats by the bits of their double-precision value.
+
+    Parameters
+    ----------
+    seed
+        Seed of the campaign. Fresh entropy is drawn from the operating system if omitted, see `numpy.random.SeedSequence.entropy`.
+    key
+        Non-negative integers that identify the stream within the campaign.
+    """
+    if seed is not None and not float(seed).is_integer():
+        seed = int.from_bytes(numpy.float64(seed).tobytes(), "little")
+    return numpy.random.SeedSequence(None if seed is None else int(seed), spawn_key=tuple(int(k) for k in key))
+
+
+def seed_code(code: code_type, seed: Optional[float] = None, *key: int):
+    """Seeds the random number generators of a simulation on ``code`` with the stream ``key`` of the campaign of ``seed``.
+
+    Two independent children are spawned from the `seed_sequence` of the stream. The first seeds the `random` module, which is used by the per-qubit error methods, and the second the counter-based `numpy.random.Philox` generator at ``code.rng`` of the bulk error paths.
+    """
+    python_sequence, numpy_sequence = seed_sequence(seed, *key).spawn(2)
+    random.seed(int.from_bytes(python_sequence.generate_state(4, numpy.uint64).tobytes(), "little"))
+    code.rng = numpy.random.Generator(numpy.random.Philox(numpy_sequence))
+
+
+def new_seed() -> int:
+    """Returns a new campaign seed drawn from the entropy of the operating system."""
+    return numpy.random.SeedSequence().entropy
+
+
 def run(
     code: code_type,
     decoder: decoder_type,
     error_rates: dict = {},
     iterations: int = 1,
+    rounds: Optional[int] = None,
     decode_initial: bool = True,
     seed: Optional[float] = None,
     benchmark: Optional[BenchmarkDecoder] = None,
+    chunk_size: int = 1000,
+    chunks: Optional[List[int]] = None,
+    stream: Tuple[int, ...] = (),
     mp_queue: Optional[Queue] = None,
     mp_process: int = 0,
     **kwargs,
@@ -118,14 +199,22 @@ def run(
         A decoder instance (see `initialize`).
     iterations
         Number of iterations to run.
+    rounds
+        Number of measurement rounds per iteration for codes with faulty measurements. The rounds are streamed as a single memory experiment through a sliding window of ``layers`` layers, which is decoded every time it is full, and only the final round is measured perfectly, see `~.codes._template.sim.FaultyMeasurements.random_errors_stream`. By default, a single round is measured on each layer.
     error_rates
         Dictionary of error rates (see `~qsurface.errors`). Errors must have been loaded during code class initialization by `~.codes._template.sim.PerfectMeasurements.initialize` or `~.codes._template.sim.PerfectMeasurements.init_errors`.
     decode_initial
-        Decode initial code configuration before applying loaded errors. If random states are used for the data-qubits of the ``code`` at class initialization (default behavior), an initial round of decoding is required and is enabled through the ``decode_initial`` flag (default is enabled).
+        Decode initial code configuration before applying loaded errors. If random states are used for the data-qubits of the ``code`` at class initialization (default behavior), an initial round of decoding is required and is enabled through the ``decode_initial`` flag (default is enabled). As the lattice is reset at the start of every chunk, the initial decoding does not change the simulated shots.
     seed
-        Float to use as the seed for the random number generator.
+        Seed of the campaign, see `seed_sequence`. A new seed is drawn by `new_seed` if omitted, which is logged by ``benchmark``.
     benchmark
         Benchmarks decoder performance and analytics if attached.
+    chunk_size
+        Number of iterations per chunk. The random number generators are reseeded at the start of every chunk by `seed_code`, with the chunk index as the last element of the stream key, and the lattice is reset to the trivial state by `~.codes._template.sim.PerfectMeasurements.clear_lattice`. The shots of a chunk thus only depend on ``seed``, the configuration and the chunk index, and not on the states left by previous chunks, e.g. through erasures that reinitialize qubits to fixed states.
+    chunks
+        Indices of the chunks of ``iterations`` to run, all chunks by default. The iterations of chunk ``c`` are ``c * chunk_size`` up to ``(c + 1) * chunk_size``. Any partition of the chunks over calls, processes or machines thus simulates the same shots as a single call, such that a run can be split or resumed.
+    stream
+        Key of the configuration within the campaign, which is prepended to the chunk index, e.g. the indices of the size and error rate of a series of simulations.
     kwargs
         Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
 
@@ -151,9 +240,8 @@ def run(
     """
     # Initialize lattice
     if seed is None:
-        seed = timeit.default_timer()
-    seed = float(f"{seed}{mp_process}")
-    random.seed(seed)
+        seed = new_seed()
+    seed_code(code, seed, *stream)
 
     if decode_initial:
         print(f"Running initial iteration", end="\r")
@@ -168,14 +256,23 @@ def run(
 
     output = {"no_error": 0}
 
-    for iteration in range(iterations):
-        print(f"Running iteration {iteration+1}/{iterations}", end="\r")
-        code.random_errors(**error_rates)
-        decoder.decode(**kwargs)
-        code.logical_state  # Must get logical state property to update code.no_error
-        output["no_error"] += code.no_error
-        if hasattr(code, "figure"):
-            code.show_corrected()
+    if chunks is None:
+        chunks = range(-(-iterations // chunk_size))
+    for chunk in chunks:
+        seed_code(code, seed, *stream, chunk)
+        code.clear_lattice()
+        for iteration in range(chunk * chunk_size, min((chunk + 1) * chunk_size, iterations)):
+            print(f"Running iteration {iteration+1}/{iterations}", end="\r")
+            if rounds:
+                for _ in code.random_errors_stream(rounds, **error_rates):
+                    decoder.decode(**kwargs)
+            else:
+                code.random_errors(**error_rates)
+                decoder.decode(**kwargs)
+            code.logical_state  # Must get logical state property to update code.no_error
+            output["no_error"] += code.no_error
+            if hasattr(code, "figure"):
+                code.show_corrected()
 
     print()  # for newline after /r
 
@@ -203,11 +300,15 @@ def run_multiprocess(
     seed: Optional[float] = None,
     processes: int = 1,
     benchmark: Optional[BenchmarkDecoder] = None,
+    chunk_size: int = 1000,
+    stream: Tuple[int, ...] = (),
     **kwargs,
 ):
     """Runs surface code simulation using multiple processes.
 
-    Using the standard module `.multiprocessing` and its `~multiprocessing.Process` class, several processes are created that each runs its on contained simulation using `run`. The ``code`` and ``decoder`` objects are copied such that each process has its own instance. The total number of ``iterations`` are divided for the number of ``processes`` indicated. If no ``processes`` parameter is supplied, the number of available threads is determined via `~multiprocessing.cpu_count` and all threads are utilized.
+    Using the standard module `.multiprocessing` and its `~multiprocessing.Process` class, several processes are created that each runs its on contained simulation using `run`. The ``code`` and ``decoder`` objects are copied such that each process has its own instance. The chunks of ``chunk_size`` iterations are divided over the number of ``processes`` indicated. If no ``processes`` parameter is supplied, the number of available threads is determined via `~multiprocessing.cpu_count` and all threads are utilized.
+
+    As the random number generators are seeded and the lattice is reset per chunk, see `run`, the simulated shots and the number of iterations without logical error only depend on ``seed``, and not on the number of processes.
 
     If a `.BenchmarkDecoder` object is attached to ``benchmark``, `~multiprocessing.Process` copies the object for each separate thread. Each instance of the the decoder thus have its own benchmark object. The results of the benchmark are appended to a list and addded to the output.
 
@@ -226,11 +327,15 @@ def run_multiprocess(
     decode_initial
         Decode initial code configuration before applying loaded errors.
     seed
-        Float to use as the seed for the random number generator.
+        Seed of the campaign, see `run`.
     processes
         Number of processes to spawn.
     benchmark
         Benchmarks decoder performance and analytics if attached.
+    chunk_size
+        Number of iterations per chunk, see `run`.
+    stream
+        Key of the configuration within the campaign, see `run`.
     kwargs
         Keyword arguments are passed on to every process of run.
     """
@@ -239,10 +344,9 @@ def run_multiprocess(
 
     if processes is None:
         processes = cpu_count()
-    process_iters = iterations // processes
-    if process_iters == 0:
-        print("Please select more iterations")
-        return
+    if seed is None:
+        seed = new_seed()
+    chunks = list(range(-(-iterations // chunk_size)))
 
     if decode_initial:
         code.random_errors()
@@ -258,9 +362,12 @@ def run_multiprocess(
                 target=run,
                 args=(code, decoder),
                 kwargs={
-                    "iterations": process_iters,
+                    "iterations": iterations,
                     "decode_initial": False,
                     "seed": seed,
+                    "chunk_size": chunk_size,
+                    "chunks": chunks[process::processes],
+                    "stream": stream,
                     "mp_process": process,
                     "mp_queue": mp_queue,
                     "error_rates": error_rates,
@@ -316,6 +423,501 @@ def run_multiprocess(
     return output
 
 
+def run_bitsliced(
+    code: code_type,
+    decoder: decoder_type,
+    error_rates: dict = {},
+    iterations: int = 1,
+    shots: int = 1024,
+    seed: Optional[float] = None,
+    stream: Tuple[int, ...] = (),
+    **kwargs,
+) -> dict:
+    """Runs a surface code simulation of Pauli errors in bit-sliced batches of shots.
+
+    The errors of ``shots`` iterations at a time are sampled and stored in a `~.codes.bitslice.BitSlicedShots` object, whose syndromes and logical states are computed for 64 shots per machine word. Only the shots with a nontrivial syndrome are loaded onto ``code`` and decoded by ``decoder``. Only the ``p_bitflip`` and ``p_phaseflip`` rates of ``error_rates`` are applied, on a code with perfect measurements.
+
+    Parameters
+    ----------
+    code
+        A surface code instance with perfect measurements (see `initialize`).
+    decoder
+        A decoder instance (see `initialize`).
+    error_rates
+        Dictionary of Pauli error rates, see `~qsurface.errors.pauli.Sim.random_errors_bulk`.
+    iterations
+        Number of iterations or shots to run.
+    shots
+        Number of shots per batch, preferably a multiple of 64.
+    seed
+        Seed of the campaign. The generators are reseeded for every batch with its index as stream key, see `seed_code`.
+    stream
+        Key of the configuration within the campaign, which is prepended to the batch index.
+    kwargs
+        Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+
+    Examples
+    --------
+        >>> code, decoder = initialize((6,6), "toric", "mwpm", enabled_errors=["pauli"])
+        >>> run_bitsliced(code, decoder, iterations=10000, error_rates = {"p_bitflip": 0.05})
+        {'no_error': 9523}
+    """
+    if seed is None:
+        seed = new_seed()
+
+    batch = codes.bitslice.BitSlicedShots(code, shots)
+    output = {"no_error": 0}
+    for start in range(0, iterations, shots):
+        print(f"Running iteration {min(start + shots, iterations)}/{iterations}", end="\r")
+        seed_code(code, seed, *stream, start // shots)
+        batch.clear()
+        batch.random_errors(**error_rates)
+        output["no_error"] += int(numpy.count_nonzero(batch.decode(decoder, **kwargs)[: iterations - start]))
+    print()  # for newline after /r
+    return output
+
+
+def run_circuit(
+    code: code_type,
+    decoder: decoder_type,
+    error_rates: dict = {},
+    iterations: int = 1,
+    shots: int = 1024,
+    orders: Optional[dict] = None,
+    seed: Optional[float] = None,
+    stream: Tuple[int, ...] = (),
+    **kwargs,
+) -> dict:
+    """Runs a surface code simulation with circuit-level noise on the parity measurements in batches of shots.
+
+    The rounds of ``shots`` iterations at a time are simulated by the Pauli frames of a `~.codes.circuit.CircuitShots` object, on the layers of a code with faulty measurements. Only the shots with a nontrivial syndrome are loaded onto ``code`` and decoded by ``decoder``.
+
+    Parameters
+    ----------
+    code
+        A surface code instance with faulty measurements (see `initialize`).
+    decoder
+        A decoder instance (see `initialize`).
+    error_rates
+        Dictionary of the circuit error rates ``p_cnot``, ``p_idle``, ``p_prep`` and ``p_measure``, see `~.codes.circuit.CircuitShots.random_errors`.
+    iterations
+        Number of iterations or shots to run.
+    shots
+        Number of shots per batch, preferably a multiple of 64.
+    orders
+        The order of the CNOT gates of each type of parity check, see `~.codes.circuit.cnot_schedule`.
+    seed
+        Seed of the campaign. The generators are reseeded for every batch with its index as stream key, see `seed_code`.
+    stream
+        Key of the configuration within the campaign, which is prepended to the batch index.
+    kwargs
+        Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+
+    Examples
+    --------
+        >>> code, decoder = initialize((6,6), "toric", "unionfind", faulty_measurements=True)
+        >>> run_circuit(code, decoder, {"p_cnot": 0.002, "p_measure": 0.002}, iterations=1000)
+        {'no_error': 996}
+    """
+    if seed is None:
+        seed = new_seed()
+
+    batch = codes.circuit.CircuitShots(code, shots, orders=orders)
+    output = {"no_error": 0}
+    for start in range(0, iterations, shots):
+        print(f"Running iteration {min(start + shots, iterations)}/{iterations}", end="\r")
+        seed_code(code, seed, *stream, start // shots)
+        batch.random_errors(**error_rates)
+        output["no_error"] += int(numpy.count_nonzero(batch.decode(decoder, **kwargs)[: iterations - start]))
+    print()  # for newline after /r
+    return output
+
+
+def run_fixed_weight(
+    code: code_type,
+    decoder: decoder_type,
+    weights: List[int],
+    shots: Union[int, List[int]] = 1000,
+    error_rates: dict = {},
+    error: Optional[str] = None,
+    decode_initial: bool = True,
+    seed: Optional[float] = None,
+    **kwargs,
+) -> dict:
+    """Estimates the failure probability of the decoder for error configurations of a fixed weight.
+
+    For every weight ``w`` in ``weights``, exactly ``w`` faults of a single error module are placed uniformly over its fault locations by `~.codes._template.sim.PerfectMeasurements.random_errors_weight` and decoded, and the number of logical failures is counted. If all ``n`` locations fail independently with probability ``p``, the logical error rate is the sum over ``w`` of the binomial probability of weight ``w`` times the failure probability ``f(w)``, which is evaluated for any ``p`` from the same counts by `fixed_weight_rate`. Low logical error rates are thus found from the few weights that dominate the sum, instead of from the rare failures of direct simulation. As a single binomial is used, the nonzero rates in ``error_rates`` must be equal, such that all fault locations fail with the same probability, or a `ValueError` is raised by `~.errors._template.Sim.fault_locations`.
+
+    Parameters
+    ----------
+    code
+        A surface code instance with perfect measurements (see `initialize`).
+    decoder
+        A decoder instance (see `initialize`).
+    weights
+        The weights to simulate.
+    shots
+        Number of shots per weight, or a list of the shots of each weight.
+    error_rates
+        Dictionary of error rates of the error module, of which the nonzero rates select the fault locations, e.g. ``{"p_bitflip": 1}`` for the X-edges only. All locations are assumed to have the same error rate.
+    error
+        Name of the error module, which may be omitted if a single module is loaded.
+    decode_initial
+        Decode initial code configuration before applying errors, see `run`.
+    seed
+        Seed of the campaign. The generators are reseeded for every weight with the weight as stream key, see `seed_code`, such that the shots of a weight do not depend on the other weights.
+    kwargs
+        Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+
+    Returns
+    -------
+    dict
+        The number of fault ``locations``, and the ``weights``, ``shots`` and logical ``failures`` per weight.
+
+    Examples
+    --------
+        >>> code, decoder = initialize((8,8), "toric", "mwpm", enabled_errors=["pauli"])
+        >>> result = run_fixed_weight(code, decoder, range(1, 13), shots=500, error_rates={"p_bitflip": 1})
+        >>> fixed_weight_rate(result, [1e-3, 1e-2])
+        {'rate': array([2.1e-09, 1.8e-04]), ...}
+    """
+    if seed is None:
+        seed = new_seed()
+    seed_code(code, seed)
+    if error is None:
+        (error,) = code.errors
+    weights = list(weights)
+    shots = [shots] * len(weights) if isinstance(shots, int) else list(shots)
+
+    if decode_initial:
+        code.random_errors_weight(0, error, **error_rates)
+        decoder.decode(**kwargs)
+        code.logical_state
+
+    failures = []
+    for weight, weight_shots in zip(weights, shots):
+        print(f"Running weight {weight} for {weight_shots} shots", end="\r")
+        seed_code(code, seed, weight)
+        failed = 0
+        for _ in range(weight_shots):
+            code.random_errors_weight(weight, error, **error_rates)
+            decoder.decode(**kwargs)
+            code.logical_state  # Must get logical state property to update code.no_error
+            failed += not code.no_error
+        failures.append(failed)
+    print()  # for newline after /r
+
+    return {
+        "locations": code.errors[error].fault_locations(**error_rates),
+        "weights": weights,
+        "shots": shots,
+        "failures": failures,
+    }
+
+
+def fixed_weight_rate(result: dict, p: Union[float, List[float]], confidence: float = 0.95) -> dict:
+    """Combines the fixed-weight failures of `run_fixed_weight` into the logical error rate at error rates ``p``.
+
+    The failure probability ``f(w)`` of a weight is estimated by its fraction of failed shots, and the logical error rate by the sum of ``f(w)`` weighted by the binomial probability of weight ``w`` over the fault locations, which all fail with the same probability ``p``. Weights that were not simulated are counted as ``f(w) = 0`` in the estimate and as ``f(w) = 1`` in the upper bound, except for weight 0 which never fails. The bounds combine the Clopper-Pearson intervals of all weights, each at a level corrected for the number of weights, such that they hold jointly with at least the ``confidence`` level.
+
+    The number of direct shots is the number of shots of direct simulation that reach the same variance as the estimate, which is compared to the number of fixed-weight shots.
+
+    Parameters
+    ----------
+    result
+        Output of `run_fixed_weight`.
+    p
+        Physical error rate, or a list of error rates.
+    confidence
+        Confidence level of the bounds.
+
+    Returns
+    -------
+    dict
+        The estimated logical error ``rate``, its ``lower`` and ``upper`` bounds, and the ``shots``, ``direct_shots`` and ``shots_saved``, as arrays over ``p``.
+    """
+    from scipy import stats
+
+    weights, shots, failures = (numpy.asarray(result[key]) for key in ["weights", "shots", "failures"])
+    p = numpy.atleast_1d(numpy.asarray(p, dtype=float))[:, None]
+    probability = stats.binom.pmf(weights, result["locations"], p)
+
+    fraction = failures / shots
+    alpha = (1 - confidence) / len(weights)
+    lower = numpy.where(failures > 0, stats.beta.ppf(alpha / 2, failures, shots - failures + 1), 0)
+    upper = numpy.where(failures < shots, stats.beta.ppf(1 - alpha / 2, failures + 1, shots - failures), 1)
+    upper[weights == 0] = 0
+
+    rate = (probability * fraction).sum(axis=1)
+    variance = (probability**2 * fraction * (1 - fraction) / shots).sum(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        direct_shots = numpy.where(variance > 0, rate * (1 - rate) / variance, numpy.inf)
+    return {
+        "p": p[:, 0],
+        "rate": rate,
+        "lower": (probability * lower).sum(axis=1),
+        "upper": (probability * upper).sum(axis=1) + 1 - probability.sum(axis=1),
+        "shots": int(shots.sum()),
+        "direct_shots": direct_shots,
+        "shots_saved": direct_shots - shots.sum(),
+    }
+
+
+def run_sweep(
+    code: code_type,
+    decoder: decoder_type,
+    error_rates: List[dict],
+    iterations: int = 1,
+    shots: int = 1024,
+    seed: Optional[float] = None,
+    stream: Tuple[int, ...] = (),
+    **kwargs,
+) -> List[dict]:
+    """Runs a surface code simulation of Pauli errors for a list of error rates with common random numbers.
+
+    For every shot, a single uniform variate is drawn per edge, and the errors of every entry in ``error_rates`` are the edges of which the variate lies below the rate of their Pauli type. The error sets of the rates are thus nested, and the differences between the logical error rates of a sweep are much less noisy than those of independent runs. The shots are stored in bit-sliced batches of `~.codes.bitslice.BitSlicedShots`. A shot is only decoded if its syndrome is nontrivial and differs from its syndrome at the previous rate, as the correction of the decoder only depends on the syndrome.
+
+    Parameters
+    ----------
+    code
+        A surface code instance with perfect measurements (see `initialize`).
+    decoder
+        A decoder instance (see `initialize`).
+    error_rates
+        List of dictionaries of the Pauli error rates ``p_bitflip`` and ``p_phaseflip``, preferably in increasing order.
+    iterations
+        Number of iterations or shots to run for every entry in ``error_rates``.
+    shots
+        Number of shots per batch.
+    seed
+        Seed of the campaign. The generators are reseeded for every batch with its index as stream key, see `seed_code`.
+    stream
+        Key of the configuration within the campaign, which is prepended to the batch index.
+    kwargs
+        Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+
+    Returns
+    -------
+    list of dict
+        The number of iterations without logical error at ``no_error``, and the number of ``decoded`` shots, per entry in ``error_rates``.
+
+    Examples
+    --------
+        >>> code, decoder = initialize((6,6), "toric", "mwpm", enabled_errors=["pauli"])
+        >>> run_sweep(code, decoder, [{"p_bitflip": p} for p in [0.08, 0.09, 0.1]], iterations=1000)
+        [{'no_error': 853, 'decoded': 998}, {'no_error': 815, 'decoded': 327}, {'no_error': 772, 'decoded': 348}]
+    """
+    for rates in error_rates:
+        for name, rate in rates.items():
+            if name not in ["p_bitflip", "p_phaseflip"] and rate:
+                raise ValueError(f"Error rate {name} cannot be swept with common random numbers.")
+    if seed is None:
+        seed = new_seed()
+
+    batch = codes.bitslice.BitSlicedShots(code, shots)
+    thresholds = [
+        numpy.repeat([rates.get("p_bitflip", 0), rates.get("p_phaseflip", 0)], batch.num_data)[:, None]
+        for rates in error_rates
+    ]
+    output = [{"no_error": 0, "decoded": 0} for _ in error_rates]
+
+    for start in range(0, iterations, shots):
+        print(f"Running iteration {min(start + shots, iterations)}/{iterations}", end="\r")
+        count = min(shots, iterations - start)
+        seed_code(code, seed, *stream, start // shots)
+        variates = code.rng.random((2 * batch.num_data, shots), dtype=numpy.float32)
+        previous = None
+        for result, threshold in zip(output, thresholds):
+            batch.set_errors(variates < threshold)
+            syndrome = batch.syndrome()
+            nontrivial = batch.nontrivial_shots(syndrome)
+            if previous is None:
+                corrections = numpy.zeros((batch.logical.shape[0], shots), dtype=bool)
+                changed = nontrivial
+            else:
+                corrections[:, numpy.setdiff1d(numpy.arange(shots), nontrivial)] = False
+                changed = numpy.intersect1d(nontrivial, batch.nontrivial_shots(syndrome ^ previous))
+            changed = changed[changed < count]
+            corrections[:, changed] = batch.corrections(decoder, changed, **kwargs)
+            logical = codes.bitslice.unpack_shots(batch.logical_state(), shots) ^ corrections
+            result["no_error"] += int(numpy.count_nonzero(~logical[:, :count].any(axis=0)))
+            result["decoded"] += len(changed)
+            previous = syndrome
+    print()  # for newline after /r
+    return output
+
+
+def record_shots(
+    code: code_type,
+    path: Union[str, Path],
+    error_rates: dict = {},
+    iterations: int = 1,
+    chunk_size: int = 1024,
+    seed: Optional[float] = None,
+    stream: Tuple[int, ...] = (),
+    append: bool = False,
+) -> dict:
+    """Samples errors on a surface code with perfect measurements and records the shots to a file, see `~.codes.records.ShotRecorder`.
+
+    The shots are not decoded. Instead, the edges of the code are reset before every shot, such that every row holds the errors of a single shot. The random number generators are reseeded per chunk as in `run`, such that the errors of a seed are sampled from the same random numbers as by `run` with the same ``chunk_size``.
+
+    Parameters
+    ----------
+    code
+        A surface code instance with perfect measurements (see `initialize`).
+    path
+        File to write.
+    error_rates
+        Dictionary of error rates (see `~qsurface.errors`).
+    iterations
+        Number of shots to record.
+    chunk_size
+        Number of shots per chunk.
+    seed
+        Seed of the campaign, see `seed_code`.
+    stream
+        Key of the configuration within the campaign, which is prepended to the chunk index.
+    append
+        Append the shots to an existing record of the same lattice.
+
+    Returns
+    -------
+    dict
+        The number of recorded ``shots`` and the ``seed``.
+
+    Examples
+    --------
+        >>> code, decoder = initialize((6,6), "toric", "mwpm", enabled_errors=["pauli"])
+        >>> record_shots(code, "shots.rec", {"p_bitflip": 0.1}, iterations=10000, seed=1)
+        {'shots': 10000, 'seed': 1}
+        >>> run_replay(code, decoder, "shots.rec")
+        {'no_error': 8130}
+    """
+    if seed is None:
+        seed = new_seed()
+    clean = numpy.zeros(2 * len(code.locs["data"]), dtype=bool)
+    with codes.records.ShotRecorder(code, path, chunk_size=chunk_size, append=append) as recorder:
+        for chunk in range(-(-iterations // chunk_size)):
+            seed_code(code, seed, *stream, chunk)
+            for iteration in range(chunk * chunk_size, min((chunk + 1) * chunk_size, iterations)):
+                print(f"Recording iteration {iteration+1}/{iterations}", end="\r")
+                codes.bitslice.load_errors(code, clean)
+                code.random_errors(**error_rates)
+                recorder.record()
+    print()  # for newline after /r
+    return {"shots": iterations, "seed": seed}
+
+
+def run_replay(
+    code: code_type,
+    decoder: decoder_type,
+    path: Union[str, Path],
+    chunks: Optional[List[int]] = None,
+    verify: bool = False,
+    benchmark: Optional[BenchmarkDecoder] = None,
+    **kwargs,
+) -> dict:
+    """Decodes the shots of a record written by `record_shots`, without sampling any errors, see `~.codes.records.ShotReplay`.
+
+    Every decoder that replays a record decodes exactly the same shots, such that decoders or versions of a decoder are compared on identical inputs, and the duration of the decoder is measured without the cost of sampling errors.
+
+    Parameters
+    ----------
+    code
+        A surface code instance with perfect measurements of the recorded lattice (see `initialize`).
+    decoder
+        A decoder instance (see `initialize`).
+    path
+        Record to replay.
+    chunks
+        Indices of the chunks of the record to replay, all chunks by default.
+    verify
+        Check the measured syndromes against the record.
+    benchmark
+        Benchmarks decoder performance and analytics if attached.
+    kwargs
+        Keyword arguments are passed on to `~.decoders._template.Sim.decode`.
+    """
+    replay = codes.records.ShotReplay(code, path)
+    if benchmark:
+        benchmark._set_decoder(decoder)
+    if chunks is None:
+        chunks = range(replay.num_chunks)
+
+    output = {"no_error": 0}
+    for chunk in chunks:
+        print(f"Replaying chunk {chunk+1}/{replay.num_chunks}", end="\r")
+        no_error = replay.decode(decoder, replay.chunk_shots(chunk), verify=verify, **kwargs)
+        output["no_error"] += int(numpy.count_nonzero(no_error))
+    print()  # for newline after /r
+
+    if benchmark:
+        output["benchmark"] = {
+            **benchmark.data,
+            **benchmark.lists_mean_var(),
+        }
+    return output
+
+
+def benchmark_construction(
+    Code: module_or_name,
+    sizes: List[int],
+    faulty_measurements: bool = False,
+    lazy: bool = True,
+    materialize: bool = False,
+    repeat: int = 1,
+    **kwargs,
+) -> dict:
+    """Measures the time to construct and initialize a lattice for a range of sizes.
+
+    The lattice cache and the matrix cache are bypassed, such that every lattice is built from scratch. With ``lazy`` enabled, the lattice is built as arrays by `~.codes._template.sim.PerfectMeasurements.init_bulk`, and its elements are only created if ``materialize`` is also enabled.
+
+    Parameters
+    ----------
+    Code
+        Any surface code module or module name from codes.
+    sizes
+        Sizes of the lattices.
+    faulty_measurements
+        Build the 3D lattice of faulty measurements, with ``size`` layers unless ``layers`` is given.
+    lazy
+        Build the lattice with the bulk constructor of the code.
+    materialize
+        Create the elements of a ``lazy`` lattice after initialization.
+    repeat
+        Number of constructions per size, of which the fastest is returned.
+    kwargs
+        Keyword arguments are passed on to the code class and `~.codes._template.sim.PerfectMeasurements.initialize`.
+
+    Returns
+    -------
+    dict
+        The construction time in seconds per size.
+
+    Examples
+    --------
+        >>> benchmark_construction("toric", [64, 128, 256], lazy=True)
+        {64: 0.0032, 128: 0.0113, 256: 0.0502}
+    """
+    if isinstance(Code, str):
+        Code = getattr(codes, Code)
+    Code_flow_dim = getattr(Code.sim, "FaultyMeasurements" if faulty_measurements else "PerfectMeasurements")
+
+    durations = {}
+    for size in sizes:
+        durations[size] = float("inf")
+        for _ in range(repeat):
+            codes.arrays.matrix_cache.clear()
+            t = timeit.default_timer()
+            code = Code_flow_dim(size, lazy=lazy, **kwargs)
+            code.initialize(**kwargs)
+            if lazy and materialize:
+                code.materialize()
+            durations[size] = min(durations[size], timeit.default_timer() - t)
+            del code
+    return durations
+
+
 class BenchmarkDecoder(object):
     """Benchmarks a decoder during simulation.
 
@@ -11,7 +11,7 @@ from scipy import optimize
 import pandas as pd
 import numpy as np
 import sys
-from .main import initialize, run, run_multiprocess, BenchmarkDecoder
+from .main import initialize, run, run_multiprocess, run_sweep, new_seed, BenchmarkDecoder
 from .errors._template import Sim as Error
 
 
@@ -32,6 +32,8 @@ def run_many(
     methods_to_benchmark: dict = {},
     output: str = "",
     mp_processes: int = 1,
+    common_random_numbers: bool = False,
+    seed: Optional[int] = None,
     recursion_limit: int = 100000,
     **kwargs,
 ) -> Optional[pd.DataFrame]:
@@ -61,6 +63,10 @@ def run_many(
         File name of outputted csv data. If set to "none", no file will be saved.
     mp_processses
         Number of processes to spawn. For a single process, `~.main.run` is used. For multiple processes, `~main.run_multiprocess` is utilized.
+    common_random_numbers
+        Sweep all ``error_rates`` of a size at once with `~.main.run_sweep`, such that the errors of all rates are drawn from the same random numbers. Only Pauli error rates with perfect measurements can be swept, and no benchmark is attached.
+    seed
+        Seed of the campaign, see `~.main.seed_sequence`. Every configuration is simulated with the random stream keyed by the indices of its size and error rate, such that the results of a configuration do not depend on the other configurations or on ``mp_processes``. A new seed is drawn by `~.main.new_seed` if omitted.
 
     Examples
     --------
@@ -108,32 +114,43 @@ def run_many(
         data = pd.DataFrame()
 
     runner = run_multiprocess if mp_processes > 1 else run
+    if seed is None:
+        seed = new_seed()
 
     # Simulate and save results to file
-    for size in sizes:
+    for size_index, size in enumerate(sizes):
 
         code, decoder = initialize(size, Code, Decoder, enabled_errors, faulty_measurements, **kwargs)
 
-        for error_rate in error_rates:
-            print(f"Running ({size}) lattice with error rates {error_rate}.")
-
-            benchmarker = BenchmarkDecoder(methods_to_benchmark)
-
-            result = runner(
-                code,
-                decoder,
-                iterations=iterations,
-                error_rates=error_rate,
-                benchmark=benchmarker,
-                mp_processes=mp_processes,
-            )
+        if common_random_numbers:
+            print(f"Running ({size}) lattice with common random numbers for {len(error_rates)} error rates.")
+            sweep = run_sweep(code, decoder, error_rates, iterations=iterations, seed=seed, stream=(size_index,))
+
+        for i, error_rate in enumerate(error_rates):
+            if common_random_numbers:
+                result = {**sweep[i], "iterations": iterations, "seed": seed}
+            else:
+                print(f"Running ({size}) lattice with error rates {error_rate}.")
+
+                benchmarker = BenchmarkDecoder(methods_to_benchmark)
+
+                result = runner(
+                    code,
+                    decoder,
+                    iterations=iterations,
+                    error_rates=error_rate,
+                    benchmark=benchmarker,
+                    seed=seed,
+                    stream=(size_index, i),
+                    processes=mp_processes,
+                )
+                result.update(result.pop("benchmark"))
 
             result.update(
                 {
                     "datetime": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
                     "size": size,
                     **error_rate,
-                    **result.pop("benchmark"),
                 }
             )
 
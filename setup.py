@@ -21,15 +21,16 @@ setup(
     classifiers=[
         "Development Status :: 3 - Alpha",
         "License :: OSI Approved :: BSD License",
-        "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.8",
         "Topic :: Scientific/Engineering :: Physics",
     ],
     packages=find_packages(exclude=["tests", "*.tests", "*.tests.*"]),
     include_package_data=True,
-    python_requires=">3.7.0",
+    python_requires=">=3.8",
     install_requires=[
         "matplotlib>=3.3.2",
         "networkx>=2.0",
+        "numpy>=1.17",
         "pandas>=1.1.0",
         "scipy>=1.4.0",
         "pptree>=3.1",
@@ -1,8 +1,15 @@
 from qsurface import codes
+from qsurface.main import initialize, run
 import pytest
+import random
+import numpy
+import copy
+import tracemalloc
+import gc
 from .variables import *
 
 code_types = ["PerfectMeasurements", "FaultyMeasurements"]
+SEED = 12345
 
 
 @pytest.mark.plotting
@@ -13,3 +20,493 @@ def test_3d_plots(Code):
     code = code_module(4, figure3d=True, plot_params=no_wait_param)
     code.initialize()
     code.figure.close()
+
+
+def get_syndrome_state(code):
+    """Returns the measured states of all ancilla-qubits in ``code``."""
+    return {
+        (z, loc): ancilla.measured_state for z, layer in code.ancilla_qubits.items() for loc, ancilla in layer.items()
+    }
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_array_backend(Code, faulty, size):
+    """Test whether the array backend yields the same syndrome and logical state as the object backend."""
+    code_module = getattr(getattr(codes, Code), "sim")
+    Code_flow = getattr(code_module, code_types[faulty])
+    error_rates = {"p_bitflip": 0.1, "p_phaseflip": 0.1}
+    if faulty:
+        error_rates.update(p_bitflip_plaq=0.1, p_bitflip_star=0.1)
+
+    results = []
+    for array_backend in [False, True]:
+        code = Code_flow(size, array_backend=array_backend)
+        code.initialize("pauli", initial_states=(0, 0))
+        random.seed(SEED)
+        states = []
+        for _ in range(5):
+            code.random_errors(**error_rates)
+            states.append((get_syndrome_state(code), code.logical_state, code.trivial_ancillas))
+        results.append(states)
+    assert code.arrays is not None
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("Code", CODES)
+def test_lattice_matrices(Code):
+    """Test whether the parity-check and logical matrices reproduce the syndrome and logical state of the code."""
+    code = getattr(getattr(codes, Code), "sim").PerfectMeasurements(SIZE_PM)
+    code.initialize("pauli", initial_states=(0, 0))
+    random.seed(SEED)
+    code.random_errors(p_bitflip=0.1, p_phaseflip=0.1)
+
+    num_data = len(code.data_qubits[0])
+    errors = numpy.zeros(2 * num_data, dtype=numpy.uint8)
+    for data_qubit in code.data_qubits[0].values():
+        for t, state_type in enumerate(["x", "z"]):
+            errors[t * num_data + data_qubit.index] = data_qubit.edges[state_type].state
+    syndrome = code.parity_check_matrix() @ errors % 2
+    for ancilla in code.ancilla_qubits[0].values():
+        assert syndrome[ancilla.index] == ancilla.measured_state
+    assert list(code.logical_matrix() @ errors % 2) == list(code.logical_state.values())
+
+    for t, state_type in enumerate(["x", "z"]):
+        parity_check = code.parity_check_matrix(state_type)
+        assert parity_check.shape[1] == num_data
+        assert (parity_check @ errors[t * num_data : (t + 1) * num_data] % 2).sum() == sum(
+            ancilla.measured_state for ancilla in code.ancilla_qubits[0].values() if ancilla.state_type == state_type
+        )
+
+    other = getattr(getattr(codes, Code), "sim").PerfectMeasurements(SIZE_PM)
+    other.initialize()
+    assert other.parity_check_matrix() is code.parity_check_matrix()
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_qubit_index(Code, faulty, size):
+    """Test whether the integer ids of the qubits match the coordinate dictionaries."""
+    code, _ = initialize(size, Code, DECODERS[0], faulty_measurements=faulty)
+    for kind in ["data", "ancilla", "pseudo"]:
+        for z, layer in getattr(code, f"{kind}_qubits").items():
+            qubits = getattr(code, f"{kind}_list")[z]
+            assert qubits == list(layer.values())
+            for index, (loc, qubit) in enumerate(layer.items()):
+                assert qubit.index == index
+                assert code.get_index(kind, loc) == index
+                assert tuple(code.locs[kind][index]) == loc
+        if len(code.locs[kind]):
+            assert list(code.get_index(kind, code.locs[kind])) == list(range(len(code.locs[kind])))
+    assert code.get_index("data", (-10, -10)) == -1
+    assert code.get_index("data", (size + 10, size + 10)) == -1
+
+    num_data = len(code.data_qubits[0])
+    for z, edges in code.edge_list.items():
+        for data_qubit in code.data_list[z]:
+            for t, state_type in enumerate(["x", "z"]):
+                assert edges[t * num_data + data_qubit.index] is data_qubit.edges[state_type]
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_incremental_measurement(Code, faulty, size):
+    """Test whether measuring only the ancillas of flipped edges keeps all measurements and syndromes up to date."""
+    code = getattr(getattr(getattr(codes, Code), "sim"), code_types[faulty])(size)
+    code.initialize("pauli")
+    random.seed(SEED)
+    for _ in range(5):
+        code.random_errors(p_bitflip=0.05, p_phaseflip=0.05)
+        edge = next(iter(code.data_qubits[code.decode_layer].values())).edges["x"]
+        edge.state = not edge.state
+        trivial = code.trivial_ancillas
+
+        parities = [
+            sum(data_qubit.edges[ancilla.state_type].state for data_qubit in ancilla.parity_qubits.values()) % 2
+            for ancilla in code.ancilla_qubits[code.decode_layer].values()
+        ]
+        measured = [ancilla.measured_state for ancilla in code.ancilla_qubits[code.decode_layer].values()]
+        assert parities == measured
+        assert trivial == (not any(parities))
+        assert code.syndromes == [
+            ancilla for layer in code.ancilla_qubits.values() for ancilla in layer.values() if ancilla.syndrome
+        ]
+
+
+@pytest.mark.parametrize("Code", CODES)
+def test_compact_elements(Code):
+    """Test whether the compact elements have no instance dictionary and carry the registered decoder fields."""
+    code, decoder = initialize(SIZE_FM, Code, "unionfind", enabled_errors=["erasure"], faulty_measurements=True, compact=True)
+    ancilla = next(iter(code.ancilla_qubits[0].values()))
+    edge = next(iter(code.data_qubits[0].values())).edges["x"]
+    assert not hasattr(ancilla, "__dict__") and not hasattr(edge, "__dict__")
+    assert ancilla.cluster is None and ancilla.erasure is None and edge.forest is None
+    with pytest.raises(AttributeError):
+        ancilla.unregistered = True
+
+    copied = copy.copy(ancilla)
+    assert type(copied) is type(ancilla) and copied.loc == ancilla.loc
+    run(code, decoder, iterations=5, error_rates={"p_erasure": 0.05})
+
+
+def test_compact_memory():
+    """Test whether compact elements reduce the memory of a decoded 3D lattice."""
+    memory = []
+    for compact in [False, True]:
+        tracemalloc.start()
+        code, decoder = initialize(8, "toric", "unionfind", enabled_errors=["pauli"], faulty_measurements=True, compact=compact)
+        run(code, decoder, iterations=3, error_rates={"p_bitflip": 0.1, "p_bitflip_plaq": 0.1})
+        gc.collect()
+        memory.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+    assert memory[1] < 0.95 * memory[0]
+
+
+@pytest.mark.parametrize("size", [3, 4, 5])
+def test_rotated_lattice(size):
+    """Test whether the rotated code has ``size**2`` data-qubits, single-edge pseudo-qubits and logical operators of weight ``size``."""
+    code, decoder = initialize(size, "rotated", "mwpm", enabled_errors=["pauli"])
+    assert len(code.data_qubits[0]) == size ** 2
+    assert len(code.ancilla_qubits[0]) == size ** 2 - 1
+    for pseudo in code.pseudo_qubits[0].values():
+        assert len(pseudo.parity_qubits) == 1
+    for data_qubit in code.data_qubits[0].values():
+        for edge in data_qubit.edges.values():
+            assert len(edge.nodes) == 2
+    assert all(len(operator) == size for operator in code.logical_operators.values())
+    for ancilla in code.ancilla_qubits[0].values():
+        assert code.get_boundary_pseudo(ancilla) is not None
+
+
+def get_lattice_description(code):
+    """Returns the locations, indices and connections of all elements of ``code`` in the order in which they were added."""
+    description = []
+    for z in range(code.layers):
+        for qubit in code.data_list[z]:
+            description.append((qubit.loc, z, qubit.index, [(key, edge.nodes) for key, edge in qubit.edges.items()]))
+        for qubit in code.ancilla_list[z] + code.pseudo_list[z]:
+            parity_qubits = [(key, data_qubit.loc) for key, data_qubit in qubit.parity_qubits.items()]
+            z_neighbors = [(ancilla.loc, ancilla.z) for ancilla in qubit.z_neighbors]
+            description.append((qubit.loc, z, qubit.index, qubit.state_type, parity_qubits, z_neighbors))
+    description.append({key: [edge.qubit.loc for edge in operator] for key, operator in code.logical_operators.items()})
+    return str(description)
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_bulk_lattice(Code, faulty, size):
+    """Test whether a lazy lattice from the bulk constructor equals the lattice built element by element."""
+    Code_flow = getattr(getattr(getattr(codes, Code), "sim"), code_types[faulty])
+    code = Code_flow(size)
+    code.initialize(initial_states=(0, 0))
+    lazy = Code_flow(size, lazy=True, array_backend=True)
+    lazy.initialize(initial_states=(0, 0))
+
+    codes.arrays.matrix_cache.clear()
+    parity_check, logical = lazy.bulk.matrices()
+    assert (parity_check != code.parity_check_matrix()).nnz == 0
+    assert (logical != code.logical_matrix()).nnz == 0
+    assert lazy.parity_check_matrix().shape == parity_check.shape
+    for kind in ["data", "ancilla", "pseudo"]:
+        assert numpy.array_equal(lazy.locs[kind], code.locs[kind])
+    assert not lazy.materialized
+
+    assert get_lattice_description(lazy) == get_lattice_description(code)
+    assert lazy.materialized
+    assert lazy.trivial_ancillas and not any(lazy.logical_state.values())
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("array_backend", [False, True])
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_bulk_errors(Code, array_backend, sparse, faulty, size):
+    """Test whether the bulk Pauli errors yield consistent syndromes, are reproducible and follow the error rates."""
+    error_rates = {"p_bitflip": 0.1, "p_phaseflip": 0.2}
+    states = []
+    for _ in range(2):
+        code, decoder = initialize(
+            size,
+            Code,
+            "mwpm",
+            enabled_errors=["pauli"],
+            faulty_measurements=faulty,
+            array_backend=array_backend,
+            bulk_errors=True,
+            sparse_errors=sparse,
+            initial_states=(0, 0),
+        )
+        run(code, decoder, error_rates=error_rates, iterations=3, decode_initial=False, seed=SEED)
+        assert code.trivial_ancillas
+        states.append([data_qubit.edges["x"].state for data_qubit in code.data_list[code.decode_layer]])
+    assert states[0] == states[1]
+
+    code.rng = numpy.random.default_rng(SEED)
+    masks = code.errors["pauli"].random_masks((1000, 50), rng=code.rng, **error_rates)
+    assert masks.shape == (2, 1000, 50)
+    assert abs(masks[0].mean() - 0.1) < 0.01 and abs(masks[1].mean() - 0.2) < 0.01
+
+    for z in code.data_list:
+        for edge in code.edge_list[z]:
+            edge.state = 0
+    code.random_errors(**error_rates)
+    code.random_errors(p_bitflip=0, p_phaseflip=0)
+    flipped = sum(edge.state for edge in code.edge_list[code.layer])
+    assert 0 < flipped < len(code.edge_list[code.layer])
+    for ancilla in code.ancilla_list[code.layer]:
+        parity = sum(data.edges[ancilla.state_type].state for data in ancilla.parity_qubits.values()) % 2
+        assert ancilla.measured_state == parity or faulty
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("sparse", [False, True])
+def test_layered_errors(Code, sparse):
+    """Test whether the windows of layered errors equal the rounds simulated layer by layer, are closed by a perfect round, and follow the measurement error rates."""
+    error_rates = {"p_bitflip": 1, "p_bitflip_plaq": 1}
+    windows = []
+    for bulk_errors in [False, True]:
+        code, _ = initialize(SIZE_FM, Code, "unionfind", enabled_errors=["pauli"], faulty_measurements=True, array_backend=True, bulk_errors=bulk_errors, sparse_errors=sparse and bulk_errors, initial_states=(0, 0))
+        assert code.layered_errors == bulk_errors
+        arrays = code.arrays
+        windows.append([
+            [arrays.states.copy(), arrays.measured_state.copy(), arrays.syndrome.copy(), arrays.measurement_error.copy()]
+            for _ in code.random_errors_stream(code.layers + 2, **error_rates)
+        ])
+    for window, layered in zip(*windows):
+        assert not window[3][-1].any() and not layered[3][-1].any()
+        for array, layered_array in zip(window, layered):
+            assert numpy.array_equal(array, layered_array)
+
+    code.rng = numpy.random.default_rng(SEED)
+    errors = []
+    for _ in range(200):
+        code.random_errors(p_bitflip_plaq=0.1, p_bitflip_star=0.3)
+        assert not code.arrays.measurement_error[-1].any()
+        errors.append(code.arrays.measurement_error[:-1].copy())
+    errors = numpy.concatenate(errors)
+    plaq = code.arrays.ancilla_types == 0
+    assert abs(errors[:, plaq].mean() - 0.1) < 0.02 and abs(errors[:, ~plaq].mean() - 0.3) < 0.02
+
+
+@pytest.mark.parametrize("array_backend", [False, True])
+@pytest.mark.parametrize("bulk_errors", [False, True])
+def test_error_plan(array_backend, bulk_errors):
+    """Test whether the fused error plan applies the errors of every module as when applied one after another."""
+    from qsurface.errors._template import ErrorPlan
+
+    code, _ = initialize(SIZE_PM, "toric", "unionfind", enabled_errors=["pauli", "erasure"], array_backend=array_backend, bulk_errors=bulk_errors, initial_states=(0, 0))
+    errors = list(code.errors.values())
+    plan = ErrorPlan(errors, bulk=bulk_errors, p_bitflip=0.1, p_erasure=0.1)
+    assert [error for error, _ in plan.steps] == (errors if bulk_errors else [None])
+    assert ErrorPlan(errors, bulk=False).steps == []
+
+    code.random_errors(p_bitflip=1, p_phaseflip=1, p_erasure=1, initial_states=(0, 1))
+    assert all(data_qubit.erasure == code.instance for data_qubit in code.data_list[0])
+    assert code.errors["erasure"].erased(0).all()
+    assert [data_qubit.state for data_qubit in code.data_list[0]] == [{"x": 0, "z": 1}] * len(code.data_list[0])
+
+    code.random_errors(apply_order=["erasure", "pauli"], p_bitflip=1, p_erasure=1, initial_states=(0, 0))
+    assert all(data_qubit.edges["x"].state and not data_qubit.edges["z"].state for data_qubit in code.data_list[0])
+
+    if not bulk_errors:
+        states = []
+        for fused in [True, False]:
+            random.seed(SEED)
+            for edge in code.edge_list[0]:
+                edge.state = 0
+            if fused:
+                code.random_errors(apply_order=["pauli"], p_bitflip=0.1, p_phaseflip=0.2)
+            else:
+                for data_qubit in code.data_qubits[0].values():
+                    code.errors["pauli"].random_error(data_qubit, p_bitflip=0.1, p_phaseflip=0.2)
+            states.append([edge.state for edge in code.edge_list[0]])
+        assert states[0] == states[1]
+
+
+@pytest.mark.parametrize("p", [0, 0.001, 0.05, 0.5, 1])
+def test_sample_indices(p):
+    """Test whether the dense and sparse samplers draw the same error distribution."""
+    from qsurface.errors._template import sample_indices
+
+    rng = numpy.random.default_rng(SEED)
+    n, shots = 200, 2000
+    counts = {}
+    for sparse in [False, True]:
+        count = numpy.zeros(n)
+        for _ in range(shots):
+            indices = sample_indices(n, p, rng, sparse=sparse)
+            assert numpy.all(numpy.diff(indices) > 0) and numpy.all((indices >= 0) & (indices < n))
+            count[indices] += 1
+        counts[sparse] = count / shots
+    for rates in counts.values():
+        assert abs(rates.mean() - p) < 0.01
+    assert abs(counts[False].mean() - counts[True].mean()) < 0.01
+
+
+def test_bulk_erasure():
+    """Test whether the bulk erasure path erases and stamps the drawn data-qubits."""
+    code, _ = initialize(SIZE_PM, "planar", "unionfind", enabled_errors=["erasure"], sparse_errors=True)
+    code.random_errors(p_erasure=0.2)
+    erased = [data_qubit for data_qubit in code.data_list[0] if data_qubit.erasure == code.instance]
+    assert 0 < len(erased) < len(code.data_list[0])
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+@pytest.mark.parametrize("array_backend", [False, True])
+def test_bitsliced_shots(Code, Decoder, array_backend):
+    """Test whether the bit-sliced syndromes and decoded shots equal those of the shots loaded one by one."""
+    from qsurface.codes.bitslice import BitSlicedShots, pack_shots, unpack_shots
+
+    code, decoder = initialize(SIZE_PM, Code, Decoder, enabled_errors=["pauli"], array_backend=array_backend)
+    shots = 100
+    batch = BitSlicedShots(code, shots)
+    batch.random_errors(p_bitflip=0.05, p_phaseflip=0.05, rng=numpy.random.default_rng(SEED))
+    errors = unpack_shots(batch.states, shots)
+    assert (pack_shots(errors) == batch.states).all()
+    assert (unpack_shots(batch.syndrome(), shots) == (batch.parity_check @ errors.astype(numpy.uint8)) % 2).all()
+    assert (unpack_shots(batch.logical_state(), shots) == (batch.logical @ errors.astype(numpy.uint8)) % 2).all()
+
+    no_error = batch.decode(decoder)
+    syndrome = unpack_shots(batch.syndrome(), shots)
+    for shot in range(shots):
+        batch.load_shot(shot)
+        assert [ancilla.syndrome for ancilla in code.ancilla_list[0]] == syndrome[:, shot].tolist()
+        decoder.decode()
+        assert no_error[shot] == (not any(batch.corrected_logical_state().values()))
+
+
+@pytest.mark.parametrize("suffix", [".npy", ".npz", ".csv"])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_error_rate_maps(tmp_path, suffix, sparse):
+    """Test whether maps of the error rate per data-qubit are loaded from a file and applied per qubit on the bulk path."""
+    code, _ = initialize(SIZE_FM, "planar", "mwpm", enabled_errors=["pauli"], bulk_errors=True, sparse_errors=sparse, initial_states=(0, 0))
+    num_data = len(code.data_list[0])
+    rates = numpy.zeros(num_data)
+    rates[::2] = 1
+
+    file = tmp_path / f"rates{suffix}"
+    if suffix == ".npy":
+        numpy.save(file, rates)
+    elif suffix == ".npz":
+        numpy.savez(file, p_bitflip=rates)
+    else:
+        rows = [f"{x},{y},{rate}" for (x, y), rate in zip(code.locs["data"], rates)]
+        file.write_text("\n".join(["x,y,p_bitflip"] + rows[::-1]))
+    code.errors["pauli"].load_error_rates(file, names=["p_bitflip"])
+    assert numpy.array_equal(code.errors["pauli"].default_error_rates["p_bitflip"], rates)
+
+    code.random_errors()
+    assert [edge.state for edge in code.edge_list[0]] == [bool(rate) for rate in rates] + [False] * num_data
+    for ancilla in code.ancilla_list[0]:
+        assert ancilla.measured_state == sum(data.edges[ancilla.state_type].state for data in ancilla.parity_qubits.values()) % 2
+
+    with pytest.raises(ValueError):
+        numpy.save(tmp_path / "short.npy", rates[1:])
+        code.errors["pauli"].load_error_rates(tmp_path / "short.npy", names=["p_bitflip"])
+
+
+@pytest.mark.parametrize("bulk_errors", [False, True])
+def test_erasure_mask(bulk_errors):
+    """Test whether the erasure mask equals the erased data-qubits of the current instance and is cleared on a new instance."""
+    code, decoder = initialize(SIZE_PM, "toric", "unionfind", enabled_errors=["erasure"], bulk_errors=bulk_errors)
+    erasure = code.errors["erasure"]
+    for p_erasure in [0.2, 0]:
+        code.random_errors(p_erasure=p_erasure)
+        erased = [data_qubit.erasure == code.instance for data_qubit in code.data_list[0]]
+        assert numpy.array_equal(erasure.erased(0), erased)
+        assert len(decoder.get_erasures()) == 2 * sum(erased)
+    code.random_errors_weight(5)
+    assert numpy.count_nonzero(erasure.erased(0)) == 5
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+@pytest.mark.parametrize("array_backend", [False, True])
+def test_shot_records(Code, Decoder, array_backend, tmp_path):
+    """Test whether recorded shots are replayed with the same errors, erasures and syndromes, and decoded with the same result."""
+    from qsurface.codes.bitslice import layer_logical_state
+    from qsurface.codes.records import ShotRecorder, ShotReplay
+
+    code, decoder = initialize(SIZE_PM, Code, Decoder, enabled_errors=["pauli", "erasure"], array_backend=array_backend)
+    path = tmp_path / "shots.rec"
+    random.seed(SEED)
+    errors, erasures, syndromes, no_error = [], [], [], []
+    for append in [False, True]:
+        with ShotRecorder(code, path, chunk_size=8, append=append) as recorder:
+            for _ in range(10):
+                code.random_errors(p_bitflip=0.05, p_erasure=0.05, initial_states=(None, None))
+                recorder.record()
+                errors.append([edge.state for edge in code.edge_list[0]])
+                erasures.append([data_qubit.erasure == code.instance for data_qubit in code.data_list[0]])
+                syndromes.append([ancilla.syndrome for ancilla in code.ancilla_list[0]])
+                decoder.decode()
+                no_error.append(not any(layer_logical_state(code).values()))
+
+    replay = ShotReplay(code, path)
+    assert len(replay) == 20 and replay.num_chunks == 3 and list(replay.chunk_shots(2)) == [16, 17, 18, 19]
+    fields = replay.shots(slice(None))
+    assert fields["errors"].tolist() == errors
+    assert fields["erasures"].tolist() == erasures
+    assert fields["syndrome"].tolist() == syndromes
+    assert replay.decode(decoder, verify=True).tolist() == no_error
+
+    assert ShotReplay(code, path, chunk_size=8).header["layers"] == 1
+    with pytest.raises(ValueError):
+        ShotReplay(code, path, chunk_size=4)
+    with pytest.raises(ValueError):
+        ShotRecorder(code, path, chunk_size=4, append=True)
+    for other_code, size, faulty in [(Code, SIZE_PM + 2, False), (Code, SIZE_PM, True), (CODES[CODES.index(Code) - 1], SIZE_PM, False)]:
+        other, _ = initialize(size, other_code, Decoder, enabled_errors=["pauli"], faulty_measurements=faulty)
+        with pytest.raises(ValueError):
+            ShotReplay(other, path)
+
+
+@pytest.mark.parametrize("Code", ["toric", "planar"])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_circuit_shots(Code, lazy):
+    """Test whether the Pauli frames of the circuit measure the parities of the data errors, and whether faulty preparations and measurements flip the measurements."""
+    from qsurface.codes.circuit import CircuitShots, cnot_schedule
+    from qsurface.codes.bitslice import unpack_shots, xor_rows
+
+    code, _ = initialize(SIZE_FM, Code, "unionfind", faulty_measurements=True, lazy=lazy)
+    shots = 100
+    batch = CircuitShots(code, shots)
+    assert len(batch.schedule) == 4
+    assert sum(len(ancillas) for ancillas, _ in batch.schedule) == batch.parity_check.nnz
+
+    batch.random_errors(p_idle=0.1, rng=numpy.random.default_rng(SEED))
+    assert batch.states[-1].any()
+    for states, measured in zip(batch.states, batch.measured):
+        assert numpy.array_equal(xor_rows(batch.parity_check, states), measured)
+
+    for rates in [{"p_prep": 1}, {"p_measure": 1}]:
+        batch.random_errors(**rates, rng=numpy.random.default_rng(SEED))
+        assert not batch.states.any()
+        assert unpack_shots(batch.measured.reshape(-1, batch.measured.shape[-1]), shots).reshape(code.layers, -1, shots)[:-1].all()
+        syndrome = unpack_shots(batch.syndrome().reshape(-1, batch.measured.shape[-1]), shots).reshape(code.layers, -1, shots)
+        assert syndrome[0].all() and syndrome[-1].all() and not syndrome[1:-1].any()
+
+    north, east, west, south = (0, 0.5), (0.5, 0), (-0.5, 0), (0, -0.5)
+    with pytest.raises(ValueError):
+        cnot_schedule(code, {"x": [east, west, north, south], "z": [east, west, north, south]})
+    with pytest.raises(ValueError):
+        cnot_schedule(code, {"x": [north, east, west], "z": [north, west, east, south]})
+
+
+@pytest.mark.parametrize("Code", ["toric", "planar"])
+@pytest.mark.parametrize("Decoder", DECODERS)
+def test_circuit_decode(Code, Decoder):
+    """Test whether the shots of the circuit are decoded equally on the object and array backends, and without errors at zero noise."""
+    from qsurface.codes.circuit import CircuitShots
+
+    results = []
+    for array_backend in [False, True]:
+        code, decoder = initialize(SIZE_FM, Code, Decoder, faulty_measurements=True, array_backend=array_backend, initial_states=(0, 0))
+        batch = CircuitShots(code, 64)
+        batch.random_errors(p_cnot=0.01, p_idle=0.01, p_measure=0.01, rng=numpy.random.default_rng(SEED))
+        assert len(batch.nontrivial_shots())
+        results.append(batch.decode(decoder))
+        batch.random_errors(rng=numpy.random.default_rng(SEED))
+        assert len(batch.nontrivial_shots()) == 0 and batch.decode(decoder).all()
+    assert numpy.array_equal(*results)
@@ -1,6 +1,9 @@
 from qsurface.main import *
 import pytest
+import random
+import numpy
 from .variables import *
+from qsurface.codes.elements import PseudoQubit
 
 SEED = 12345
 ITERS = [1, 10]
@@ -22,6 +25,91 @@ def test_initialize(size, Code, Decoder, error, faulty):
     initialize(size, Code, Decoder, enabled_errors=[error], faulty_measurements=faulty)
 
 
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_decoder_adjacency(size, Code, faulty):
+    """Test whether the adjacency tables of the decoder match the edges of the code."""
+    code, decoder = initialize(size, Code, DECODERS[0], faulty_measurements=faulty)
+    for i, ancilla in enumerate(decoder.nodes):
+        start, end = decoder.adjacency_indptr[i], decoder.adjacency_indptr[i + 1]
+        neighbors = decoder.get_neighbors(ancilla, loop=True)
+        assert end - start == len(neighbors)
+        for j, (key, (neighbor, edge)) in zip(range(start, end), neighbors.items()):
+            assert neighbor in edge.nodes and ancilla in edge.nodes
+            assert decoder.nodes[decoder.adjacency_nodes[j]] is neighbor
+            assert decoder.edges[decoder.adjacency_edges[j]] is edge
+            assert decoder.adjacency_key_list[decoder.adjacency_keys[j]] == key
+        if Code == "planar" and ancilla in code.ancilla_qubits[ancilla.z].values():
+            assert decoder.boundary_pseudo[i] != -1
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_run_array_backend(size, Code, Decoder, faulty):
+    """Test whether decoding with the array backend yields the same results as the object backend."""
+    outputs = []
+    for array_backend in [False, True]:
+        code, decoder = initialize(
+            size, Code, Decoder, enabled_errors=["pauli"], faulty_measurements=faulty, array_backend=array_backend
+        )
+        error_rates = {"p_bitflip": 0.05, "p_bitflip_plaq": 0.05} if faulty else {"p_bitflip": 0.05}
+        outputs.append(run(code, decoder, error_rates=error_rates, iterations=10, seed=SEED))
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_initialize_lattice_cache(size, Code, faulty):
+    """Test whether codes cloned from the lattice cache are independent and equal to freshly built codes."""
+    lattice_cache.clear()
+    outputs = []
+    for cache_lattice in [False, True, True]:
+        random.seed(SEED)
+        code, decoder = initialize(
+            size, Code, DECODERS[0], enabled_errors=["pauli"], faulty_measurements=faulty, cache_lattice=cache_lattice
+        )
+        states = [edge.state for layer in code.data_qubits.values() for qubit in layer.values() for edge in qubit.edges.values()]
+        error_rates = {"p_bitflip": 0.05, "p_bitflip_plaq": 0.05} if faulty else {"p_bitflip": 0.05}
+        outputs.append((states, run(code, decoder, error_rates=error_rates, iterations=10, seed=SEED)))
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert len(lattice_cache) == 1
+
+
+def test_lattice_cache_eviction():
+    """Test whether the lattice cache holds at most ``lattice_cache_size`` templates."""
+    lattice_cache.clear()
+    for size in range(2, 4 + lattice_cache_size):
+        initialize(size, "toric", DECODERS[0])
+    assert len(lattice_cache) == lattice_cache_size
+    assert list(lattice_cache)[-1][1] == (3 + lattice_cache_size,) * 2
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+@pytest.mark.parametrize("faulty, size", [(False, SIZE_PM), (True, SIZE_FM)])
+def test_initialize_snapshot(size, Code, Decoder, faulty, tmp_path):
+    """Test whether codes and decoders loaded from a snapshot are equal to freshly built codes and decoders."""
+    path = tmp_path / "lattice.snapshot"
+    code, decoder = initialize(size, Code, Decoder, faulty_measurements=faulty)
+    decoder.save_snapshot(path)
+    outputs = []
+    for snapshot in [None, path]:
+        random.seed(SEED)
+        code, decoder = initialize(
+            size, Code, Decoder, enabled_errors=["pauli"], faulty_measurements=faulty, snapshot=snapshot
+        )
+        states = [edge.state for layer in code.data_qubits.values() for qubit in layer.values() for edge in qubit.edges.values()]
+        error_rates = {"p_bitflip": 0.05, "p_bitflip_plaq": 0.05} if faulty else {"p_bitflip": 0.05}
+        outputs.append((states, run(code, decoder, error_rates=error_rates, iterations=10, seed=SEED)))
+    assert outputs[0] == outputs[1]
+    assert decoder.short in code.decoder_tables
+    assert not decoder.adjacency_indptr.flags.writeable
+
+    with pytest.raises(ValueError):
+        initialize(size + 1, Code, Decoder, faulty_measurements=faulty, snapshot=path)
+
+
 @pytest.mark.plotting
 @pytest.mark.parametrize("Code", CODES)
 @pytest.mark.parametrize(
@@ -60,7 +148,6 @@ def test_run(iterations, initial_states, decode_initial):
 @pytest.mark.parametrize("iterations", ITERS)
 def test_run_benchmark(iterations):
     """Test for run with benchmarking enabled."""
-    processed_seed = float(f"{str(SEED)}0")
     code, decoder = initialize(SIZE_PM, CODES[0], DECODERS[0])
     benchmark = BenchmarkDecoder({"decode": ["count_calls", "value_to_list"]})
     output = run(code, decoder, benchmark=benchmark, iterations=iterations, seed=SEED)
@@ -69,7 +156,7 @@ def test_run_benchmark(iterations):
         "benchmark": {
             "decoded": iterations,
             "iterations": iterations,
-            "seed": processed_seed,
+            "seed": SEED,
             "count_calls/decode/mean": 1.0,
             "count_calls/decode/std": 0.0,
         },
@@ -100,3 +187,219 @@ def test_run_multiprocess_benchmark():
         },
     }
     assert output == asserted_output
+
+
+def test_seed_streams():
+    """Test whether the seeded streams are reproducible and independent per key."""
+    code, _ = initialize(SIZE_PM, CODES[0], DECODERS[0])
+    draws = {}
+    for key in [(0, 1), (0, 2), (0, 1), (1,)]:
+        seed_code(code, SEED, *key)
+        draws.setdefault(key, []).append((random.random(), code.rng.random()))
+    assert draws[(0, 1)][0] == draws[(0, 1)][1]
+    assert len({draw[0] for draws_key in draws.values() for draw in draws_key}) == 3
+    assert seed_sequence(0.5).entropy == seed_sequence(0.5).entropy != seed_sequence(1).entropy
+
+
+def test_run_chunks():
+    """Test whether the results of a seeded run are independent of the partition of its chunks over calls and processes."""
+    code, decoder = initialize(SIZE_PM, CODES[0], DECODERS[0], enabled_errors=["pauli"], initial_states=(0, 0))
+    kwargs = dict(error_rates={"p_bitflip": 0.12}, iterations=MP_ITERS, chunk_size=5, seed=SEED, decode_initial=False)
+    output = run(code, decoder, **kwargs)
+    assert 0 < output["no_error"] < MP_ITERS
+    split = [run(code, decoder, chunks=chunks, **kwargs)["no_error"] for chunks in [[3, 0], [4, 1, 2]]]
+    assert sum(split) == output["no_error"]
+    for processes in [2, 3]:
+        assert run_multiprocess(code, decoder, processes=processes, **kwargs) == output
+
+
+@pytest.mark.parametrize("faulty", [False, True])
+def test_run_chunks_erasure(faulty):
+    """Test whether the results of a seeded run with erasures, which reinitialize qubits to fixed states, are independent of the number of processes."""
+    code, decoder = initialize(SIZE_FM if faulty else SIZE_PM, "planar", "unionfind", enabled_errors=["pauli", "erasure"], faulty_measurements=faulty)
+    error_rates = {"p_bitflip": 0.08, "p_erasure": 0.2}
+    if faulty:
+        error_rates.update(p_bitflip_plaq=0.02, p_bitflip_star=0.02)
+    kwargs = dict(error_rates=error_rates, iterations=MP_ITERS, chunk_size=5, seed=SEED)
+    output = run_multiprocess(code, decoder, processes=1, **kwargs)
+    assert 0 < output["no_error"] < MP_ITERS
+    for processes in [2, 3]:
+        assert run_multiprocess(code, decoder, processes=processes, **kwargs) == output
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+def test_run_rounds(Code, Decoder):
+    """Test whether a stream of rounds is decoded every time the sliding window is full."""
+    code, decoder = initialize(SIZE_FM, Code, Decoder, enabled_errors=["pauli"], faulty_measurements=True, layers=3)
+    random.seed(SEED)
+    yielded = []
+    for rounds in code.random_errors_stream(20, p_bitflip=0.05, p_bitflip_plaq=0.05, p_bitflip_star=0.05):
+        yielded.append(rounds)
+        decoder.decode()
+    for ancilla in code.ancilla_qubits[code.decode_layer].values():
+        assert not sum(data.edges[ancilla.state_type].state for data in ancilla.parity_qubits.values()) % 2
+    assert yielded == list(range(2, 19)) + [20]
+    with pytest.raises(ValueError):
+        next(code.random_errors_stream(20, commit=3))
+    assert len(code.data_qubits) == 3
+    output = run(code, decoder, error_rates={"p_bitflip": 0.02, "p_bitflip_plaq": 0.02}, iterations=5, rounds=20, seed=SEED)
+    assert 0 <= output["no_error"] <= 5
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+@pytest.mark.parametrize("array_backend", [False, True])
+def test_run_stream_boundary(Code, Decoder, array_backend):
+    """Test whether error chains that cross the boundary of a window of the stream are carried over to the next window and corrected."""
+    code, decoder = initialize(5, Code, Decoder, enabled_errors=["pauli"], faulty_measurements=True, layers=5, array_backend=array_backend, initial_states=(0, 0))
+    data = min(
+        (data for data in code.data_list[0] if not any(isinstance(node, PseudoQubit) for node in data.edges["x"].nodes)),
+        key=lambda data: sum((a - b) ** 2 for a, b in zip(data.loc, (code.size[0] / 2, code.size[1] / 2))),
+    )
+    edge = data.edges["x"]
+    ancilla0, ancilla1 = [ancilla.index for ancilla in edge.nodes]
+    # A data error in round 1, and a diagonal chain of a data error and a measurement error in round 3, the last round of the first window. A time-like chain of a measurement error in round 7, the last round of the third window.
+    data_errors, measurement_errors = {1, 3}, {3: ancilla1, 7: ancilla0}
+
+    random_errors_layer, random_measure_layer = code.random_errors_layer, code.random_measure_layer
+    rounds = []
+
+    def errors_layer(**kwargs):
+        random_errors_layer(**kwargs)
+        rounds.append(code.layer)
+        if len(rounds) - 1 in data_errors:
+            layer_edge = code.edge_list[code.layer][code.edge_list[0].index(edge)]
+            layer_edge.state = not layer_edge.state
+
+    def measure_layer(**kwargs):
+        random_measure_layer(**kwargs)
+        if kwargs and len(rounds) - 1 in measurement_errors:
+            ancilla = code.ancilla_list[code.layer][measurement_errors[len(rounds) - 1]]
+            ancilla.measured_state = not ancilla.measured_state
+            ancilla.syndrome = not ancilla.syndrome
+
+    code.random_errors_layer, code.random_measure_layer = errors_layer, measure_layer
+    yielded, syndromes = [], []
+    for i in code.random_errors_stream(12, p_bitflip_plaq=0, p_bitflip_star=0):
+        yielded.append(i)
+        syndromes.append({(ancilla.index, ancilla.z) for ancilla in code.syndromes})
+        decoder.decode()
+    assert yielded == [4, 6, 8, 10, 12] and len(rounds) == 12
+    assert (ancilla0, 3) in syndromes[0] and (ancilla1, 3) not in syndromes[0]
+    assert {(ancilla0, 1), (ancilla1, 2)} <= syndromes[1]
+    assert (ancilla0, 3) in syndromes[2] and (ancilla0, 2) in syndromes[3]
+    assert not any(edge.state for edge in code.edge_list[code.decode_layer])
+    code.logical_state
+    assert code.no_error
+
+
+@pytest.mark.parametrize("Code", CODES)
+def test_benchmark_construction(Code):
+    """Test whether the construction benchmark times the bulk and element constructors."""
+    for lazy in [True, False]:
+        durations = benchmark_construction(Code, [3, 4], faulty_measurements=True, lazy=lazy, materialize=True)
+        assert list(durations) == [3, 4]
+        assert all(duration > 0 for duration in durations.values())
+
+
+@pytest.mark.parametrize("Code", CODES)
+def test_run_bitsliced(Code):
+    """Test whether the bit-sliced runs count every iteration, including the shots of a partial batch."""
+    code, decoder = initialize(SIZE_PM, Code, "unionfind", enabled_errors=["pauli"])
+    output = run_bitsliced(code, decoder, {"p_bitflip": 0.02}, iterations=150, shots=64, seed=SEED)
+    assert 0 < output["no_error"] <= 150
+    output = run_bitsliced(code, decoder, {"p_bitflip": 0}, iterations=150, seed=SEED)
+    assert output["no_error"] == 150
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+@pytest.mark.parametrize(
+    "error, error_rates",
+    [("pauli", {"p_bitflip": 1, "p_phaseflip": 1}), ("erasure", {"p_erasure": 1, "initial_states": (None, None)})],
+)
+def test_run_fixed_weight(Code, Decoder, error, error_rates):
+    """Test whether the fixed-weight failures grow with the weight and combine into bounded logical error rates."""
+    code, decoder = initialize(SIZE_PM, Code, Decoder, enabled_errors=[error])
+    weights = [0, 1, code.errors[error].fault_locations(**error_rates) // 2]
+    result = run_fixed_weight(code, decoder, weights, shots=[5, 20, 20], error_rates=error_rates, seed=SEED)
+    assert result["weights"] == weights and result["shots"] == [5, 20, 20]
+    assert result["failures"][:2] == [0, 0] and result["failures"][2] > 0
+    assert result["locations"] == len(code.data_qubits[0]) * (2 if error == "pauli" else 1)
+
+    rates = fixed_weight_rate(result, [1e-3, 1e-2, 0.1])
+    assert numpy.all(rates["lower"] <= rates["rate"]) and numpy.all(rates["rate"] <= rates["upper"])
+    assert numpy.all(numpy.diff(rates["rate"]) > 0)
+    assert rates["shots"] == 45
+
+
+def test_run_fixed_weight_unequal_rates():
+    """Test whether fixed-weight errors with unequal or per-qubit Pauli rates are refused, as their locations do not fail with a single probability."""
+    code, decoder = initialize(SIZE_PM, "toric", "unionfind", enabled_errors=["pauli"])
+    error_rates = {"p_bitflip": 0.01, "p_phaseflip": 0.001}
+    with pytest.raises(ValueError):
+        code.errors["pauli"].fault_locations(**error_rates)
+    with pytest.raises(ValueError):
+        code.random_errors_weight(2, **error_rates)
+    with pytest.raises(ValueError):
+        run_fixed_weight(code, decoder, [1, 2], shots=5, error_rates=error_rates, seed=SEED)
+    with pytest.raises(ValueError):
+        code.errors["pauli"].fault_locations(p_bitflip=numpy.full(len(code.data_qubits[0]), 0.01))
+    assert code.errors["pauli"].fault_locations(p_bitflip=0.01, p_phaseflip=0.01) == 2 * len(code.data_qubits[0])
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("Decoder", DECODERS)
+def test_run_sweep(Code, Decoder):
+    """Test whether the sweep with common random numbers and reused corrections equals decoding every rate in full."""
+    code, decoder = initialize(SIZE_PM, Code, Decoder, enabled_errors=["pauli"])
+    error_rates = [{"p_bitflip": p, "p_phaseflip": p / 2} for p in [0, 0.02, 0.02, 0.05]]
+    iterations, shots = 100, 64
+    output = run_sweep(code, decoder, error_rates, iterations=iterations, shots=shots, seed=SEED)
+    assert output[0] == {"no_error": iterations, "decoded": 0}
+    assert output[2] == {"no_error": output[1]["no_error"], "decoded": 0}
+
+    batch = codes.bitslice.BitSlicedShots(code, shots)
+    no_error = [0] * len(error_rates)
+    for start in range(0, iterations, shots):
+        seed_code(code, SEED, start // shots)
+        variates = code.rng.random((2 * batch.num_data, shots), dtype=numpy.float32)
+        for i, rates in enumerate(error_rates):
+            threshold = numpy.repeat([rates["p_bitflip"], rates["p_phaseflip"]], batch.num_data)[:, None]
+            batch.set_errors(variates < threshold)
+            no_error[i] += int(batch.decode(decoder)[: iterations - start].sum())
+    assert [result["no_error"] for result in output] == no_error
+
+    with pytest.raises(ValueError):
+        run_sweep(code, decoder, [{"p_bitflip_plaq": 0.1}])
+
+
+@pytest.mark.parametrize("Decoder", DECODERS)
+def test_run_replay(Decoder, tmp_path):
+    """Test whether a replayed record is decoded as its shots in a run, and whether the chunks of a replay add up."""
+    code, decoder = initialize(SIZE_PM, "toric", Decoder, enabled_errors=["pauli"], initial_states=(0, 0))
+    path = tmp_path / "shots.rec"
+    error_rates = {"p_bitflip": 0.06, "p_phaseflip": 0.06}
+    assert record_shots(code, path, error_rates, iterations=50, chunk_size=16, seed=SEED) == {"shots": 50, "seed": SEED}
+
+    code, decoder = initialize(SIZE_PM, "toric", Decoder, enabled_errors=["pauli"], initial_states=(0, 0))
+    output = run(code, decoder, error_rates, iterations=50, chunk_size=16, seed=SEED, decode_initial=False)
+    assert run_replay(code, decoder, path, verify=True) == output
+    chunks = [run_replay(code, decoder, path, chunks=[c])["no_error"] for c in range(4)]
+    assert sum(chunks) == output["no_error"]
+
+    benchmarker = BenchmarkDecoder({"decode": "duration"})
+    output = run_replay(code, decoder, path, benchmark=benchmarker)
+    assert output["benchmark"]["decoded"] == 50
+
+
+@pytest.mark.parametrize("Decoder", DECODERS)
+def test_run_circuit(Decoder):
+    """Test whether the circuit runs count every iteration and are reproducible for a seed."""
+    code, decoder = initialize(SIZE_FM, "toric", Decoder, faulty_measurements=True)
+    error_rates = {"p_cnot": 0.02, "p_measure": 0.02}
+    output = run_circuit(code, decoder, error_rates, iterations=150, shots=64, seed=SEED)
+    assert 0 < output["no_error"] < 150
+    assert run_circuit(code, decoder, error_rates, iterations=150, shots=64, seed=SEED) == output
+    assert run_circuit(code, decoder, iterations=150, seed=SEED) == {"no_error": 150}
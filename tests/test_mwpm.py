@@ -2,6 +2,7 @@ from qsurface.main import *
 import qsurface as oss
 import pytest
 import random
+import re
 from .variables import *
 
 
@@ -48,3 +49,27 @@ def test_decoder_pm(size, Code, errors, faulty, max_rate, extra_keys):
 
     else:
         assert True
+
+
+@pytest.mark.parametrize("Code", CODES)
+def test_mwpm_erasure(Code):
+    """Test whether the matching on zero-weight erased edges decodes erasures below the erasure threshold."""
+    code, decoder = initialize(SIZE_PM, Code, "mwpm", enabled_errors=["pauli", "erasure"])
+    random.seed(0)
+    no_error = 0
+    for _ in range(ITERS):
+        code.random_errors(p_bitflip=0.01, p_phaseflip=0.01, p_erasure=0.2, initial_states=(None, None))
+        decoder.decode()
+        assert code.trivial_ancillas
+        code.logical_state
+        no_error += code.no_error
+    assert no_error > 0.9 * ITERS
+
+
+def test_rotated_walk_error():
+    """Test whether a matching between ancilla-qubits that cannot be connected by a diagonal walk raises an error naming both."""
+    code, decoder = initialize(SIZE_PM, "rotated", "mwpm", enabled_errors=["pauli"])
+    aq_x = next(ancilla for ancilla in code.ancilla_list[0] if ancilla.state_type == "x")
+    aq_z = next(ancilla for ancilla in code.ancilla_list[0] if ancilla.state_type == "z")
+    with pytest.raises(ValueError, match=f"{re.escape(str(aq_x))}.*{re.escape(str(aq_z))}"):
+        decoder._correct_matched_qubits(aq_x, aq_z)
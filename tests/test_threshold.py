@@ -123,6 +123,46 @@ def test_run_many(mp_processes):
     assert got_sizes and got_error
 
 
+def test_run_many_seed():
+    """Test whether a seeded threshold run gives the same results for any number of processes."""
+    results = []
+    for mp_processes in [1, 2]:
+        data = run_many(
+            CODES[0],
+            DECODERS[0],
+            iterations=20,
+            sizes=[6],
+            enabled_errors=["pauli"],
+            error_rates=[{"p_bitflip": p} for p in [0.08, 0.12]],
+            output="none",
+            mp_processes=mp_processes,
+            seed=1,
+            initial_states=(0, 0),
+        )
+        results.append(list(data["no_error"]))
+    assert results[0] == results[1]
+
+
+def test_run_many_common_random_numbers():
+    """Test whether the threshold runner sweeps the error rates of every size with common random numbers."""
+    iters = 100
+    sizes = [6, 8]
+    error_rates = [{"p_bitflip": p} for p in [0.05, 0.1]]
+    data = run_many(
+        CODES[0],
+        DECODERS[0],
+        iterations=iters,
+        sizes=sizes,
+        enabled_errors=["pauli"],
+        error_rates=error_rates,
+        output="none",
+        common_random_numbers=True,
+    )
+    assert list(data["size"]) == [6, 6, 8, 8]
+    assert list(data["p_bitflip"]) == [0.05, 0.1, 0.05, 0.1]
+    assert all(data["iterations"] == iters) and all(data["no_error"] <= iters)
+
+
 @pytest.mark.parametrize("modified_ansatz", [True, False])
 def test_fit_data(example_pm_data, modified_ansatz):
     """Load example data and test fitting."""
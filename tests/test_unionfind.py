@@ -89,3 +89,79 @@ def test_unionfind_plot(faulty, size):
         step_peel=True,
     )
     run(code, decoder, error_rates={"p_bitflip": 0.1}, decode_initial=False)
+
+
+@pytest.mark.parametrize("Code", CODES)
+def test_unionfind_instance(Code):
+    """Test whether the state of previous decoding instances is ignored, also on a copied lattice."""
+    code, decoder = initialize(SIZE_PM, Code, "unionfind", enabled_errors=["pauli"])
+    random.seed(0)
+    for _ in range(10):
+        instance = code.instance
+        code.random_errors(p_bitflip=0.05, p_phaseflip=0.05)
+        assert type(code.instance) is int and code.instance > instance
+        decoder.decode()
+        assert code.trivial_ancillas
+        assert len(decoder.support) <= len(decoder.edges)
+
+    copy, _ = initialize(SIZE_PM, Code, "unionfind", enabled_errors=["pauli"], cache_lattice=False)
+    copy.copy_lattice(code)
+    assert copy.instance > code.instance
+    copy_decoder = getattr(getattr(oss.decoders, "unionfind").sim, Code.capitalize())(copy)
+    copy.random_errors(p_bitflip=0.05, p_phaseflip=0.05)
+    copy_decoder.decode()
+    assert copy.trivial_ancillas
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("dynamic_forest", [False, True])
+def test_unionfind_erasure(Code, dynamic_forest):
+    """Test whether the clusters merged from the erasure mask are decoded to a valid correction below the erasure threshold."""
+    code, decoder = initialize(SIZE_PM, Code, "unionfind", enabled_errors=["pauli", "erasure"], dynamic_forest=dynamic_forest)
+    random.seed(0)
+    no_error = 0
+    for _ in range(ITERS):
+        code.random_errors(p_bitflip=0.01, p_phaseflip=0.01, p_erasure=0.2, initial_states=(None, None))
+        decoder.decode()
+        assert code.trivial_ancillas
+        code.logical_state
+        no_error += code.no_error
+    assert no_error > 0.9 * ITERS
+
+
+@pytest.mark.parametrize("Code", CODES)
+@pytest.mark.parametrize("faulty", [False, True])
+@pytest.mark.parametrize("dynamic_forest", [False, True])
+def test_unionfind_array_engine(Code, faulty, dynamic_forest):
+    """Test whether the array-based engine applies the same corrections as the object-based decoder on the same errors."""
+    code, decoder = initialize(
+        SIZE_FM if faulty else SIZE_PM,
+        Code,
+        "unionfind",
+        enabled_errors=["pauli", "erasure"],
+        faulty_measurements=faulty,
+        dynamic_forest=dynamic_forest,
+    )
+    array_decoder = type(decoder)(code, array_engine=True, dynamic_forest=dynamic_forest)
+    assert decoder.engine is None and array_decoder.engine is not None
+
+    edges = [edge for z in range(code.layers) for edge in code.edge_list[z]]
+    ancillas = [
+        ancilla for z in range(code.layers) for qubits in [code.ancilla_qubits, code.pseudo_qubits] for ancilla in qubits[z].values()
+    ]
+    rates = dict(p_bitflip=0.06, p_phaseflip=0.04, p_erasure=0.05)
+    if faulty:
+        rates.update(p_bitflip_plaq=0.02, p_bitflip_star=0.02)
+    random.seed(0)
+    for _ in range(ITERS // 4):
+        code.random_errors(**rates)
+        states, syndromes = [edge.state for edge in edges], [ancilla.syndrome for ancilla in ancillas]
+        decoder.decode()
+        corrected = [edge.state for edge in edges]
+        for edge, state in zip(edges, states):
+            edge.state = state
+        for ancilla, syndrome in zip(ancillas, syndromes):
+            ancilla.syndrome = syndrome
+        array_decoder.decode()
+        assert [edge.state for edge in edges] == corrected
+        assert faulty or code.trivial_ancillas